@@ -0,0 +1,419 @@
+"""
+Almacén en disco de características por fragmentos y entrenamiento incremental
+Las características se agregan en fragmentos .npy (solo anexar) descritos por un índice
+JSON, y el clasificador se entrena recorriéndolos con partial_fit, de modo que el tamaño
+del conjunto de datos queda limitado por el disco y no por la RAM
+"""
+
+import json
+import os
+import sys
+import time
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+from sklearn.linear_model import SGDClassifier
+from sklearn.kernel_approximation import Nystroem, RBFSampler
+from sklearn.pipeline import make_pipeline
+from sklearn.metrics import classification_report, confusion_matrix
+from carga_mat import cargar_registro, iterar_bloques, TAMANO_BLOQUE
+from process_eeg import extraer_caracteristicas_eventos, parametros_extraccion
+from remuestreo import adaptar_frecuencia, FS_OBJETIVO
+
+DIRECTORIO_ALMACEN = 'almacen_caracteristicas'
+FILAS_POR_FRAGMENTO = 65536
+VERSION_INDICE = 1
+
+class AlmacenCaracteristicas:
+    """
+    Conjunto de características en disco que solo admite anexar filas
+    
+    Cada fragmento son dos archivos .npy (características float64 y etiquetas int8)
+    que se leen con memory-map. `indice.json` lista los fragmentos en orden; se
+    reescribe de forma atómica después de escribir los fragmentos, así que una
+    escritura interrumpida no deja fragmentos a medias en el índice.
+    """
+
+    def __init__(self, directorio=DIRECTORIO_ALMACEN, filas_por_fragmento=FILAS_POR_FRAGMENTO):
+        """
+        Args:
+            directorio: Carpeta del almacén (se crea si no existe)
+            filas_por_fragmento: Máximo de filas por fragmento nuevo
+        """
+        self.directorio = directorio
+        self.filas_por_fragmento = int(filas_por_fragmento)
+        self._ruta_indice = os.path.join(directorio, 'indice.json')
+        os.makedirs(directorio, exist_ok=True)
+    
+        if os.path.exists(self._ruta_indice):
+            with open(self._ruta_indice, 'r') as f:
+                self.indice = json.load(f)
+            if self.indice['version'] != VERSION_INDICE:
+                raise ValueError(f"Versión de índice no soportada: {self.indice['version']}")
+        else:
+            self.indice = {'version': VERSION_INDICE, 'n_caracteristicas': None,
+                           'n_filas': 0, 'fragmentos': [], 'parametros': None}
+
+    def __len__(self):
+        return self.indice['n_filas']
+
+    @property
+    def n_caracteristicas(self):
+        return self.indice['n_caracteristicas']
+
+    @property
+    def fragmentos(self):
+        return self.indice['fragmentos']
+
+    def escribir_indice(self):
+        """
+        Reescribe indice.json de forma atómica con los fragmentos agregados hasta ahora
+        """
+        temporal = self._ruta_indice + '.tmp'
+        with open(temporal, 'w') as f:
+            json.dump(self.indice, f, indent=2)
+        os.replace(temporal, self._ruta_indice)
+
+    def agregar(self, caracteristicas, etiquetas, origen=None, parametros=None, escribir_indice=True):
+        """
+        Anexa filas al almacén en uno o más fragmentos nuevos
+    
+        Cada llamada crea al menos un fragmento: para no generar fragmentos pequeños, las
+        filas que llegan por bloques se acumulan antes (ver agregar_registro).
+    
+        Args:
+            caracteristicas: Array (n, n_caracteristicas)
+            etiquetas: Array (n,) con 0=interictal, 1=ictal
+            origen: Texto opcional que identifica de dónde vienen las filas
+            parametros: Parámetros de extracción (parametros_extraccion); deben coincidir
+                        con los del almacén si ya tiene datos
+            escribir_indice: Si False, los fragmentos solo quedan en el índice después
+                             de llamar a escribir_indice()
+    
+        Returns:
+            int: Número total de filas del almacén
+        """
+        caracteristicas = np.asarray(caracteristicas, dtype=np.float64)
+        etiquetas = np.asarray(etiquetas)
+        if parametros is not None:
+            parametros = json.loads(json.dumps(parametros))  # Misma forma que al releer el índice
+        if caracteristicas.ndim != 2 or len(caracteristicas) != len(etiquetas):
+            raise ValueError("Se esperaban características (n, k) y etiquetas (n,)")
+    
+        if self.indice['n_caracteristicas'] is None:
+            self.indice['n_caracteristicas'] = int(caracteristicas.shape[1])
+            self.indice['parametros'] = parametros
+        elif caracteristicas.shape[1] != self.indice['n_caracteristicas']:
+            raise ValueError(f"El almacén tiene {self.indice['n_caracteristicas']} características, "
+                             f"se recibieron {caracteristicas.shape[1]}")
+        elif parametros is not None and self.indice['parametros'] not in (None, parametros):
+            raise ValueError("Los parámetros de extracción no coinciden con los del almacén")
+    
+        for inicio in range(0, len(etiquetas), self.filas_por_fragmento):
+            fin = min(inicio + self.filas_por_fragmento, len(etiquetas))
+            nombre = f"fragmento_{len(self.fragmentos):06d}"
+            np.save(os.path.join(self.directorio, nombre + '_X.npy'), caracteristicas[inicio:fin])
+            np.save(os.path.join(self.directorio, nombre + '_y.npy'), etiquetas[inicio:fin].astype(np.int8))
+    
+            self.fragmentos.append({'nombre': nombre, 'inicio': self.indice['n_filas'],
+                                    'n_filas': fin - inicio, 'origen': origen})
+            self.indice['n_filas'] += fin - inicio
+    
+        if escribir_indice:
+            self.escribir_indice()
+        return len(self)
+
+    def leer_fragmento(self, i):
+        """
+        Abre un fragmento con memory-map
+    
+        Returns:
+            tuple: (caracteristicas, etiquetas) de solo lectura
+        """
+        nombre = self.fragmentos[i]['nombre']
+        return (np.load(os.path.join(self.directorio, nombre + '_X.npy'), mmap_mode='r'),
+                np.load(os.path.join(self.directorio, nombre + '_y.npy'), mmap_mode='r'))
+
+    def iterar(self, orden=None):
+        """
+        Recorre los fragmentos en el orden dado (default: en orden de escritura)
+    
+        Yields:
+            tuple: (indice_fragmento, caracteristicas, etiquetas)
+        """
+        for i in (range(len(self.fragmentos)) if orden is None else orden):
+            X, y = self.leer_fragmento(i)
+            yield i, X, y
+
+    def cargar(self):
+        """
+        Carga todo el almacén en memoria (solo para conjuntos pequeños)
+    
+        Returns:
+            tuple: (caracteristicas, etiquetas)
+        """
+        if not self.fragmentos:
+            return np.empty((0, self.n_caracteristicas or 0)), np.empty(0, dtype=int)
+        partes = [(np.asarray(X), np.asarray(y, dtype=int)) for _, X, y in self.iterar()]
+        return np.vstack([X for X, _ in partes]), np.concatenate([y for _, y in partes])
+
+def agregar_registro(almacen, filepath, tamano_bloque=TAMANO_BLOQUE, modo_canales='aplanar',
+                     fs_objetivo=FS_OBJETIVO):
+    """
+    Extrae las características de un archivo .mat por bloques y las anexa al almacén
+    
+    Ni los datos crudos ni la matriz de características completa pasan por memoria:
+    las características de cada bloque de eventos se acumulan hasta completar
+    almacen.filas_por_fragmento filas y entonces se escribe el fragmento. El índice se
+    escribe una sola vez, al terminar el registro.
+    
+    Args:
+        almacen: AlmacenCaracteristicas
+        filepath: Ruta al archivo .mat
+        tamano_bloque: Eventos por bloque
+        modo_canales: Combinación de canales para datos multicanal (ver combinar_canales)
+        fs_objetivo: Frecuencia con la que se calculan las características (los bloques
+                     de registros con otra fs se remuestrean al leerlos)
+    
+    Returns:
+        int: Filas agregadas
+    """
+    data_ictal, data_interictal, fs = cargar_registro(filepath)
+    data_ictal, fs_caracteristicas = adaptar_frecuencia(data_ictal, fs, fs_objetivo)
+    data_interictal, _ = adaptar_frecuencia(data_interictal, fs, fs_objetivo)
+    parametros = parametros_extraccion(fs_caracteristicas, modo_canales)
+    pendientes_X, pendientes_y = [], []
+    n_pendientes = 0
+    n_agregadas = 0
+
+    def escribir_pendientes(n_filas):
+        # Escribe las primeras n_filas acumuladas y conserva el resto
+        nonlocal pendientes_X, pendientes_y, n_pendientes
+        X = np.concatenate(pendientes_X)
+        y = np.concatenate(pendientes_y)
+        almacen.agregar(X[:n_filas], y[:n_filas], origen=filepath, parametros=parametros,
+                        escribir_indice=False)
+        pendientes_X, pendientes_y = [X[n_filas:]], [y[n_filas:]]
+        n_pendientes = len(y) - n_filas
+    
+    for datos, etiqueta in ((data_ictal, 1), (data_interictal, 0)):
+        for _, bloque in iterar_bloques(datos, tamano_bloque):
+            pendientes_X.append(extraer_caracteristicas_eventos(bloque, fs_caracteristicas, modo_canales))
+            pendientes_y.append(np.full(len(bloque), etiqueta))
+            n_pendientes += len(bloque)
+            n_agregadas += len(bloque)
+            if n_pendientes >= almacen.filas_por_fragmento:
+                # Solo fragmentos completos; el resto espera al siguiente bloque
+                escribir_pendientes(n_pendientes - n_pendientes % almacen.filas_por_fragmento)
+    
+    if n_pendientes:
+        escribir_pendientes(n_pendientes)
+    almacen.escribir_indice()
+    return n_agregadas
+
+def _mascara_prueba(indice_fragmento, n_filas, fraccion_prueba, random_state):
+    # Partición entrenamiento/prueba determinista por fragmento (la misma en todas las pasadas)
+    rng = np.random.default_rng((random_state, indice_fragmento))
+    return rng.random(n_filas) < fraccion_prueba
+
+def _acumular_muestra(muestra, X, y, k, rng):
+    # Muestra uniforme de a lo sumo k filas por clase en una sola pasada: cada fila recibe
+    # una clave aleatoria y se conservan las k claves menores de cada clase.
+    # muestra: {clase: (claves, filas, filas vistas de la clase)}
+    for clase in np.unique(y).tolist():
+        filas = X[y == clase]
+        claves = rng.random(len(filas))
+        n_vistas = len(filas)
+        if clase in muestra:
+            claves = np.concatenate([muestra[clase][0], claves])
+            filas = np.vstack([muestra[clase][1], filas])
+            n_vistas += muestra[clase][2]
+        if len(claves) > k:
+            seleccion = np.argpartition(claves, k)[:k]
+            claves, filas = claves[seleccion], filas[seleccion]
+        muestra[clase] = (claves, filas, n_vistas)
+
+def _puntos_estratificados(muestra, k):
+    # Une las muestras por clase con cuotas proporcionales al número de filas de cada
+    # clase (al menos una por clase) y k filas en total
+    clases = sorted(muestra)
+    disponibles = np.array([len(muestra[clase][0]) for clase in clases])
+    conteos = np.array([muestra[clase][2] for clase in clases], dtype=float)
+    k = min(k, int(disponibles.sum()))
+    proporcion = k * conteos / conteos.sum()
+    cuotas = np.minimum(np.maximum(np.floor(proporcion).astype(int), 1), disponibles)
+    while cuotas.sum() < k:
+        faltante = np.where(cuotas < disponibles, proporcion - cuotas, -np.inf)
+        cuotas[np.argmax(faltante)] += 1
+    while cuotas.sum() > k:
+        cuotas[np.argmax(cuotas)] -= 1
+    partes = []
+    for clase, cuota in zip(clases, cuotas):
+        claves, filas, _ = muestra[clase]
+        partes.append(filas[np.argsort(claves)[:cuota]])
+    return np.vstack(partes)
+
+def _lotes_mezclados(almacen, rng, fragmentos_por_lote, fraccion_prueba, random_state):
+    # Une varios fragmentos elegidos al azar y mezcla sus filas: los fragmentos suelen
+    # contener una sola clase (los eventos ictal y los interictal se agregan por separado)
+    orden = rng.permutation(len(almacen.fragmentos))
+    for inicio in range(0, len(orden), fragmentos_por_lote):
+        partes_X, partes_y = [], []
+        for i, X, y in almacen.iterar(orden[inicio:inicio + fragmentos_por_lote]):
+            entrenamiento = ~_mascara_prueba(i, len(y), fraccion_prueba, random_state)
+            partes_X.append(np.asarray(X)[entrenamiento])
+            partes_y.append(np.asarray(y)[entrenamiento])
+        X = np.vstack(partes_X)
+        y = np.concatenate(partes_y)
+        permutacion = rng.permutation(len(y))
+        yield X[permutacion], y[permutacion]
+
+def entrenar_incremental(almacen, modo='rff', n_componentes=500, C=1.0, gamma=None, n_epocas=5,
+                         fraccion_prueba=0.2, fragmentos_por_lote=4, random_state=42):
+    """
+    Entrena un SVM lineal o con kernel RBF aproximado recorriendo el almacén por fragmentos
+    
+    1. Ajusta un StandardScaler con partial_fit sobre las filas de entrenamiento.
+    2. Ajusta el mapa del kernel: RBFSampler no depende de los datos; Nystroem usa
+       n_componentes filas de entrenamiento muestreadas de todos los fragmentos,
+       estratificadas por etiqueta (los fragmentos suelen tener una sola clase).
+    3. Entrena SGDClassifier (pérdida hinge, alpha = 1/(C·n)) con partial_fit durante
+       n_epocas, mezclando filas de varios fragmentos en cada lote.
+    4. Evalúa sobre las filas de prueba acumulando la matriz de confusión.
+    
+    La memoria usada es proporcional a fragmentos_por_lote × filas_por_fragmento.
+    
+    Args:
+        almacen: AlmacenCaracteristicas con datos
+        modo: 'lineal', 'rff' o 'nystroem'
+        n_componentes: Dimensión del mapa aproximado del kernel
+        C: Parámetro de regularización (equivalente al del SVC)
+        gamma: Parámetro del kernel RBF (default: 1/n_caracteristicas, el 'scale' de SVC
+               sobre datos normalizados)
+        n_epocas: Pasadas sobre el almacén
+        fraccion_prueba: Proporción de filas de cada fragmento reservadas para prueba
+        fragmentos_por_lote: Fragmentos que se mezclan en cada lote de partial_fit
+        random_state: Semilla para reproducibilidad
+    
+    Returns:
+        tuple: (resultados, clf, scaler) como classify.clasificar_datos
+    """
+    if len(almacen) == 0:
+        raise ValueError("El almacén está vacío")
+    if modo not in ('lineal', 'rff', 'nystroem'):
+        raise ValueError(f"Modo desconocido: {modo!r} (opciones: 'lineal', 'rff', 'nystroem')")
+    
+    inicio = time.perf_counter()
+    print("=" * 60)
+    print(f"ENTRENAMIENTO INCREMENTAL ({modo})")
+    print("=" * 60)
+    print(f"\nAlmacén: {len(almacen)} filas en {len(almacen.fragmentos)} fragmentos")
+    
+    # 1. Normalización en línea (solo filas de entrenamiento); en modo nystroem, en la
+    # misma pasada se toma la muestra de puntos de referencia por clase
+    scaler = StandardScaler()
+    n_train = 0
+    muestra = {}
+    rng_muestra = np.random.default_rng(random_state)
+    for i, X, y in almacen.iterar():
+        entrenamiento = ~_mascara_prueba(i, len(y), fraccion_prueba, random_state)
+        if entrenamiento.any():
+            X_train = np.asarray(X)[entrenamiento]
+            scaler.partial_fit(X_train)
+            n_train += int(entrenamiento.sum())
+            if modo == 'nystroem':
+                _acumular_muestra(muestra, X_train, np.asarray(y)[entrenamiento], n_componentes, rng_muestra)
+    
+    n_caracteristicas = almacen.n_caracteristicas
+    if gamma is None:
+        gamma = 1.0 / n_caracteristicas
+    
+    # 2. Mapa del kernel
+    mapa = None
+    if modo == 'rff':
+        mapa = RBFSampler(gamma=gamma, n_components=n_componentes, random_state=random_state)
+        mapa.fit(np.zeros((1, n_caracteristicas)))
+    elif modo == 'nystroem':
+        puntos = scaler.transform(_puntos_estratificados(muestra, n_componentes))
+        mapa = Nystroem(kernel='rbf', gamma=gamma, n_components=len(puntos), random_state=random_state)
+        mapa.fit(puntos)
+
+    def transformar(X):
+        X = scaler.transform(X)
+        return mapa.transform(X) if mapa is not None else X
+    
+    # 3. SGD por lotes mezclados
+    sgd = SGDClassifier(loss='hinge', alpha=1.0 / (C * n_train), random_state=random_state)
+    rng = np.random.default_rng(random_state)
+    clases = np.array([0, 1])
+    for epoca in range(n_epocas):
+        for X, y in _lotes_mezclados(almacen, rng, fragmentos_por_lote, fraccion_prueba, random_state):
+            if len(y):
+                sgd.partial_fit(transformar(X), y, classes=clases)
+        print(f"  Época {epoca + 1}/{n_epocas}")
+    
+    clf = make_pipeline(mapa, sgd) if mapa is not None else sgd
+    tiempo_entrenamiento = time.perf_counter() - inicio
+    
+    # 4. Evaluación en las filas de prueba
+    cm = np.zeros((2, 2), dtype=int)
+    for i, X, y in almacen.iterar():
+        prueba = _mascara_prueba(i, len(y), fraccion_prueba, random_state)
+        if prueba.any():
+            y_test = np.asarray(y)[prueba]
+            y_pred = clf.predict(scaler.transform(np.asarray(X)[prueba]))
+            cm += confusion_matrix(y_test, y_pred, labels=[0, 1])
+    
+    n_test = int(cm.sum())
+    accuracy = float(np.trace(cm) / n_test) if n_test else 0.0
+    # Reporte a partir de la matriz de confusión (sin guardar todas las predicciones)
+    y_test_cm = np.repeat([0, 0, 1, 1], cm.ravel())
+    y_pred_cm = np.repeat([0, 1, 0, 1], cm.ravel())
+    report = classification_report(y_test_cm, y_pred_cm, labels=[0, 1],
+                                   target_names=['Interictal', 'Ictal'],
+                                   output_dict=True, zero_division=0)
+    
+    print(f"\nPrecisión (Accuracy): {accuracy:.4f} ({accuracy*100:.2f}%)")
+    print(f"Tiempo de entrenamiento: {tiempo_entrenamiento:.2f} s")
+    print("\nMatriz de Confusión:")
+    print("                Predicción")
+    print("              Interictal  Ictal")
+    print(f"Interictal      {cm[0,0]:6d}  {cm[0,1]:4d}")
+    print(f"Ictal           {cm[1,0]:6d}  {cm[1,1]:4d}")
+    
+    resultados = {
+        'accuracy': accuracy,
+        'confusion_matrix': cm.tolist(),
+        'classification_report': report,
+        'n_train': n_train,
+        'n_test': n_test,
+        'n_features': int(n_caracteristicas),
+        'modo': f'incremental_{modo}',
+        'C': float(C),
+        'gamma': float(gamma),
+        'n_epocas': n_epocas,
+        'tiempo_entrenamiento_s': tiempo_entrenamiento
+    }
+    return resultados, clf, scaler
+
+if __name__ == "__main__":
+    # Uso:
+    #   python almacen_caracteristicas.py agregar archivo1.mat [archivo2.mat ...]
+    #   python almacen_caracteristicas.py entrenar [lineal|rff|nystroem]
+    #   python almacen_caracteristicas.py info
+    accion = sys.argv[1] if len(sys.argv) > 1 else 'info'
+    almacen = AlmacenCaracteristicas()
+    
+    if accion == 'agregar':
+        for filepath in sys.argv[2:]:
+            n = agregar_registro(almacen, filepath)
+            print(f"'{filepath}': {n} filas agregadas")
+        print(f"Almacén: {len(almacen)} filas en {len(almacen.fragmentos)} fragmentos")
+    elif accion == 'entrenar':
+        modo = sys.argv[2] if len(sys.argv) > 2 else 'rff'
+        resultados, clf, scaler = entrenar_incremental(almacen, modo)
+        with open('resultados_incremental.json', 'w') as f:
+            json.dump(resultados, f, indent=2)
+        print("\nResultados guardados en 'resultados_incremental.json'")
+    else:
+        print(f"Almacén '{almacen.directorio}': {len(almacen)} filas, "
+              f"{almacen.n_caracteristicas} características, {len(almacen.fragmentos)} fragmentos")
@@ -0,0 +1,133 @@
+"""
+Almacén de los datos procesados en archivos .npy separados
+Las características, las etiquetas y las señales de cada clase se guardan sin comprimir
+en archivos independientes que se abren con memory-map, de modo que la clasificación no
+toca las señales y la visualización solo lee del disco los eventos que dibuja
+"""
+
+import json
+import os
+import numpy as np
+from carga_mat import iterar_bloques, TAMANO_BLOQUE
+
+DIRECTORIO_PROCESADOS = 'datos_procesados'
+ARREGLOS = ('caracteristicas', 'etiquetas', 'data_ictal', 'data_interictal')
+ARCHIVO_META = 'meta.json'
+VERSION_META = 1
+
+def ruta_arreglo(nombre, directorio=DIRECTORIO_PROCESADOS):
+    """
+    Ruta del archivo .npy de un arreglo del almacén
+    """
+    return os.path.join(directorio, nombre + '.npy')
+
+def rutas_procesados(nombres=ARREGLOS, directorio=DIRECTORIO_PROCESADOS):
+    """
+    Rutas de los archivos que lee una etapa que usa los arreglos indicados
+    
+    Args:
+        nombres: Arreglos que se leen (subconjunto de ARREGLOS)
+        directorio: Carpeta del almacén
+    
+    Returns:
+        list: Rutas .npy de los arreglos más la del meta.json (forma, dtype y fs)
+    """
+    return [ruta_arreglo(nombre, directorio) for nombre in nombres] + [os.path.join(directorio, ARCHIVO_META)]
+
+def _guardar_arreglo(ruta, datos, dtype=None, tamano_bloque=TAMANO_BLOQUE):
+    # Escribe el .npy por bloques, así una vista perezosa (memmap, HDF5, remuestreo)
+    # no se carga completa en memoria; el archivo final aparece de forma atómica
+    dtype = np.dtype(dtype or datos.dtype)
+    temporal = ruta + '.tmp'
+    salida = np.lib.format.open_memmap(temporal, mode='w+', dtype=dtype, shape=tuple(datos.shape))
+    for inicio, bloque in iterar_bloques(datos, tamano_bloque):
+        salida[inicio:inicio + len(bloque)] = bloque
+    salida.flush()
+    del salida
+    os.replace(temporal, ruta)
+
+def guardar_procesados(caracteristicas, etiquetas, data_ictal, data_interictal, fs,
+                       directorio=DIRECTORIO_PROCESADOS, dtype=None, tamano_bloque=TAMANO_BLOQUE):
+    """
+    Guarda la salida de procesar_datos en el almacén
+    
+    Args:
+        caracteristicas: Array (n_eventos, n_caracteristicas)
+        etiquetas: Array (n_eventos,)
+        data_ictal: Array o vista perezosa (n_eventos, ..., n_muestras)
+        data_interictal: Array o vista perezosa con la misma forma por evento
+        fs: Frecuencia de muestreo de las señales
+        directorio: Carpeta del almacén (se crea si no existe)
+        dtype: Tipo de las señales en disco (default: el de los datos)
+        tamano_bloque: Eventos que se copian a la vez
+    
+    Returns:
+        dict: Metadatos escritos en meta.json
+    """
+    os.makedirs(directorio, exist_ok=True)
+    arreglos = {'caracteristicas': (np.asarray(caracteristicas), None),
+                'etiquetas': (np.asarray(etiquetas), None),
+                'data_ictal': (data_ictal, dtype),
+                'data_interictal': (data_interictal, dtype)}
+    
+    meta = {'version': VERSION_META, 'fs': float(fs), 'arreglos': {}}
+    for nombre, (datos, tipo) in arreglos.items():
+        _guardar_arreglo(ruta_arreglo(nombre, directorio), datos, tipo, tamano_bloque)
+        meta['arreglos'][nombre] = {'forma': [int(n) for n in datos.shape],
+                                    'dtype': np.dtype(tipo or datos.dtype).str}
+    
+    # El meta.json se escribe al final: si existe, todos los arreglos están completos
+    ruta_meta = os.path.join(directorio, ARCHIVO_META)
+    with open(ruta_meta + '.tmp', 'w') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(ruta_meta + '.tmp', ruta_meta)
+    return meta
+
+class DatosProcesados:
+    """
+    Acceso perezoso al almacén con la misma interfaz que el .npz de np.load
+    
+    datos['caracteristicas'], datos['data_ictal'], ... abren el .npy correspondiente con
+    memory-map la primera vez que se piden; datos['fs'] y forma() solo leen meta.json.
+    """
+
+    def __init__(self, directorio=DIRECTORIO_PROCESADOS):
+        """
+        Args:
+            directorio: Carpeta escrita por guardar_procesados
+        """
+        self.directorio = directorio
+        with open(os.path.join(directorio, ARCHIVO_META), 'r') as f:
+            self.meta = json.load(f)
+        if self.meta['version'] != VERSION_META:
+            raise ValueError(f"Versión de datos procesados no soportada: {self.meta['version']}")
+        self.fs = self.meta['fs']
+        self._abiertos = {}
+
+    @property
+    def files(self):
+        return list(self.meta['arreglos']) + ['fs']
+
+    def __contains__(self, nombre):
+        return nombre in self.files
+
+    def forma(self, nombre):
+        """
+        Forma de un arreglo sin abrir su archivo
+        """
+        return tuple(self.meta['arreglos'][nombre]['forma'])
+
+    def __getitem__(self, nombre):
+        if nombre == 'fs':
+            return np.float64(self.fs)
+        if nombre not in self.meta['arreglos']:
+            raise KeyError(f"{nombre!r} no está en {self.directorio!r} (opciones: {self.files})")
+        if nombre not in self._abiertos:
+            self._abiertos[nombre] = np.load(ruta_arreglo(nombre, self.directorio), mmap_mode='r')
+        return self._abiertos[nombre]
+
+def cargar_procesados(directorio=DIRECTORIO_PROCESADOS):
+    """
+    Abre el almacén de datos procesados (ver DatosProcesados)
+    """
+    return DatosProcesados(directorio)
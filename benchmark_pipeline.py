@@ -0,0 +1,379 @@
+"""
+Benchmark del pipeline con datos EEG sintéticos a gran escala
+Genera segmentos tipo ictal e interictal, mide tiempo, eventos/s y memoria pico de
+procesar_datos, clasificar_datos y visualizar_segmentos, y guarda los resultados en JSON
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import scipy
+import sklearn
+from scipy import signal
+from carga_mat import TAMANO_BLOQUE
+
+# Los elementos miMATRIX de MATLAB v5 guardan su tamaño en 32 bits
+LIMITE_BYTES_V5 = 2**31 - 1024
+
+ETAPAS = ('procesar_datos', 'clasificar_datos', 'visualizar_segmentos')
+
+# Etapas cuyo trabajo no depende del número de eventos (visualizar_segmentos solo dibuja
+# los primeros eventos): se reportan como costo fijo, sin eventos/s
+ETAPAS_COSTO_FIJO = ('visualizar_segmentos',)
+
+# Por encima de este número de eventos clasificar_datos usa el modo 'nystroem' (lineal en
+# el número de eventos) en lugar del SVC exacto, que no terminaría con 10^6 eventos
+MAX_EVENTOS_SVC_EXACTO = 20000
+
+def generar_eeg_sintetico(n_eventos, n_muestras=500, fs=500.0, ictal=False, semilla=0):
+    """
+    Genera segmentos EEG sintéticos
+    
+    Los interictales son ruido de baja frecuencia (~30 μV) con ritmo alfa; los ictales
+    añaden descargas rítmicas punta-onda de 2.5-4 Hz y alta amplitud (150-300 μV).
+    
+    Args:
+        n_eventos: Número de segmentos
+        n_muestras: Muestras por segmento
+        fs: Frecuencia de muestreo
+        ictal: Si True genera segmentos tipo ictal
+        semilla: Semilla del generador aleatorio
+    
+    Returns:
+        Array (n_eventos, n_muestras)
+    """
+    rng = np.random.default_rng(semilla)
+    tiempo = np.arange(n_muestras) / fs
+    
+    # Ruido de fondo con espectro 1/f aproximado
+    fondo = signal.lfilter([1.0], [1.0, -0.95], rng.normal(0, 1, (n_eventos, n_muestras)), axis=-1)
+    fondo *= 30 / fondo.std(axis=-1, keepdims=True)
+    
+    # Ritmo alfa
+    f_alfa = rng.uniform(8, 12, (n_eventos, 1))
+    fondo += rng.uniform(5, 15, (n_eventos, 1)) * np.sin(
+        2 * np.pi * f_alfa * tiempo + rng.uniform(0, 2 * np.pi, (n_eventos, 1)))
+    
+    if not ictal:
+        return fondo
+    
+    # Descargas punta-onda: fundamental y armónicos en fase
+    fase = 2 * np.pi * rng.uniform(2.5, 4, (n_eventos, 1)) * tiempo + rng.uniform(0, 2 * np.pi, (n_eventos, 1))
+    descarga = np.sin(fase) + 0.5 * np.sin(2 * fase) + 0.25 * np.sin(3 * fase)
+    return fondo + rng.uniform(150, 300, (n_eventos, 1)) / 1.75 * descarga
+
+def _elemento_matriz_v5(nombre, forma):
+    # Cabecera de un miMATRIX double real; los datos (orden de columnas) van a continuación
+    nombre_bytes = nombre.encode('ascii')
+    nombre_relleno = nombre_bytes + b'\0' * (-len(nombre_bytes) % 8)
+    n_bytes_datos = 8 * int(np.prod(forma))
+    subelementos = (struct.pack('<II', 6, 8) + struct.pack('<II', 6, 0)          # flags: mxDOUBLE_CLASS
+                    + struct.pack('<II', 5, 8) + struct.pack('<ii', *forma)     # dimensiones
+                    + struct.pack('<II', 1, len(nombre_bytes)) + nombre_relleno  # nombre
+                    + struct.pack('<II', 9, n_bytes_datos))                      # parte real (miDOUBLE)
+    return struct.pack('<II', 14, len(subelementos) + n_bytes_datos) + subelementos
+
+def _bloques_sinteticos(forma, ictal, fs, semilla, tamano_bloque):
+    # Genera los eventos de una variable por bloques: (inicio, fin, bloque)
+    for i, inicio in enumerate(range(0, forma[0], tamano_bloque)):
+        fin = min(inicio + tamano_bloque, forma[0])
+        yield inicio, fin, generar_eeg_sintetico(fin - inicio, forma[1], fs, ictal,
+                                                 semilla=(semilla, int(ictal), i))
+
+def _escribir_v5(ruta, variables, fs, semilla, tamano_bloque):
+    encabezado = b'MATLAB 5.0 MAT-file, sintetico para benchmark_pipeline.py'
+    with open(ruta, 'wb') as f:
+        f.write(encabezado.ljust(116, b' ') + b'\0' * 8 + struct.pack('<H', 0x0100) + b'IM')
+    
+        offsets = []
+        for nombre, forma in variables:
+            f.write(_elemento_matriz_v5(nombre, forma))
+            offsets.append(f.tell())
+            f.seek(8 * int(np.prod(forma)), os.SEEK_CUR)
+    
+        f.write(_elemento_matriz_v5('Fs', (1, 1)))
+        f.write(struct.pack('<d', fs))
+    
+    for (nombre, forma), offset, ictal in zip(variables, offsets, (True, False)):
+        if forma[0] == 0:
+            continue
+        datos = np.memmap(ruta, dtype='<f8', mode='r+', offset=offset, shape=forma, order='F')
+        for inicio, fin, bloque in _bloques_sinteticos(forma, ictal, fs, semilla, tamano_bloque):
+            datos[inicio:fin] = bloque
+        datos.flush()
+        del datos
+
+def _escribir_v73(ruta, variables, fs, semilla, tamano_bloque):
+    # HDF5 con el bloque de usuario de 512 bytes de MATLAB; los datasets son contiguos
+    # y transpuestos (orden de columnas), así carga_mat los abre con memory-map
+    try:
+        import h5py
+    except ImportError as error:
+        raise ImportError("Se requiere h5py para escribir archivos MATLAB v7.3: "
+                          "pip install h5py") from error
+    
+    with h5py.File(ruta, 'w', userblock_size=512) as archivo:
+        for (nombre, forma), ictal in zip(variables, (True, False)):
+            dataset = archivo.create_dataset(nombre, shape=forma[::-1], dtype='<f8')
+            dataset.attrs['MATLAB_class'] = np.bytes_('double')
+            for inicio, fin, bloque in _bloques_sinteticos(forma, ictal, fs, semilla, tamano_bloque):
+                dataset[:, inicio:fin] = bloque.T
+        archivo.create_dataset('Fs', data=np.full((1, 1), fs)).attrs['MATLAB_class'] = np.bytes_('double')
+    
+    encabezado = b'MATLAB 7.3 MAT-file, sintetico para benchmark_pipeline.py'
+    with open(ruta, 'r+b') as f:
+        f.write(encabezado.ljust(116, b' ') + b'\0' * 8 + struct.pack('<H', 0x0200) + b'IM')
+
+def escribir_mat_sintetico(ruta, n_ictal, n_interictal, n_muestras=500, fs=500.0, semilla=0,
+                           tamano_bloque=TAMANO_BLOQUE, formato='auto'):
+    """
+    Escribe un archivo .mat sin comprimir con Data_ictal, Data_interictal y Fs
+    
+    Los eventos se generan y escriben por bloques, por lo que el archivo puede ser
+    mayor que la memoria disponible. El formato v5 limita cada variable a 2 GB; con
+    formato='auto' se usa v7.3 (HDF5, requiere h5py) cuando alguna variable lo supera,
+    p. ej. 10^6 eventos de 500 muestras.
+    
+    Args:
+        ruta: Ruta del archivo .mat de salida
+        n_ictal: Número de eventos ictal
+        n_interictal: Número de eventos interictal
+        n_muestras: Muestras por evento
+        fs: Frecuencia de muestreo
+        semilla: Semilla del generador aleatorio
+        tamano_bloque: Eventos generados a la vez
+        formato: 'auto', '5' o '7.3'
+    
+    Returns:
+        str: Ruta del archivo
+    """
+    variables = [('Data_ictal', (n_ictal, n_muestras)), ('Data_interictal', (n_interictal, n_muestras))]
+    supera_v5 = [nombre for nombre, forma in variables if 8 * int(np.prod(forma)) > LIMITE_BYTES_V5]
+    if formato == 'auto':
+        formato = '7.3' if supera_v5 else '5'
+    
+    if formato == '5':
+        if supera_v5:
+            raise ValueError(f"{', '.join(supera_v5)} supera el límite de 2 GB por variable de "
+                             "MATLAB v5; use formato='7.3'")
+        _escribir_v5(ruta, variables, fs, semilla, tamano_bloque)
+    elif formato == '7.3':
+        _escribir_v73(ruta, variables, fs, semilla, tamano_bloque)
+    else:
+        raise ValueError(f"Formato .mat no soportado: {formato!r} (opciones: 'auto', '5', '7.3')")
+    
+    return ruta
+
+def _medir(funcion, medir_memoria=True):
+    # Ejecuta funcion() y devuelve (resultado, métricas de tiempo y memoria).
+    # El tiempo se mide sin tracemalloc, que ralentiza cada asignación; la memoria pico
+    # de Python se mide en una segunda ejecución. tracemalloc no ve a los procesos de
+    # extracción, cuyo RSS máximo se toma de RUSAGE_CHILDREN (máximo acumulado de los
+    # procesos hijos terminados hasta el momento)
+    t_pared, t_cpu = time.perf_counter(), time.process_time()
+    resultado = funcion()
+    t_pared, t_cpu = time.perf_counter() - t_pared, time.process_time() - t_cpu
+    
+    pico = None
+    if medir_memoria:
+        del resultado
+        tracemalloc.start()
+        try:
+            resultado = funcion()
+            _, pico = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    
+    return resultado, {
+        'tiempo_s': t_pared,
+        'cpu_s': t_cpu,
+        'memoria_pico_mb': pico / 2**20 if pico is not None else None,
+        'rss_max_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'rss_max_trabajadores_mb': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    }
+
+def _commit_actual():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)),
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def ejecutar_benchmark(tamanos, n_muestras=500, fs=500.0, etapas=ETAPAS, n_procesos=1,
+                       fraccion_ictal=0.4, semilla=0, max_eventos_exacto=MAX_EVENTOS_SVC_EXACTO,
+                       medir_memoria=True):
+    """
+    Mide cada etapa del pipeline para cada número de eventos
+    
+    Las etapas se ejecutan en un directorio temporal para no sobrescribir los
+    artefactos del proyecto. Con medir_memoria cada etapa se ejecuta dos veces: una
+    para el tiempo y otra con tracemalloc para la memoria pico.
+    
+    Args:
+        tamanos: Lista con el número total de eventos de cada corrida
+        n_muestras: Muestras por evento
+        fs: Frecuencia de muestreo
+        etapas: Etapas a medir (subconjunto de ETAPAS)
+        n_procesos: Procesos para la extracción de características
+        fraccion_ictal: Proporción de eventos ictal
+        semilla: Semilla del generador aleatorio
+        max_eventos_exacto: Eventos a partir de los cuales clasificar_datos usa el modo
+                            'nystroem' en lugar del SVC exacto (el modo queda en el resultado)
+        medir_memoria: Si False solo se mide el tiempo (una ejecución por etapa)
+    
+    Returns:
+        dict: Metadatos del entorno y lista de resultados por tamaño y etapa
+    """
+    from process_eeg import procesar_datos
+    from classify import clasificar_datos
+    from visualize_signals import visualizar_segmentos
+    
+    resultados = []
+    directorio_original = os.getcwd()
+    with tempfile.TemporaryDirectory() as directorio:
+        os.chdir(directorio)
+        try:
+            for n_eventos in tamanos:
+                n_ictal = int(round(n_eventos * fraccion_ictal))
+                n_interictal = n_eventos - n_ictal
+                print(f"\n--- {n_eventos} eventos ({n_ictal} ictal, {n_interictal} interictal) ---")
+    
+                ruta_mat = escribir_mat_sintetico('sintetico.mat', n_ictal, n_interictal,
+                                                  n_muestras, fs, semilla)
+    
+                # procesar_datos siempre se ejecuta: las demás etapas usan su salida
+                (matriz, etiquetas, data_ictal, data_interictal, fs_archivo), metricas = _medir(
+                    lambda: procesar_datos(ruta_mat, n_procesos=n_procesos), medir_memoria)
+                medidas = {'procesar_datos': metricas}
+    
+                if 'clasificar_datos' in etapas:
+                    modo = 'exacto' if n_eventos <= max_eventos_exacto else 'nystroem'
+                    _, medidas['clasificar_datos'] = _medir(
+                        lambda: clasificar_datos(matriz, etiquetas, modo=modo, comparar=False),
+                        medir_memoria)
+                    medidas['clasificar_datos']['modo'] = modo
+                if 'visualizar_segmentos' in etapas:
+                    _, medidas['visualizar_segmentos'] = _medir(
+                        lambda: visualizar_segmentos(data_ictal, data_interictal, fs_archivo),
+                        medir_memoria)
+    
+                for etapa, metricas in medidas.items():
+                    if etapa not in etapas:
+                        continue
+                    metricas.update({
+                        'etapa': etapa,
+                        'n_eventos': n_eventos,
+                        'n_muestras': n_muestras,
+                        'costo_fijo': etapa in ETAPAS_COSTO_FIJO,
+                        'eventos_por_s': (n_eventos / metricas['tiempo_s']
+                                          if metricas['tiempo_s'] > 0 and etapa not in ETAPAS_COSTO_FIJO
+                                          else None)
+                    })
+                    resultados.append(metricas)
+    
+                del matriz, etiquetas, data_ictal, data_interictal
+                os.remove(ruta_mat)
+        finally:
+            os.chdir(directorio_original)
+    
+    return {
+        'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': _commit_actual(),
+        'entorno': {
+            'python': sys.version.split()[0],
+            'plataforma': platform.platform(),
+            'n_cpus': os.cpu_count(),
+            'numpy': np.__version__,
+            'scipy': scipy.__version__,
+            'scikit-learn': sklearn.__version__
+        },
+        'parametros': {'n_muestras': n_muestras, 'fs': fs, 'n_procesos': n_procesos,
+                       'fraccion_ictal': fraccion_ictal, 'semilla': semilla,
+                       'max_eventos_exacto': max_eventos_exacto, 'medir_memoria': medir_memoria},
+        'resultados': resultados
+    }
+
+def comparar_resultados(ruta_base, ruta_nueva, tolerancia=0.10):
+    """
+    Compara dos archivos de resultados y reporta las regresiones de rendimiento
+    
+    Args:
+        ruta_base: JSON de referencia (p. ej. de un commit anterior)
+        ruta_nueva: JSON a evaluar
+        tolerancia: Aumento relativo de tiempo o memoria a partir del cual se reporta
+    
+    Returns:
+        list: Regresiones encontradas (etapa, n_eventos, métrica, base, nuevo, cambio)
+    """
+    with open(ruta_base, 'r') as f:
+        base = {(r['etapa'], r['n_eventos']): r for r in json.load(f)['resultados']}
+    with open(ruta_nueva, 'r') as f:
+        nuevos = json.load(f)['resultados']
+    
+    regresiones = []
+    for r in nuevos:
+        referencia = base.get((r['etapa'], r['n_eventos']))
+        if referencia is None:
+            continue
+        for metrica in ('tiempo_s', 'memoria_pico_mb'):
+            if referencia.get(metrica) and r.get(metrica) is not None:
+                cambio = r[metrica] / referencia[metrica] - 1
+                if cambio > tolerancia:
+                    regresiones.append({'etapa': r['etapa'], 'n_eventos': r['n_eventos'],
+                                        'metrica': metrica, 'base': referencia[metrica],
+                                        'nuevo': r[metrica], 'cambio': cambio})
+    return regresiones
+
+def imprimir_resultados(reporte):
+    print("\n" + "=" * 110)
+    print(f"{'Etapa':<30}{'Eventos':>10}{'Tiempo (s)':>12}{'CPU (s)':>10}"
+          f"{'Eventos/s':>14}{'Pico (MB)':>12}{'RSS hijos (MB)':>16}")
+    print("=" * 110)
+    for r in reporte['resultados']:
+        etapa = r['etapa'] + (f" ({r['modo']})" if 'modo' in r else '')
+        eventos_por_s = 'costo fijo' if r.get('costo_fijo') else f"{r['eventos_por_s'] or 0:.1f}"
+        pico = '-' if r.get('memoria_pico_mb') is None else f"{r['memoria_pico_mb']:.1f}"
+        print(f"{etapa:<30}{r['n_eventos']:>10}{r['tiempo_s']:>12.3f}{r['cpu_s']:>10.3f}"
+              f"{eventos_por_s:>14}{pico:>12}{r.get('rss_max_trabajadores_mb', 0):>16.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del pipeline EEG con datos sintéticos")
+    parser.add_argument('--tamanos', type=int, nargs='+', default=[1000, 10000],
+                        help="Número total de eventos de cada corrida")
+    parser.add_argument('--n-muestras', type=int, default=500, help="Muestras por evento")
+    parser.add_argument('--etapas', nargs='+', choices=ETAPAS, default=list(ETAPAS))
+    parser.add_argument('--n-procesos', type=int, default=1,
+                        help="Procesos para la extracción de características")
+    parser.add_argument('--max-eventos-exacto', type=int, default=MAX_EVENTOS_SVC_EXACTO,
+                        help="Eventos a partir de los cuales se clasifica con 'nystroem'")
+    parser.add_argument('--sin-memoria', action='store_true',
+                        help="Solo mide el tiempo (no repite cada etapa con tracemalloc)")
+    parser.add_argument('--salida', default='benchmark_resultados.json')
+    parser.add_argument('--comparar', help="JSON de referencia para detectar regresiones")
+    args = parser.parse_args()
+    
+    reporte = ejecutar_benchmark(args.tamanos, args.n_muestras, etapas=args.etapas,
+                                 n_procesos=args.n_procesos, max_eventos_exacto=args.max_eventos_exacto,
+                                 medir_memoria=not args.sin_memoria)
+    imprimir_resultados(reporte)
+    
+    with open(args.salida, 'w') as f:
+        json.dump(reporte, f, indent=2)
+    print(f"\nResultados guardados en '{args.salida}'")
+    
+    if args.comparar:
+        regresiones = comparar_resultados(args.comparar, args.salida)
+        print(f"\nRegresiones respecto a '{args.comparar}': {len(regresiones)}")
+        for r in regresiones:
+            print(f"  {r['etapa']} ({r['n_eventos']} eventos) {r['metrica']}: "
+                  f"{r['base']:.3f} -> {r['nuevo']:.3f} (+{100 * r['cambio']:.1f}%)")
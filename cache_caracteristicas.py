@@ -0,0 +1,200 @@
+"""
+Caché en disco de matrices de características
+Las entradas se identifican por un hash del archivo de entrada y de los parámetros
+de extracción (bandas, fs, Welch) y se desalojan por LRU al superar un tamaño máximo
+"""
+
+import hashlib
+import json
+import os
+import sys
+import time
+import numpy as np
+
+DIRECTORIO_CACHE = '.cache_caracteristicas'
+TAMANO_MAX_MB = 512
+
+def hash_archivo(filepath, tamano_lectura=1 << 20):
+    """
+    Calcula el SHA-256 del contenido de un archivo leyéndolo por partes
+    
+    Args:
+        filepath: Ruta al archivo
+        tamano_lectura: Bytes leídos por iteración
+    
+    Returns:
+        str: Hash hexadecimal
+    """
+    h = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for parte in iter(lambda: f.read(tamano_lectura), b''):
+            h.update(parte)
+    return h.hexdigest()
+
+class CacheCaracteristicas:
+    """
+    Caché direccionada por contenido de las características de un archivo .mat
+    
+    Cada entrada es un .npz (caracteristicas, etiquetas) con un .json de metadatos.
+    La fecha de modificación del .npz registra el último acceso para el desalojo LRU.
+    """
+
+    def __init__(self, directorio=DIRECTORIO_CACHE, tamano_max_mb=TAMANO_MAX_MB):
+        """
+        Args:
+            directorio: Carpeta donde se guardan las entradas
+            tamano_max_mb: Tamaño máximo total de la caché en MB
+        """
+        self.directorio = directorio
+        self.tamano_max_bytes = int(tamano_max_mb * 1024 * 1024)
+        os.makedirs(directorio, exist_ok=True)
+        self._ruta_huellas = os.path.join(directorio, 'huellas.json')
+
+    def _ruta(self, clave, extension):
+        return os.path.join(self.directorio, f"{clave}{extension}")
+
+    def _hash_archivo(self, filepath):
+        # Reutiliza el hash si el tamaño y la fecha de modificación no cambiaron
+        estado = os.stat(filepath)
+        ruta = os.path.abspath(filepath)
+        huellas = {}
+        if os.path.exists(self._ruta_huellas):
+            with open(self._ruta_huellas, 'r') as f:
+                huellas = json.load(f)
+    
+        huella = huellas.get(ruta)
+        if huella and huella['tamano'] == estado.st_size and huella['mtime_ns'] == estado.st_mtime_ns:
+            return huella['sha256']
+    
+        sha256 = hash_archivo(filepath)
+        huellas[ruta] = {'tamano': estado.st_size, 'mtime_ns': estado.st_mtime_ns, 'sha256': sha256}
+        self._escribir_json(self._ruta_huellas, huellas)
+        return sha256
+
+    @staticmethod
+    def _escribir_json(ruta, datos):
+        temporal = ruta + '.tmp'
+        with open(temporal, 'w') as f:
+            json.dump(datos, f, indent=2)
+        os.replace(temporal, ruta)
+
+    def clave(self, filepath, parametros):
+        """
+        Calcula la clave de una entrada
+    
+        Args:
+            filepath: Ruta al archivo de entrada
+            parametros: Diccionario serializable con los parámetros de extracción
+    
+        Returns:
+            str: Hash hexadecimal del contenido del archivo y de los parámetros
+        """
+        h = hashlib.sha256()
+        h.update(self._hash_archivo(filepath).encode())
+        h.update(json.dumps(parametros, sort_keys=True).encode())
+        return h.hexdigest()
+
+    def obtener(self, clave):
+        """
+        Busca una entrada y marca su acceso
+    
+        Returns:
+            tuple: (caracteristicas, etiquetas) o None si no existe
+        """
+        ruta = self._ruta(clave, '.npz')
+        if not os.path.exists(ruta):
+            return None
+    
+        with np.load(ruta) as datos:
+            resultado = datos['caracteristicas'], datos['etiquetas']
+        os.utime(ruta)
+        return resultado
+
+    def guardar(self, clave, caracteristicas, etiquetas, metadatos=None):
+        """
+        Guarda una entrada y desaloja las menos usadas si se supera el tamaño máximo
+        """
+        temporal = self._ruta(clave, '.tmp.npz')
+        np.savez(temporal, caracteristicas=caracteristicas, etiquetas=etiquetas)
+        os.replace(temporal, self._ruta(clave, '.npz'))
+        self._escribir_json(self._ruta(clave, '.json'), {
+            'creado': time.time(),
+            'forma': list(np.shape(caracteristicas)),
+            'metadatos': metadatos or {}
+        })
+        self.desalojar()
+
+    def listar(self):
+        """
+        Lista las entradas de la caché, de la más reciente a la menos usada
+    
+        Returns:
+            list: Diccionarios con clave, tamano_bytes, ultimo_acceso y metadatos
+        """
+        entradas = []
+        for nombre in os.listdir(self.directorio):
+            if not nombre.endswith('.npz') or nombre.endswith('.tmp.npz'):
+                continue
+            clave = nombre[:-len('.npz')]
+            ruta = self._ruta(clave, '.npz')
+            info = {}
+            if os.path.exists(self._ruta(clave, '.json')):
+                with open(self._ruta(clave, '.json'), 'r') as f:
+                    info = json.load(f)
+            entradas.append({
+                'clave': clave,
+                'tamano_bytes': os.path.getsize(ruta),
+                'ultimo_acceso': os.path.getmtime(ruta),
+                **info
+            })
+    
+        return sorted(entradas, key=lambda e: e['ultimo_acceso'], reverse=True)
+
+    def invalidar(self, clave=None):
+        """
+        Elimina una entrada, o todas si no se indica clave
+    
+        Returns:
+            int: Número de entradas eliminadas
+        """
+        claves = [clave] if clave is not None else [e['clave'] for e in self.listar()]
+        n_eliminadas = 0
+        for c in claves:
+            if os.path.exists(self._ruta(c, '.npz')):
+                os.remove(self._ruta(c, '.npz'))
+                n_eliminadas += 1
+            if os.path.exists(self._ruta(c, '.json')):
+                os.remove(self._ruta(c, '.json'))
+        return n_eliminadas
+
+    def desalojar(self):
+        """
+        Elimina las entradas menos usadas hasta respetar el tamaño máximo
+    
+        Returns:
+            int: Número de entradas eliminadas
+        """
+        entradas = self.listar()
+        total = sum(e['tamano_bytes'] for e in entradas)
+        n_eliminadas = 0
+        while entradas and total > self.tamano_max_bytes:
+            entrada = entradas.pop()
+            total -= entrada['tamano_bytes']
+            n_eliminadas += self.invalidar(entrada['clave'])
+        return n_eliminadas
+
+if __name__ == "__main__":
+    # Uso: python cache_caracteristicas.py [listar | invalidar [clave]]
+    cache = CacheCaracteristicas()
+    accion = sys.argv[1] if len(sys.argv) > 1 else 'listar'
+    
+    if accion == 'invalidar':
+        n = cache.invalidar(sys.argv[2] if len(sys.argv) > 2 else None)
+        print(f"Entradas eliminadas: {n}")
+    else:
+        entradas = cache.listar()
+        print(f"Entradas en '{cache.directorio}': {len(entradas)}")
+        for e in entradas:
+            origen = e.get('metadatos', {}).get('filepath', '?')
+            print(f"  {e['clave'][:16]}  {e['tamano_bytes'] / 1024:8.1f} KB  "
+                  f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(e['ultimo_acceso']))}  {origen}")
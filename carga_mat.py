@@ -0,0 +1,261 @@
+"""
+Capa de carga perezosa para archivos .mat
+Abre archivos MATLAB v5 (memory-map de los arreglos numéricos sin comprimir) y
+v7.3 (HDF5, requiere h5py) sin cargar todas las variables en memoria
+"""
+
+import struct
+import zlib
+import numpy as np
+import scipy.io
+
+# Tipos de dato de MATLAB v5 (miINT8, miUINT8, ...) y su equivalente en NumPy
+TIPOS_MI = {
+    1: 'i1', 2: 'u1', 3: 'i2', 4: 'u2', 5: 'i4',
+    6: 'u4', 7: 'f4', 9: 'f8', 12: 'i8', 13: 'u8'
+}
+MI_MATRIX = 14
+MI_COMPRESSED = 15
+
+# Clases de arreglo numéricas de MATLAB (mxDOUBLE_CLASS ... mxUINT64_CLASS)
+CLASES_NUMERICAS = range(6, 16)
+BANDERA_COMPLEJO = 0x0800
+
+# Filas por bloque al recorrer arreglos grandes
+TAMANO_BLOQUE = 4096
+
+class _VistaHDF5:
+    """
+    Vista perezosa de un dataset HDF5 de MATLAB con los ejes en el orden de MATLAB
+    
+    MATLAB guarda los arreglos en orden de columnas, por lo que h5py los expone
+    transpuestos; esta vista invierte los índices y solo lee lo que se pide.
+    """
+
+    def __init__(self, dataset):
+        self._dataset = dataset
+        self.shape = tuple(reversed(dataset.shape))
+        self.ndim = len(self.shape)
+        self.dtype = dataset.dtype
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, clave):
+        if not isinstance(clave, tuple):
+            clave = (clave,)
+        clave = clave + (slice(None),) * (self.ndim - len(clave))
+        return np.asarray(self._dataset[tuple(reversed(clave))]).T
+
+    def __array__(self, dtype=None, copy=None):
+        datos = np.asarray(self._dataset[()]).T
+        return datos if dtype is None else datos.astype(dtype)
+
+def _leer_etiqueta(buffer, pos, endian):
+    # Devuelve (tipo, n_bytes, inicio_datos, es_formato_corto)
+    tipo, n_bytes = struct.unpack_from(endian + 'II', buffer, pos)
+    if tipo >> 16:
+        # Formato de elemento pequeño: tipo y tamaño en los mismos 4 bytes
+        return tipo & 0xFFFF, tipo >> 16, pos + 4, True
+    return tipo, n_bytes, pos + 8, False
+
+def _siguiente_subelemento(inicio_datos, n_bytes, corto):
+    if corto:
+        return inicio_datos + 4
+    return inicio_datos + n_bytes + (-n_bytes % 8)
+
+def _indexar_v5(filepath):
+    """
+    Recorre los elementos de un archivo .mat v5 sin leer los datos
+    
+    Returns:
+        tuple: (encabezado, endian, dict {nombre: descripción}) donde la descripción
+               indica el offset, dtype y forma de los arreglos que se pueden mapear,
+               o None si la variable requiere scipy.io.loadmat
+    """
+    variables = {}
+    with open(filepath, 'rb') as f:
+        cabecera = f.read(128)
+        endian = '<' if cabecera[126:128] == b'IM' else '>'
+        encabezado = cabecera[:116].decode('latin-1').rstrip(' \x00')
+    
+        pos = 128
+        while True:
+            f.seek(pos)
+            etiqueta = f.read(8)
+            if len(etiqueta) < 8:
+                break
+            tipo, n_bytes = struct.unpack(endian + 'II', etiqueta)
+            siguiente = pos + 8 + n_bytes
+            if tipo == MI_MATRIX:
+                siguiente += -n_bytes % 8
+                # Solo se leen las cabeceras de la matriz (flags, dimensiones, nombre)
+                contenido = f.read(min(n_bytes, 4096))
+                nombre, descripcion = _describir_matriz(contenido, pos + 8, endian)
+                if nombre:
+                    variables[nombre] = descripcion
+            elif tipo == MI_COMPRESSED:
+                # Los datos comprimidos no se pueden mapear: solo se descomprime la
+                # cabecera para conocer el nombre y la variable se lee al pedirla
+                cabecera_matriz = zlib.decompressobj().decompress(f.read(min(n_bytes, 4096)), 4096)
+                if len(cabecera_matriz) >= 8:
+                    nombre, _ = _describir_matriz(cabecera_matriz[8:], 0, endian)
+                    if nombre:
+                        variables[nombre] = None
+            pos = siguiente
+    
+    return encabezado, endian, variables
+
+def _describir_matriz(contenido, offset_archivo, endian):
+    # Subelemento 1: flags del arreglo
+    tipo, n_bytes, inicio, corto = _leer_etiqueta(contenido, 0, endian)
+    flags = struct.unpack_from(endian + 'I', contenido, inicio)[0]
+    clase = flags & 0xFF
+    pos = _siguiente_subelemento(inicio, n_bytes, corto)
+    
+    # Subelemento 2: dimensiones
+    tipo, n_bytes, inicio, corto = _leer_etiqueta(contenido, pos, endian)
+    dims = struct.unpack_from(endian + 'i' * (n_bytes // 4), contenido, inicio)
+    pos = _siguiente_subelemento(inicio, n_bytes, corto)
+    
+    # Subelemento 3: nombre
+    tipo, n_bytes, inicio, corto = _leer_etiqueta(contenido, pos, endian)
+    nombre = bytes(contenido[inicio:inicio + n_bytes]).decode('latin-1')
+    pos = _siguiente_subelemento(inicio, n_bytes, corto)
+    
+    if clase not in CLASES_NUMERICAS or flags & BANDERA_COMPLEJO:
+        return nombre, None
+    
+    # Subelemento 4: parte real, contigua en orden de columnas
+    tipo, n_bytes, inicio, corto = _leer_etiqueta(contenido, pos, endian)
+    if corto or tipo not in TIPOS_MI:
+        return nombre, None
+    
+    dtype = np.dtype(TIPOS_MI[tipo]).newbyteorder(endian)
+    if n_bytes != dtype.itemsize * int(np.prod(dims)):
+        return nombre, None
+    
+    return nombre, {'offset': offset_archivo + inicio, 'dtype': dtype, 'shape': tuple(dims)}
+
+class ArchivoMat:
+    """
+    Archivo .mat abierto de forma perezosa
+    
+    Las variables se obtienen con archivo['Data_ictal'] y son np.memmap (v5 sin
+    comprimir, o v7.3 contiguo), vistas HDF5 que leen bajo demanda (v7.3
+    fragmentado), o arreglos cargados solo para esa variable (v5 comprimido).
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self._cache = {}
+        self._h5 = None
+    
+        version_mayor, _ = scipy.io.matlab.matfile_version(filepath)
+        if version_mayor == 2:
+            self.version = '7.3'
+            try:
+                import h5py
+            except ImportError as error:
+                raise ImportError("Se requiere h5py para leer archivos MATLAB v7.3: "
+                                  "pip install h5py") from error
+            self._h5 = h5py.File(filepath, 'r')
+            self._descripciones = {nombre: None for nombre, objeto in self._h5.items()
+                                   if isinstance(objeto, h5py.Dataset)}
+            with open(filepath, 'rb') as f:
+                self.encabezado = f.read(116).decode('latin-1').rstrip(' \x00')
+        else:
+            self.version = '5' if version_mayor == 1 else '4'
+            if version_mayor == 1:
+                self.encabezado, _, self._descripciones = _indexar_v5(filepath)
+            else:
+                self.encabezado = ''
+                self._descripciones = {nombre: None for nombre, _, _ in scipy.io.whosmat(filepath)}
+
+    def keys(self):
+        return list(self._descripciones.keys())
+
+    def __contains__(self, nombre):
+        return nombre in self._descripciones
+
+    def __getitem__(self, nombre):
+        if nombre not in self._descripciones:
+            raise KeyError(nombre)
+        if nombre not in self._cache:
+            self._cache[nombre] = self._abrir_variable(nombre)
+        return self._cache[nombre]
+
+    def _abrir_variable(self, nombre):
+        if self._h5 is not None:
+            dataset = self._h5[nombre]
+            offset = dataset.id.get_offset()
+            if offset is not None and dataset.chunks is None and dataset.compression is None:
+                # Dataset contiguo: memory-map directo, transpuesto al orden de MATLAB
+                return np.memmap(self.filepath, dtype=dataset.dtype, mode='r',
+                                 offset=offset, shape=dataset.shape).T
+            return _VistaHDF5(dataset)
+    
+        descripcion = self._descripciones[nombre]
+        if descripcion is not None:
+            return np.memmap(self.filepath, dtype=descripcion['dtype'], mode='r',
+                             offset=descripcion['offset'], shape=descripcion['shape'],
+                             order='F')
+    
+        # Variable comprimida o no numérica: cargar solo esta variable
+        return scipy.io.loadmat(self.filepath, variable_names=[nombre])[nombre]
+
+    def close(self):
+        """
+        Cierra el archivo HDF5 subyacente (los memmap siguen siendo válidos)
+        """
+        self._cache.clear()
+        if self._h5 is not None:
+            self._h5.close()
+            self._h5 = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def abrir_mat(filepath):
+    """
+    Abre un archivo .mat (v4, v5 o v7.3) sin cargar sus variables en memoria
+    
+    Args:
+        filepath: Ruta al archivo .mat
+    
+    Returns:
+        ArchivoMat: Acceso perezoso a las variables del archivo
+    """
+    return ArchivoMat(filepath)
+
+def cargar_registro(filepath):
+    """
+    Abre un registro de convulsiones y devuelve sus arreglos de forma perezosa
+    
+    Args:
+        filepath: Ruta al archivo .mat con Data_ictal, Data_interictal y Fs
+    
+    Returns:
+        tuple: (data_ictal, data_interictal, fs) con los datos como vistas perezosas
+    """
+    archivo = abrir_mat(filepath)
+    fs = float(np.asarray(archivo['Fs']).ravel()[0])
+    
+    return archivo['Data_ictal'], archivo['Data_interictal'], fs
+
+def iterar_bloques(datos, tamano_bloque=TAMANO_BLOQUE):
+    """
+    Recorre las filas (eventos) de un arreglo perezoso por bloques
+    
+    Args:
+        datos: Arreglo o vista con los eventos en el primer eje
+        tamano_bloque: Número de filas por bloque
+    
+    Yields:
+        tuple: (inicio, bloque) con el bloque cargado en memoria como ndarray
+    """
+    for inicio in range(0, datos.shape[0], tamano_bloque):
+        yield inicio, np.asarray(datos[inicio:inicio + tamano_bloque])
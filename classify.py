@@ -3,25 +3,133 @@ Script para clasificación de señales EEG usando SVM
 Divide datos en training/testing, entrena el modelo y evalúa rendimiento
 """
 
+import os
+import sys
+import time
 import numpy as np
-from sklearn.model_selection import train_test_split
+from joblib import Parallel, delayed, effective_n_jobs
+from sklearn.model_selection import train_test_split, StratifiedKFold
 from sklearn.svm import SVC
+from sklearn.linear_model import SGDClassifier
+from sklearn.kernel_approximation import Nystroem, RBFSampler
+from sklearn.pipeline import make_pipeline
 from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
+from sklearn.metrics.pairwise import rbf_kernel
+from sklearn.metrics import (accuracy_score, classification_report, confusion_matrix,
+                             precision_recall_fscore_support)
 import json
+from instrumentacion import instrumentar
+from almacen_procesados import cargar_procesados
 
-def clasificar_datos(matriz_caracteristicas, etiquetas, test_size=0.2, random_state=42):
+# 'exacto': SVC RBF; 'nystroem' y 'rff': mapa RBF aproximado + SVM lineal
+MODOS = ('exacto', 'nystroem', 'rff')
+
+# Máximo de eventos de entrenamiento del SVC exacto cuando se usa como referencia
+MAX_EVENTOS_COMPARACION = 20000
+
+# Rejilla por defecto de buscar_hiperparametros
+VALORES_C = (0.1, 1.0, 10.0, 100.0)
+VALORES_GAMMA = ('scale', 0.01, 0.1, 1.0)
+
+# Con kernel_precomputado='auto' la matriz de Gram se precalcula si el pliegue de
+# entrenamiento tiene a lo sumo este número de eventos (10000² float64 = 800 MB)
+MAX_EVENTOS_KERNEL = 10000
+
+# Memoria total para las matrices de Gram que los procesos de la búsqueda tienen a la vez;
+# con kernel precomputado, n_jobs se limita a este presupuesto (ver _n_jobs_kernel)
+MEMORIA_KERNEL = 2 * 2**30
+
+def matriz_eventos(matriz_caracteristicas):
+    """
+    Devuelve la matriz de características con una fila por evento
+    
+    Las características por canal (n_eventos, n_canales, n_caracteristicas) se aplanan
+    canal por canal, igual que combinar_canales(..., 'aplanar').
+    """
+    matriz_caracteristicas = np.asarray(matriz_caracteristicas)
+    if matriz_caracteristicas.ndim > 2:
+        return matriz_caracteristicas.reshape(matriz_caracteristicas.shape[0], -1)
+    return matriz_caracteristicas
+
+def gamma_escala(X):
+    """
+    Valor de gamma='scale' de SVC: 1 / (n_características * varianza de X)
+    
+    Con características normalizadas es aproximadamente 1/n_características.
+    """
+    return 1.0 / (X.shape[1] * X.var())
+
+def crear_clasificador(modo='exacto', gamma='scale', n_componentes=500, random_state=42, n_eventos=None,
+                       C=1.0):
+    """
+    Crea el clasificador del modo indicado
+    
+    Los modos aproximados transforman las características con un mapa explícito del
+    kernel RBF (Nyström o random Fourier features) y entrenan un SVM lineal por descenso
+    de gradiente estocástico, cuyo costo crece linealmente con el número de eventos (el
+    SVC exacto crece entre cuadrática y cúbicamente). La regularización alpha = 1/(C·n)
+    equivale a la del SVC con el mismo C.
+    
+    Args:
+        modo: 'exacto', 'nystroem' o 'rff'
+        gamma: Parámetro del kernel RBF ('scale' solo en modo exacto)
+        n_componentes: Dimensión del mapa aproximado
+        random_state: Semilla para reproducibilidad
+        n_eventos: Eventos de entrenamiento, para fijar alpha (default: alpha=1e-4)
+        C: Parámetro de regularización del SVM
+    
+    Returns:
+        Estimador de scikit-learn con fit/predict/decision_function
+    """
+    if modo == 'exacto':
+        return SVC(kernel='rbf', C=C, gamma=gamma, random_state=random_state)
+    
+    if modo == 'nystroem':
+        mapa = Nystroem(kernel='rbf', gamma=gamma, n_components=n_componentes,
+                        random_state=random_state)
+    elif modo == 'rff':
+        mapa = RBFSampler(gamma=gamma, n_components=n_componentes, random_state=random_state)
+    else:
+        raise ValueError(f"Modo de clasificación desconocido: {modo!r} (opciones: {MODOS})")
+    
+    alpha = 1.0 / (C * n_eventos) if n_eventos else 1e-4
+    return make_pipeline(mapa, SGDClassifier(loss='hinge', alpha=alpha, random_state=random_state))
+
+def _entrenar(clf, X_train, y_train):
+    # Entrena y devuelve el tiempo de entrenamiento en segundos
+    inicio = time.perf_counter()
+    clf.fit(X_train, y_train)
+    return time.perf_counter() - inicio
+
+@instrumentar
+def clasificar_datos(matriz_caracteristicas, etiquetas, test_size=0.2, random_state=42,
+                     modo='exacto', n_componentes=500, comparar=True, C=1.0, gamma='scale',
+                     dtype='float64', ruta_resultados='resultados_clasificacion.json', guardar=True):
     """
     Clasifica los datos usando SVM
     
+    En los modos aproximados ('nystroem', 'rff') también entrena el SVC exacto
+    (sobre a lo sumo MAX_EVENTOS_COMPARACION eventos) y reporta ambas precisiones.
+    
     Args:
-        matriz_caracteristicas: Array (n_eventos, n_caracteristicas)
+        matriz_caracteristicas: Array (n_eventos, n_caracteristicas) o
+                                (n_eventos, n_canales, n_caracteristicas)
         etiquetas: Array (n_eventos,) con etiquetas (0=interictal, 1=ictal)
         test_size: Proporción de datos para testing (default 0.2 = 20%)
         random_state: Semilla para reproducibilidad
+        modo: 'exacto', 'nystroem' o 'rff' (ver crear_clasificador)
+        n_componentes: Dimensión del mapa aproximado del kernel
+        comparar: Si True y el modo es aproximado, entrena también el SVC exacto
+        C: Parámetro de regularización (ver buscar_hiperparametros)
+        gamma: Parámetro del kernel RBF o 'scale'
+        dtype: 'float64' o 'float32' para las características, el scaler y los mapas
+               aproximados del kernel (libsvm y SGDClassifier trabajan internamente en float64)
+        ruta_resultados: JSON donde se guardan los resultados; si ya existe se actualizan
+                         sus claves y se conservan las demás (p. ej. 'busqueda_hiperparametros')
+        guardar: Si False, solo devuelve los resultados sin escribir ruta_resultados
     
     Returns:
-        dict: Diccionario con resultados de la clasificación
+        tuple: (resultados, clf, scaler)
     """
     print("=" * 60)
     print("CLASIFICACIÓN CON SVM")
@@ -29,12 +137,12 @@ def clasificar_datos(matriz_caracteristicas, etiquetas, test_size=0.2, random_st
     
     # Dividir datos en training y testing
     X_train, X_test, y_train, y_test = train_test_split(
-        matriz_caracteristicas, etiquetas, 
+        matriz_eventos(matriz_caracteristicas).astype(dtype, copy=False), etiquetas, 
         test_size=test_size, random_state=random_state, 
         stratify=etiquetas  # Mantener proporción de clases
     )
     
-    print(f"\nDivisión de datos:")
+    print("\nDivisión de datos:")
     print(f"  Training: {X_train.shape[0]} eventos ({100*(1-test_size):.1f}%)")
     print(f"  Testing: {X_test.shape[0]} eventos ({100*test_size:.1f}%)")
     print(f"  Características: {X_train.shape[1]}")
@@ -45,15 +153,42 @@ def clasificar_datos(matriz_caracteristicas, etiquetas, test_size=0.2, random_st
     X_train_scaled = scaler.fit_transform(X_train)
     X_test_scaled = scaler.transform(X_test)
     
+    if gamma == 'scale':
+        gamma = gamma_escala(X_train_scaled)
+    
     # Entrenar clasificador SVM
-    print("Entrenando clasificador SVM...")
-    clf = SVC(kernel='rbf', C=1.0, gamma='scale', random_state=random_state)
-    clf.fit(X_train_scaled, y_train)
+    print(f"Entrenando clasificador SVM (modo {modo})...")
+    clf = crear_clasificador(modo, gamma, min(n_componentes, X_train_scaled.shape[0]), random_state,
+                             n_eventos=X_train_scaled.shape[0], C=C)
+    tiempo_entrenamiento = _entrenar(clf, X_train_scaled, y_train)
+    print(f"  Tiempo de entrenamiento: {tiempo_entrenamiento:.3f} s")
     
     # Predecir en conjunto de testing
     print("Realizando predicciones...")
     y_pred = clf.predict(X_test_scaled)
     
+    comparacion = None
+    if modo != 'exacto' and comparar:
+        # Referencia: SVC exacto sobre una submuestra estratificada si hay demasiados eventos
+        if X_train_scaled.shape[0] > MAX_EVENTOS_COMPARACION:
+            X_ref, _, y_ref, _ = train_test_split(X_train_scaled, y_train,
+                                                  train_size=MAX_EVENTOS_COMPARACION,
+                                                  random_state=random_state, stratify=y_train)
+        else:
+            X_ref, y_ref = X_train_scaled, y_train
+    
+        print(f"Entrenando SVC exacto de referencia ({X_ref.shape[0]} eventos)...")
+        clf_exacto = crear_clasificador('exacto', gamma, random_state=random_state, C=C)
+        tiempo_exacto = _entrenar(clf_exacto, X_ref, y_ref)
+        comparacion = {
+            modo: {'accuracy': float(accuracy_score(y_test, y_pred)),
+                   'tiempo_entrenamiento_s': tiempo_entrenamiento,
+                   'n_train': int(X_train_scaled.shape[0])},
+            'exacto': {'accuracy': float(accuracy_score(y_test, clf_exacto.predict(X_test_scaled))),
+                       'tiempo_entrenamiento_s': tiempo_exacto,
+                       'n_train': int(X_ref.shape[0])}
+        }
+    
     # Calcular métricas
     accuracy = accuracy_score(y_test, y_pred)
     report = classification_report(y_test, y_pred, 
@@ -73,6 +208,12 @@ def clasificar_datos(matriz_caracteristicas, etiquetas, test_size=0.2, random_st
     print(f"Interictal      {cm[0,0]:6d}  {cm[0,1]:4d}")
     print(f"Ictal           {cm[1,0]:6d}  {cm[1,1]:4d}")
     
+    if comparacion:
+        print("\nComparación con el SVC exacto:")
+        for nombre, r in comparacion.items():
+            print(f"  {nombre:<10} accuracy {r['accuracy']:.4f}  "
+                  f"entrenamiento {r['tiempo_entrenamiento_s']:.3f} s ({r['n_train']} eventos)")
+    
     # Preparar resultados para el dashboard
     resultados = {
         'accuracy': float(accuracy),
@@ -82,22 +223,253 @@ def clasificar_datos(matriz_caracteristicas, etiquetas, test_size=0.2, random_st
         'n_test': int(X_test.shape[0]),
         'n_features': int(X_train.shape[1]),
         'y_test': y_test.tolist(),
-        'y_pred': y_pred.tolist()
+        'y_pred': y_pred.tolist(),
+        'modo': modo,
+        'C': float(C),
+        'gamma': float(gamma),
+        'dtype': dtype,
+        'tiempo_entrenamiento_s': tiempo_entrenamiento
     }
+    if comparacion:
+        resultados['comparacion'] = comparacion
     
     # Guardar resultados
-    with open('resultados_clasificacion.json', 'w') as f:
-        json.dump(resultados, f, indent=2)
-    
-    print("\nResultados guardados en 'resultados_clasificacion.json'")
+    if guardar:
+        guardados = {}
+        if os.path.exists(ruta_resultados):
+            with open(ruta_resultados, 'r') as f:
+                guardados = json.load(f)
+        guardados.update(resultados)
+        with open(ruta_resultados, 'w') as f:
+            json.dump(guardados, f, indent=2)
+        print(f"\nResultados guardados en '{ruta_resultados}'")
     
     return resultados, clf, scaler
 
+def preparar_pliegues(matriz_caracteristicas, etiquetas, n_folds=5, random_state=42, dtype='float64'):
+    """
+    Divide los datos en k pliegues estratificados y normaliza cada uno una sola vez
+    
+    El StandardScaler de cada pliegue se ajusta solo con su parte de entrenamiento; los
+    datos transformados se reutilizan en todos los puntos de la rejilla.
+    
+    Args:
+        matriz_caracteristicas: Array (n_eventos, n_caracteristicas) o
+                                (n_eventos, n_canales, n_caracteristicas)
+        etiquetas: Array (n_eventos,)
+        n_folds: Número de pliegues
+        random_state: Semilla para reproducibilidad
+        dtype: 'float64' o 'float32' para los datos normalizados de cada pliegue
+    
+    Returns:
+        list: Un diccionario por pliegue con X_train, y_train, X_test, y_test y gamma_escala
+    """
+    matriz_caracteristicas = matriz_eventos(matriz_caracteristicas).astype(dtype, copy=False)
+    kfold = StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=random_state)
+    pliegues = []
+    for indices_train, indices_test in kfold.split(matriz_caracteristicas, etiquetas):
+        scaler = StandardScaler()
+        X_train = scaler.fit_transform(matriz_caracteristicas[indices_train])
+        pliegues.append({
+            'X_train': X_train,
+            'y_train': etiquetas[indices_train],
+            'X_test': scaler.transform(matriz_caracteristicas[indices_test]),
+            'y_test': etiquetas[indices_test],
+            'gamma_escala': gamma_escala(X_train)
+        })
+    return pliegues
+
+def _metricas(y_test, y_pred):
+    precision, recall, f1, _ = precision_recall_fscore_support(
+        y_test, y_pred, pos_label=1, average='binary', zero_division=0)
+    return {'accuracy': accuracy_score(y_test, y_pred), 'precision': precision,
+            'recall': recall, 'f1': f1}
+
+def calcular_kernels(X_train, X_test, gamma, dtype='float64'):
+    """
+    Matrices de Gram RBF de entrenamiento y de prueba contra entrenamiento
+    
+    Args:
+        X_train: Array (n_train, n_caracteristicas)
+        X_test: Array (n_test, n_caracteristicas)
+        gamma: Parámetro del kernel RBF
+        dtype: 'float64' o 'float32' (cálculo más rápido; libsvm recibe float64)
+    
+    Returns:
+        tuple: (K_train (n_train, n_train), K_test (n_test, n_train)) en float64
+    """
+    X_train = np.asarray(X_train, dtype=dtype)
+    X_test = np.asarray(X_test, dtype=dtype)
+    K_train = rbf_kernel(X_train, gamma=gamma)
+    K_test = rbf_kernel(X_test, X_train, gamma=gamma)
+    # SVC(kernel='precomputed') trabaja en float64: se convierte una vez, no en cada C
+    return K_train.astype(np.float64, copy=False), K_test.astype(np.float64, copy=False)
+
+def _n_jobs_kernel(n_jobs, n_train, n_test, dtype_kernel='float64', memoria=MEMORIA_KERNEL):
+    # Procesos simultáneos cuyas matrices de Gram caben en `memoria`: cada tarea guarda
+    # K_train y K_test en float64 ((n_train + n_test) * n_train valores) y, en float32,
+    # también la copia de cálculo antes de convertirlas
+    itemsize = np.dtype(dtype_kernel).itemsize
+    bytes_valor = 8 + (itemsize if itemsize < 8 else 0)
+    bytes_tarea = (n_train + n_test) * n_train * bytes_valor
+    return max(1, min(effective_n_jobs(n_jobs), int(memoria // bytes_tarea)))
+
+def _evaluar_grupo(pliegue, gamma, valores_C, random_state, kernel_precomputado=False,
+                   dtype_kernel='float64'):
+    # Evalúa todos los C de un gamma en un pliegue; devuelve una lista de métricas por C.
+    # Con kernel precomputado, las matrices de Gram se calculan una vez para todos los C
+    gamma_valor = pliegue['gamma_escala'] if gamma == 'scale' else gamma
+    if kernel_precomputado:
+        inicio = time.perf_counter()
+        X_train, X_test = calcular_kernels(pliegue['X_train'], pliegue['X_test'],
+                                           gamma_valor, dtype_kernel)
+        tiempo_kernel = time.perf_counter() - inicio
+    else:
+        X_train, X_test = pliegue['X_train'], pliegue['X_test']
+        tiempo_kernel = 0.0
+    
+    resultados = []
+    for C in valores_C:
+        if kernel_precomputado:
+            clf = SVC(kernel='precomputed', C=C, random_state=random_state)
+        else:
+            clf = SVC(kernel='rbf', C=C, gamma=gamma_valor, random_state=random_state)
+        tiempo = _entrenar(clf, X_train, pliegue['y_train'])
+        metricas = _metricas(pliegue['y_test'], clf.predict(X_test))
+        # El costo del kernel se reparte entre los C que lo reutilizan
+        metricas['tiempo_entrenamiento_s'] = tiempo + tiempo_kernel / len(valores_C)
+        resultados.append(metricas)
+    return resultados
+
+@instrumentar
+def buscar_hiperparametros(matriz_caracteristicas, etiquetas, valores_C=VALORES_C,
+                           valores_gamma=VALORES_GAMMA, n_folds=5, n_jobs=-1, random_state=42,
+                           ruta_resultados='resultados_clasificacion.json',
+                           kernel_precomputado='auto', dtype_kernel='float64', dtype='float64',
+                           memoria_kernel=MEMORIA_KERNEL):
+    """
+    Búsqueda de C y gamma del SVC RBF con validación cruzada estratificada en paralelo
+    
+    Los pliegues se normalizan una sola vez (preparar_pliegues). Cada tarea evalúa un
+    par (pliegue, gamma) para todos los C y las tareas se reparten entre núcleos con
+    joblib. Los resultados se agregan en `busqueda_hiperparametros` dentro de
+    ruta_resultados, conservando el resto del archivo si ya existe.
+    
+    Con kernel precomputado, cada tarea calcula la matriz de Gram de su (pliegue, gamma)
+    una sola vez y ajusta SVC(kernel='precomputed') para todos los C, evaluando con el
+    kernel cruzado prueba-entrenamiento. Ocupa (n_train + n_test) * n_train valores
+    float64 por tarea y cada proceso tiene su propia matriz, así que la memoria crece con
+    n_jobs: el número de procesos se reduce para que las matrices simultáneas quepan en
+    memoria_kernel. Se cambia paralelismo por memoria; con más presupuesto (o
+    kernel_precomputado=False, que no guarda matrices) se usan más núcleos.
+    
+    Args:
+        matriz_caracteristicas: Array (n_eventos, n_caracteristicas)
+        etiquetas: Array (n_eventos,) con etiquetas (0=interictal, 1=ictal)
+        valores_C: Valores de C a evaluar
+        valores_gamma: Valores de gamma a evaluar ('scale' permitido)
+        n_folds: Número de pliegues
+        n_jobs: Procesos de joblib (-1 = todos los núcleos; con kernel precomputado,
+                a lo sumo los que caben en memoria_kernel)
+        random_state: Semilla para reproducibilidad
+        ruta_resultados: JSON donde se guarda la búsqueda (None para no guardar)
+        kernel_precomputado: True, False o 'auto' (si n_train <= MAX_EVENTOS_KERNEL)
+        dtype_kernel: 'float64' o 'float32' para calcular las matrices de Gram
+        dtype: 'float64' o 'float32' para las características de los pliegues
+        memoria_kernel: Bytes para las matrices de Gram de todos los procesos a la vez
+    
+    Returns:
+        dict: Métricas media/std por configuración y la mejor configuración
+    """
+    print("=" * 60)
+    print("BÚSQUEDA DE HIPERPARÁMETROS (VALIDACIÓN CRUZADA)")
+    print("=" * 60)
+    
+    etiquetas = np.asarray(etiquetas)
+    pliegues = preparar_pliegues(matriz_caracteristicas, etiquetas, n_folds, random_state, dtype)
+    print(f"\n{n_folds} pliegues estratificados, {len(valores_C) * len(valores_gamma)} configuraciones")
+    
+    if kernel_precomputado == 'auto':
+        kernel_precomputado = max(len(p['y_train']) for p in pliegues) <= MAX_EVENTOS_KERNEL
+    if kernel_precomputado:
+        print(f"Kernel precomputado por (pliegue, gamma) en {dtype_kernel}")
+        n_jobs_pedidos = effective_n_jobs(n_jobs)
+        n_jobs = _n_jobs_kernel(n_jobs, max(len(p['y_train']) for p in pliegues),
+                                max(len(p['y_test']) for p in pliegues), dtype_kernel, memoria_kernel)
+        if n_jobs < n_jobs_pedidos:
+            print(f"n_jobs limitado a {n_jobs} (de {n_jobs_pedidos}) por el presupuesto de "
+                  f"{memoria_kernel / 2**20:.0f} MB para las matrices de Gram")
+    
+    tareas = [(i, gamma) for i in range(n_folds) for gamma in valores_gamma]
+    inicio = time.perf_counter()
+    salidas = Parallel(n_jobs=n_jobs)(
+        delayed(_evaluar_grupo)(pliegues[i], gamma, valores_C, random_state,
+                                kernel_precomputado, dtype_kernel)
+        for i, gamma in tareas)
+    tiempo_total = time.perf_counter() - inicio
+    
+    # Agrupar por configuración: {(gamma, C): [métricas de cada pliegue]}
+    por_configuracion = {}
+    for (_, gamma), metricas_C in zip(tareas, salidas):
+        for C, metricas in zip(valores_C, metricas_C):
+            por_configuracion.setdefault((gamma, C), []).append(metricas)
+    
+    configuraciones = []
+    for (gamma, C), lista in por_configuracion.items():
+        configuracion = {'C': float(C), 'gamma': gamma if gamma == 'scale' else float(gamma)}
+        for nombre in lista[0]:
+            valores = np.array([m[nombre] for m in lista])
+            configuracion[f'{nombre}_mean'] = float(valores.mean())
+            configuracion[f'{nombre}_std'] = float(valores.std())
+        configuraciones.append(configuracion)
+    
+    mejor = max(configuraciones, key=lambda c: (c['accuracy_mean'], c['f1_mean'], -c['accuracy_std']))
+    
+    print(f"\n{'C':>8}{'gamma':>10}{'Accuracy':>18}{'F1 ictal':>18}")
+    for c in configuraciones:
+        print(f"{c['C']:>8g}{str(c['gamma']):>10}"
+              f"{c['accuracy_mean']:>10.4f} ± {c['accuracy_std']:.4f}"
+              f"{c['f1_mean']:>10.4f} ± {c['f1_std']:.4f}")
+    print(f"\nMejor configuración: C={mejor['C']:g}, gamma={mejor['gamma']} "
+          f"(accuracy {mejor['accuracy_mean']:.4f} ± {mejor['accuracy_std']:.4f})")
+    print(f"Tiempo total: {tiempo_total:.2f} s")
+    
+    busqueda = {
+        'n_folds': n_folds,
+        'valores_C': [float(C) for C in valores_C],
+        'valores_gamma': [g if g == 'scale' else float(g) for g in valores_gamma],
+        'configuraciones': configuraciones,
+        'mejor': mejor,
+        'kernel_precomputado': bool(kernel_precomputado),
+        'dtype_kernel': dtype_kernel if kernel_precomputado else None,
+        'dtype': dtype,
+        'n_jobs': effective_n_jobs(n_jobs),
+        'tiempo_total_s': tiempo_total
+    }
+    
+    if ruta_resultados:
+        resultados = {}
+        if os.path.exists(ruta_resultados):
+            with open(ruta_resultados, 'r') as f:
+                resultados = json.load(f)
+        resultados['busqueda_hiperparametros'] = busqueda
+        with open(ruta_resultados, 'w') as f:
+            json.dump(resultados, f, indent=2)
+        print(f"\nBúsqueda guardada en '{ruta_resultados}' (clave 'busqueda_hiperparametros')")
+    
+    return busqueda
+
 if __name__ == "__main__":
     # Cargar datos procesados
-    datos = np.load('datos_procesados.npz')
+    # Solo se abren las características y las etiquetas, no las señales
+    datos = cargar_procesados()
     matriz_caracteristicas = datos['caracteristicas']
     etiquetas = datos['etiquetas']
     
-    resultados, clf, scaler = clasificar_datos(matriz_caracteristicas, etiquetas)
+    # Uso: python classify.py [exacto|nystroem|rff|buscar]
+    modo = sys.argv[1] if len(sys.argv) > 1 else 'exacto'
+    if modo == 'buscar':
+        buscar_hiperparametros(matriz_caracteristicas, etiquetas)
+    else:
+        resultados, clf, scaler = clasificar_datos(matriz_caracteristicas, etiquetas, modo=modo)
 
@@ -0,0 +1,150 @@
+"""
+Comparación de precisión float64 vs float32 del pipeline
+Procesa el mismo registro con ambos tipos y reporta la desviación de cada columna de
+características y de los espectrogramas, las métricas de clasificación, el acuerdo entre
+predicciones, los tiempos y la memoria de los arreglos
+"""
+
+import argparse
+import json
+import time
+import numpy as np
+from process_eeg import procesar_datos
+from registro_caracteristicas import CARACTERISTICAS_BASE, CARACTERISTICAS_EXTENDIDAS
+from visualize_signals import calcular_espectrogramas_lote
+from classify import clasificar_datos, matriz_eventos, MODOS
+from modelo import nombres_caracteristicas
+
+DTYPES = ('float64', 'float32')
+
+def extraer(filepath, dtype, caracteristicas, n_espectrogramas):
+    """
+    Extrae características y espectrogramas con la precisión indicada
+    
+    Args:
+        filepath: Ruta al archivo .mat
+        dtype: 'float64' o 'float32'
+        caracteristicas: Nombres de las características del registro
+        n_espectrogramas: Eventos ictales para los que se calcula el espectrograma
+    
+    Returns:
+        dict con la matriz, las etiquetas, los espectrogramas (dB), la forma de los
+        datos y los tiempos de cada etapa
+    """
+    inicio = time.perf_counter()
+    matriz, etiquetas, data_ictal, _, fs = procesar_datos(filepath, caracteristicas=caracteristicas,
+                                                          dtype=dtype)
+    tiempo_caracteristicas = time.perf_counter() - inicio
+    
+    senales = np.asarray(data_ictal[:n_espectrogramas], dtype=dtype)
+    inicio = time.perf_counter()
+    _, _, espectrogramas = calcular_espectrogramas_lote(senales, fs, dtype=dtype)
+    tiempo_espectrogramas = time.perf_counter() - inicio
+    
+    return {'matriz': matriz, 'etiquetas': etiquetas, 'espectrogramas': espectrogramas,
+            'forma_datos': data_ictal.shape, 'fs': fs,
+            'tiempo_caracteristicas_s': tiempo_caracteristicas,
+            'tiempo_espectrogramas_s': tiempo_espectrogramas}
+
+def desviaciones_columnas(referencia, prueba, nombres):
+    """
+    Desviación máxima absoluta y relativa de cada columna de características
+    
+    La desviación relativa se mide respecto al máximo |valor| de la columna en float64,
+    así las columnas con valores cercanos a cero no la inflan.
+    """
+    referencia = matriz_eventos(referencia)
+    prueba = matriz_eventos(prueba).astype(np.float64)
+    diferencia = np.abs(prueba - referencia)
+    escala = np.maximum(np.abs(referencia).max(axis=0), np.finfo(np.float64).tiny)
+    return {nombre: {'max_abs': float(diferencia[:, j].max()),
+                     'max_rel': float(diferencia[:, j].max() / escala[j])}
+            for j, nombre in enumerate(nombres)}
+
+def comparar_precision(filepath, caracteristicas=CARACTERISTICAS_BASE, modo='exacto',
+                       n_espectrogramas=50):
+    """
+    Ejecuta el pipeline en float64 y float32 y compara los resultados
+    
+    Args:
+        filepath: Ruta al archivo .mat
+        caracteristicas: Nombres de las características del registro
+        modo: Modo de clasificación (ver crear_clasificador)
+        n_espectrogramas: Eventos ictales usados para comparar espectrogramas
+    
+    Returns:
+        dict con el reporte (ver guardar en __main__)
+    """
+    salidas = {dtype: extraer(filepath, dtype, caracteristicas, n_espectrogramas) for dtype in DTYPES}
+    ref, f32 = salidas['float64'], salidas['float32']
+    
+    forma = ref['forma_datos']
+    nombres = nombres_caracteristicas(n_canales=forma[1] if len(forma) > 2 else None,
+                                      caracteristicas=caracteristicas)
+    if len(nombres) != matriz_eventos(ref['matriz']).shape[1]:
+        nombres = [f'Columna {j}' for j in range(matriz_eventos(ref['matriz']).shape[1])]
+    
+    predicciones = {}
+    clasificacion = {}
+    for dtype in DTYPES:
+        # Misma partición y modelo que el pipeline, sin sobrescribir resultados_clasificacion.json
+        resultados, _, _ = clasificar_datos(salidas[dtype]['matriz'], salidas[dtype]['etiquetas'],
+                                            modo=modo, comparar=False, dtype=dtype, guardar=False)
+        predicciones[dtype] = np.array(resultados['y_pred'])
+        clasificacion[dtype] = {clave: resultados[clave]
+                                for clave in ('accuracy', 'confusion_matrix', 'tiempo_entrenamiento_s')}
+    
+    return {
+        'archivo': filepath,
+        'caracteristicas': list(caracteristicas),
+        'modo': modo,
+        'desviacion_caracteristicas': desviaciones_columnas(ref['matriz'], f32['matriz'], nombres),
+        'desviacion_espectrograma_db': float(np.abs(
+            f32['espectrogramas'].astype(np.float64) - ref['espectrogramas']).max()),
+        'clasificacion': clasificacion,
+        'acuerdo_predicciones': float(np.mean(predicciones['float64'] == predicciones['float32'])),
+        'rendimiento': {dtype: {'tiempo_caracteristicas_s': salidas[dtype]['tiempo_caracteristicas_s'],
+                                'tiempo_espectrogramas_s': salidas[dtype]['tiempo_espectrogramas_s'],
+                                'bytes_caracteristicas': int(salidas[dtype]['matriz'].nbytes),
+                                'bytes_espectrogramas': int(salidas[dtype]['espectrogramas'].nbytes)}
+                        for dtype in DTYPES},
+    }
+
+def imprimir_reporte(reporte):
+    """
+    Imprime el reporte de comparar_precision en formato de tabla
+    """
+    print("\n" + "=" * 60)
+    print("PRECISIÓN FLOAT32 VS FLOAT64")
+    print("=" * 60)
+    print(f"\n{'Característica':<20} {'Máx. abs':>12} {'Máx. rel':>12}")
+    for nombre, d in reporte['desviacion_caracteristicas'].items():
+        print(f"{nombre:<20} {d['max_abs']:12.3e} {d['max_rel']:12.3e}")
+    print(f"\nEspectrograma: desviación máxima {reporte['desviacion_espectrograma_db']:.3e} dB")
+    
+    print(f"\nClasificación (modo {reporte['modo']}):")
+    for dtype, r in reporte['clasificacion'].items():
+        print(f"  {dtype}: accuracy {r['accuracy']:.4f}  matriz de confusión {r['confusion_matrix']}")
+    print(f"  Acuerdo entre predicciones: {100 * reporte['acuerdo_predicciones']:.2f}%")
+    
+    print(f"\n{'':<10} {'Caract. (s)':>12} {'Espectr. (s)':>13} {'Caract. (B)':>12} {'Espectr. (B)':>13}")
+    for dtype, r in reporte['rendimiento'].items():
+        print(f"{dtype:<10} {r['tiempo_caracteristicas_s']:12.3f} {r['tiempo_espectrogramas_s']:13.3f} "
+              f"{r['bytes_caracteristicas']:12d} {r['bytes_espectrogramas']:13d}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara el pipeline en float64 y float32")
+    parser.add_argument('archivo', nargs='?', default='ArchivoSeizureDetect.mat')
+    parser.add_argument('--extendidas', action='store_true',
+                        help="Usar CARACTERISTICAS_EXTENDIDAS en lugar de las 7 originales")
+    parser.add_argument('--modo', choices=MODOS, default='exacto')
+    parser.add_argument('--salida', default='comparacion_precision.json')
+    args = parser.parse_args()
+    
+    reporte = comparar_precision(args.archivo,
+                                 CARACTERISTICAS_EXTENDIDAS if args.extendidas else CARACTERISTICAS_BASE,
+                                 args.modo)
+    imprimir_reporte(reporte)
+    with open(args.salida, 'w') as f:
+        json.dump(reporte, f, indent=2)
+    print(f"\nReporte guardado en '{args.salida}'")
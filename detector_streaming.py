@@ -0,0 +1,196 @@
+"""
+Detector de convulsiones por ventana deslizante sobre señales EEG continuas
+Recibe bloques de muestras, mantiene un buffer circular y clasifica cada ventana
+con un modelo.Modelo (la misma extracción de características que en el entrenamiento)
+"""
+
+import time
+from collections import deque
+import numpy as np
+
+class DetectorStreaming:
+    """
+    Detector incremental de eventos ictales sobre una señal continua
+
+    La memoria es constante: un buffer circular de (n_canales, ventana) muestras y un
+    lote preallocado de `max_lote` ventanas. El costo de cada bloque es proporcional
+    al número de muestras recibidas (a lo sumo ceil(n / salto) ventanas).
+    """
+
+    def __init__(self, modelo, ventana=None, salto=None, max_lote=64, n_latencias=1000):
+        """
+        Args:
+            modelo: modelo.Modelo; sus fs, n_canales, modo_canales, características y
+                    dtype definen cómo se extraen las características de cada ventana
+            ventana: Muestras por ventana; debe coincidir con la longitud de los
+                     segmentos de entrenamiento (default modelo.n_muestras)
+            salto: Muestras entre el inicio de ventanas consecutivas (default ventana // 2)
+            max_lote: Máximo de ventanas que se clasifican en una sola llamada
+            n_latencias: Número de latencias por bloque que se conservan
+        """
+        if ventana is None:
+            ventana = modelo.n_muestras
+        if ventana is None:
+            raise ValueError("El modelo no indica n_muestras: hay que pasar ventana")
+        if salto is None:
+            salto = ventana // 2
+        if ventana <= 0 or salto <= 0:
+            raise ValueError("ventana y salto deben ser positivos")
+
+        self.modelo = modelo
+        self.fs = modelo.fs
+        self.ventana = int(ventana)
+        self.salto = int(salto)
+        self.max_lote = int(max_lote)
+
+        # Los modelos multicanal reciben bloques (n_canales, n_muestras)
+        self._forma_canales = (modelo.n_canales,) if modelo.n_canales else ()
+        self._buffer = np.zeros(self._forma_canales + (self.ventana,))
+        self._lote = np.empty((self.max_lote,) + self._forma_canales + (self.ventana,))
+        self._fines_lote = np.empty(self.max_lote, dtype=np.int64)
+        self.latencias = deque(maxlen=n_latencias)
+        self.reiniciar()
+
+    def reiniciar(self):
+        """
+        Descarta el estado del buffer para empezar una nueva señal
+        """
+        self._buffer[:] = 0.0
+        self._pos = 0                      # Próxima posición de escritura en el buffer
+        self._n_total = 0                  # Muestras recibidas desde el inicio
+        self._proximo_fin = self.ventana   # Muestra (exclusiva) donde termina la próxima ventana
+        self._n_lote = 0
+        self.latencias.clear()
+
+    def _copiar_ventana(self, destino):
+        # La ventana más reciente termina justo antes de la posición de escritura
+        n_cola = self.ventana - self._pos
+        destino[..., :n_cola] = self._buffer[..., self._pos:]
+        destino[..., n_cola:] = self._buffer[..., :self._pos]
+
+    def _escribir(self, muestras):
+        # Escribe las muestras en el buffer circular; solo se conservan las últimas `ventana`
+        n = muestras.shape[-1]
+        self._n_total += n
+        if n >= self.ventana:
+            self._buffer[:] = muestras[..., n - self.ventana:]
+            self._pos = 0
+            return
+
+        n_cola = min(n, self.ventana - self._pos)
+        self._buffer[..., self._pos:self._pos + n_cola] = muestras[..., :n_cola]
+        self._buffer[..., :n - n_cola] = muestras[..., n_cola:]
+        self._pos = (self._pos + n) % self.ventana
+
+    def _clasificar_lote(self, detecciones, emitir_todas):
+        if self._n_lote == 0:
+            return
+
+        predicciones, puntajes = self.modelo.predecir_senales(self._lote[:self._n_lote])
+
+        for fin, prediccion, puntaje in zip(self._fines_lote[:self._n_lote], predicciones, puntajes):
+            if emitir_todas or prediccion == 1:
+                inicio = int(fin) - self.ventana
+                detecciones.append({
+                    'inicio_muestra': inicio,
+                    'fin_muestra': int(fin),
+                    'tiempo_inicio': inicio / self.fs,
+                    'tiempo_fin': int(fin) / self.fs,
+                    'prediccion': int(prediccion),
+                    'puntaje': float(puntaje)
+                })
+
+        self._n_lote = 0
+
+    def procesar_bloque(self, muestras, emitir_todas=False):
+        """
+        Incorpora un bloque de muestras y clasifica las ventanas que se completan
+
+        Args:
+            muestras: Array 1D con las nuevas muestras de la señal, o (n_canales, n)
+                      si el modelo es multicanal
+            emitir_todas: Si True, devuelve todas las ventanas evaluadas y no solo
+                          las clasificadas como ictales
+
+        Returns:
+            list: Diccionarios con inicio_muestra, fin_muestra, tiempo_inicio,
+                  tiempo_fin, prediccion (1=ictal) y puntaje de cada ventana
+        """
+        t_inicio = time.perf_counter()
+        muestras = np.asarray(muestras, dtype=float)
+        if self._forma_canales:
+            if muestras.ndim != 2 or muestras.shape[0] != self._forma_canales[0]:
+                raise ValueError(f"Se esperaban bloques ({self._forma_canales[0]}, n_muestras), "
+                                 f"se recibió {muestras.shape}")
+        else:
+            muestras = muestras.ravel()
+        n_muestras = muestras.shape[-1]
+        detecciones = []
+
+        i = 0
+        while i < n_muestras:
+            # Avanzar hasta el final de la próxima ventana o el final del bloque
+            n = min(n_muestras - i, self._proximo_fin - self._n_total)
+            self._escribir(muestras[..., i:i + n])
+            i += n
+
+            if self._n_total == self._proximo_fin:
+                self._copiar_ventana(self._lote[self._n_lote])
+                self._fines_lote[self._n_lote] = self._n_total
+                self._n_lote += 1
+                self._proximo_fin += self.salto
+
+                if self._n_lote == self.max_lote:
+                    self._clasificar_lote(detecciones, emitir_todas)
+
+        self._clasificar_lote(detecciones, emitir_todas)
+        self.latencias.append(time.perf_counter() - t_inicio)
+
+        return detecciones
+
+    def estadisticas_latencia(self):
+        """
+        Resume la latencia por bloque de los últimos bloques procesados
+
+        Returns:
+            dict: Latencias p50, p99 y máxima en milisegundos
+        """
+        if not self.latencias:
+            return {'n_bloques': 0, 'p50_ms': 0.0, 'p99_ms': 0.0, 'max_ms': 0.0}
+
+        latencias_ms = 1000 * np.array(self.latencias)
+        return {
+            'n_bloques': int(len(latencias_ms)),
+            'p50_ms': float(np.percentile(latencias_ms, 50)),
+            'p99_ms': float(np.percentile(latencias_ms, 99)),
+            'max_ms': float(latencias_ms.max())
+        }
+
+if __name__ == "__main__":
+    from modelo import cargar_modelo
+    from almacen_procesados import cargar_procesados
+
+    # Modelo guardado por main.py (o modelo.py) y segmentos procesados con la misma configuración
+    modelo = cargar_modelo()
+    datos = cargar_procesados()
+
+    # Simular una señal continua: eventos interictal seguidos de eventos ictal, unidos
+    # sobre el eje del tiempo (los eventos multicanal dan una señal (n_canales, n_muestras))
+    eventos = np.concatenate([datos['data_interictal'][:10], datos['data_ictal'][:10]])
+    senal_continua = np.concatenate(list(eventos), axis=-1)
+
+    detector = DetectorStreaming(modelo, ventana=datos['data_ictal'].shape[-1],
+                                 salto=datos['data_ictal'].shape[-1] // 2)
+
+    tamano_bloque = 100
+    detecciones = []
+    for inicio in range(0, senal_continua.shape[-1], tamano_bloque):
+        detecciones.extend(detector.procesar_bloque(senal_continua[..., inicio:inicio + tamano_bloque]))
+
+    print(f"\nVentanas ictales detectadas: {len(detecciones)}")
+    for d in detecciones[:10]:
+        print(f"  {d['tiempo_inicio']:7.2f} s - {d['tiempo_fin']:7.2f} s  (puntaje {d['puntaje']:.3f})")
+
+    latencia = detector.estadisticas_latencia()
+    print(f"\nLatencia por bloque: p50={latencia['p50_ms']:.2f} ms, "
+          f"p99={latencia['p99_ms']:.2f} ms, máx={latencia['max_ms']:.2f} ms")
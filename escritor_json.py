@@ -0,0 +1,122 @@
+"""
+Escritura de JSON por flujo con soporte para arreglos de NumPy
+Los ndarrays se escriben directamente en el archivo por fragmentos, con una precisión
+fija para los flotantes y sin indentación, sin convertirlos antes en listas de Python
+"""
+
+import json
+import math
+import numpy as np
+
+# Dígitos significativos de los flotantes de los arreglos (≈ precisión de float32,
+# la misma que usa formato_binario)
+DIGITOS = 7
+
+# Elementos de un arreglo que se formatean a la vez
+TAMANO_FRAGMENTO = 65536
+
+def _formatear_fila(fila, formato):
+    # Formatea una fila 1D como '[a,b,...]'; los flotantes no finitos se escriben como null
+    # (JSON no admite NaN ni Infinity)
+    valores = fila.tolist()
+    if fila.dtype.kind == 'f' and not np.isfinite(fila).all():
+        return '[' + ','.join(formato % v if math.isfinite(v) else 'null' for v in valores) + ']'
+    return '[' + ','.join([formato] * len(valores)) % tuple(valores) + ']'
+
+def _escribir_arreglo(arreglo, f, formato):
+    # Recorre los ejes externos y escribe las filas del último eje por bloques
+    if arreglo.ndim == 1:
+        f.write('[')
+        for inicio in range(0, len(arreglo), TAMANO_FRAGMENTO):
+            if inicio:
+                f.write(',')
+            f.write(_formatear_fila(arreglo[inicio:inicio + TAMANO_FRAGMENTO], formato)[1:-1])
+        f.write(']')
+        return
+    if arreglo.ndim == 2:
+        filas_por_bloque = max(1, TAMANO_FRAGMENTO // max(1, arreglo.shape[1]))
+        f.write('[')
+        for inicio in range(0, len(arreglo), filas_por_bloque):
+            if inicio:
+                f.write(',')
+            f.write(','.join(_formatear_fila(fila, formato)
+                             for fila in np.asarray(arreglo[inicio:inicio + filas_por_bloque])))
+        f.write(']')
+        return
+    f.write('[')
+    for i, sub in enumerate(arreglo):
+        if i:
+            f.write(',')
+        _escribir_arreglo(sub, f, formato)
+    f.write(']')
+
+def _formato(arreglo, digitos):
+    # Formato printf de los elementos según el tipo del arreglo
+    if arreglo.dtype.kind == 'f':
+        return f'%.{digitos}g'
+    if arreglo.dtype.kind in 'iu':
+        return '%d'
+    return None
+
+def _escribir(valor, f, digitos):
+    if isinstance(valor, dict):
+        f.write('{')
+        for i, (clave, sub) in enumerate(valor.items()):
+            if i:
+                f.write(',')
+            f.write(json.dumps(str(clave)) + ':')
+            _escribir(sub, f, digitos)
+        f.write('}')
+    elif isinstance(valor, (list, tuple)):
+        f.write('[')
+        for i, sub in enumerate(valor):
+            if i:
+                f.write(',')
+            _escribir(sub, f, digitos)
+        f.write(']')
+    elif isinstance(valor, np.ndarray):
+        formato = _formato(valor, digitos)
+        if valor.ndim == 0:
+            _escribir(valor.item(), f, digitos)
+        elif formato is None:
+            # Booleanos, cadenas u objetos: arreglos pequeños, se delega en json
+            f.write(json.dumps(valor.tolist(), separators=(',', ':')))
+        else:
+            _escribir_arreglo(valor, f, formato)
+    elif isinstance(valor, np.generic):
+        _escribir(valor.item(), f, digitos)
+    elif isinstance(valor, float) and not math.isfinite(valor):
+        f.write('null')  # Como en los arreglos: json.dumps escribiría NaN/Infinity
+    else:
+        f.write(json.dumps(valor, separators=(',', ':')))
+
+def volcar_json(datos, f, digitos=DIGITOS):
+    """
+    Escribe una estructura de diccionarios/listas/ndarrays como JSON en un archivo abierto
+    
+    Los escalares de Python se escriben con json (sin perder precisión); los ndarrays
+    de flotantes con `digitos` dígitos significativos. Los flotantes no finitos, escalares
+    o dentro de arreglos, se escriben como null.
+    
+    Args:
+        datos: Estructura a escribir
+        f: Archivo de texto abierto para escritura
+        digitos: Dígitos significativos de los flotantes de los arreglos
+    """
+    _escribir(datos, f, digitos)
+
+def escribir_json(datos, ruta, digitos=DIGITOS):
+    """
+    Guarda una estructura con ndarrays en un archivo JSON compacto (ver volcar_json)
+    
+    Args:
+        datos: Estructura a escribir
+        ruta: Ruta del archivo de salida
+        digitos: Dígitos significativos de los flotantes de los arreglos
+    
+    Returns:
+        int: Tamaño del archivo en bytes
+    """
+    with open(ruta, 'w') as f:
+        volcar_json(datos, f, digitos)
+        return f.tell()
@@ -3,55 +3,69 @@ Script para explorar la estructura del archivo ArchivoSeizureDetect.mat
 Identifica variables, dimensiones y organización de eventos interictal/ictal
 """
 
-import scipy.io
 import numpy as np
+from carga_mat import abrir_mat, iterar_bloques
+
+def rango_por_bloques(data):
+    """
+    Calcula el mínimo y el máximo de un arreglo perezoso sin cargarlo completo
+    
+    Args:
+        data: Array o vista perezosa con las filas en el primer eje
+    
+    Returns:
+        tuple: (mínimo, máximo)
+    """
+    minimo, maximo = np.inf, -np.inf
+    for _, bloque in iterar_bloques(data):
+        minimo = min(minimo, np.min(bloque))
+        maximo = max(maximo, np.max(bloque))
+    
+    return minimo, maximo
 
 def explore_mat_file(filepath):
     """
     Explora la estructura de un archivo .mat
     
     Args:
-        filepath: Ruta al archivo .mat
+        filepath: Ruta al archivo .mat (v5 o v7.3)
+    
+    Returns:
+        ArchivoMat: Archivo abierto de forma perezosa
     """
     print(f"Explorando archivo: {filepath}\n")
     
-    # Cargar el archivo .mat
-    mat_data = scipy.io.loadmat(filepath)
+    # Abrir el archivo .mat sin cargar las variables en memoria
+    mat_data = abrir_mat(filepath)
     
     # Mostrar todas las claves disponibles
     print("=" * 60)
     print("CLAVES DISPONIBLES EN EL ARCHIVO:")
     print("=" * 60)
     for key in mat_data.keys():
-        if not key.startswith('__'):  # Ignorar metadatos de MATLAB
-            print(f"\nClave: {key}")
-            data = mat_data[key]
-            print(f"  Tipo: {type(data)}")
-            if isinstance(data, np.ndarray):
-                print(f"  Forma (shape): {data.shape}")
-                print(f"  Tipo de datos: {data.dtype}")
-                if data.size > 0:
-                    print(f"  Rango de valores: [{np.min(data)}, {np.max(data)}]")
-                    if data.ndim <= 2:
-                        print(f"  Primeros valores:\n{data[:min(5, len(data))]}")
-            elif isinstance(data, (list, tuple)):
-                print(f"  Longitud: {len(data)}")
-                if len(data) > 0:
-                    print(f"  Tipo del primer elemento: {type(data[0])}")
-            else:
-                print(f"  Valor: {data}")
+        print(f"\nClave: {key}")
+        data = mat_data[key]
+        print(f"  Tipo: {type(data)}")
+        if hasattr(data, 'shape') and data.dtype.kind in 'biuf':
+            print(f"  Forma (shape): {data.shape}")
+            print(f"  Tipo de datos: {data.dtype}")
+            if np.prod(data.shape) > 0:
+                minimo, maximo = rango_por_bloques(data)
+                print(f"  Rango de valores: [{minimo}, {maximo}]")
+                if len(data.shape) <= 2:
+                    print(f"  Primeros valores:\n{np.asarray(data[:min(5, data.shape[0])])}")
+        else:
+            print(f"  Valor: {np.asarray(data)}")
     
     # Mostrar metadatos
     print("\n" + "=" * 60)
     print("METADATOS:")
     print("=" * 60)
-    for key in mat_data.keys():
-        if key.startswith('__'):
-            print(f"{key}: {type(mat_data[key])}")
+    print(f"Versión: MATLAB {mat_data.version}")
+    print(f"Encabezado: {mat_data.encabezado}")
     
     return mat_data
 
 if __name__ == "__main__":
     filepath = "ArchivoSeizureDetect.mat"
     mat_data = explore_mat_file(filepath)
-
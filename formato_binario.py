@@ -0,0 +1,126 @@
+"""
+Formato binario compacto para los datos del dashboard
+Los arreglos numéricos se guardan como float32 little-endian (listos para Float32Array)
+y el resto de la estructura como un manifiesto JSON pequeño
+"""
+
+import json
+import struct
+import numpy as np
+
+MAGIA = b'EEGB'
+VERSION = 1
+
+# Arreglos de punto flotante con al menos este número de elementos van en binario
+UMBRAL_ELEMENTOS = 64
+
+def _como_arreglo_flotante(valor):
+    # Devuelve el valor como ndarray float si es un arreglo rectangular de números reales
+    if isinstance(valor, np.ndarray):
+        arreglo = valor
+    elif isinstance(valor, list) and valor and not isinstance(valor[0], (dict, str)):
+        try:
+            arreglo = np.asarray(valor)
+        except ValueError:
+            return None  # Listas irregulares
+    else:
+        return None
+    
+    if arreglo.dtype.kind != 'f':
+        return None
+    return arreglo
+
+def _separar(valor, blobs, offset, umbral):
+    # Reemplaza los arreglos grandes por referencias y acumula sus bytes en `blobs`
+    if isinstance(valor, dict):
+        manifiesto = {}
+        for clave, sub in valor.items():
+            manifiesto[clave], offset = _separar(sub, blobs, offset, umbral)
+        return manifiesto, offset
+    
+    arreglo = _como_arreglo_flotante(valor)
+    if arreglo is not None and arreglo.size >= umbral:
+        datos = np.ascontiguousarray(arreglo, dtype='<f4').tobytes()
+        blobs.append(datos)
+        referencia = {'__binario__': {'offset': offset, 'shape': list(arreglo.shape), 'dtype': 'float32'}}
+        return referencia, offset + len(datos)
+    
+    if isinstance(valor, list):
+        manifiesto = []
+        for sub in valor:
+            sub_manifiesto, offset = _separar(sub, blobs, offset, umbral)
+            manifiesto.append(sub_manifiesto)
+        return manifiesto, offset
+    
+    if isinstance(valor, np.ndarray):
+        return valor.tolist(), offset
+    if isinstance(valor, np.generic):
+        return valor.item(), offset
+    return valor, offset
+
+def exportar_binario(datos, ruta, umbral=UMBRAL_ELEMENTOS):
+    """
+    Guarda una estructura de diccionarios/listas/arreglos en el formato binario
+    
+    Estructura del archivo:
+        'EEGB' | versión (uint32) | longitud del manifiesto (uint32) | manifiesto JSON |
+        relleno hasta múltiplo de 4 | arreglos float32 little-endian concatenados
+    
+    Args:
+        datos: Diccionario con los datos (listas de Python o ndarrays)
+        ruta: Ruta del archivo de salida (p. ej. 'datos_dashboard.bin')
+        umbral: Elementos mínimos para guardar un arreglo en binario
+    
+    Returns:
+        int: Tamaño del archivo en bytes
+    """
+    blobs = []
+    manifiesto, _ = _separar(datos, blobs, 0, umbral)
+    manifiesto_bytes = json.dumps(manifiesto, separators=(',', ':')).encode('utf-8')
+    
+    # Los datos empiezan alineados a 4 bytes para poder crear Float32Array sin copiar
+    cabecera = len(MAGIA) + 8 + len(manifiesto_bytes)
+    relleno = b' ' * (-cabecera % 4)
+    
+    with open(ruta, 'wb') as f:
+        f.write(MAGIA)
+        f.write(struct.pack('<II', VERSION, len(manifiesto_bytes) + len(relleno)))
+        f.write(manifiesto_bytes + relleno)
+        for blob in blobs:
+            f.write(blob)
+        return f.tell()
+
+def _reconstruir(nodo, buffer, inicio_datos):
+    if isinstance(nodo, dict):
+        if '__binario__' in nodo:
+            info = nodo['__binario__']
+            n = int(np.prod(info['shape']))
+            return np.frombuffer(buffer, dtype='<f4', count=n,
+                                 offset=inicio_datos + info['offset']).reshape(info['shape'])
+        return {clave: _reconstruir(sub, buffer, inicio_datos) for clave, sub in nodo.items()}
+    if isinstance(nodo, list):
+        return [_reconstruir(sub, buffer, inicio_datos) for sub in nodo]
+    return nodo
+
+def leer_binario(ruta):
+    """
+    Lee un archivo guardado con exportar_binario
+    
+    Args:
+        ruta: Ruta del archivo
+    
+    Returns:
+        dict: Estructura original con los arreglos grandes como ndarrays float32
+    """
+    with open(ruta, 'rb') as f:
+        buffer = f.read()
+    
+    if buffer[:4] != MAGIA:
+        raise ValueError(f"'{ruta}' no es un archivo de datos binario del dashboard")
+    version, longitud = struct.unpack_from('<II', buffer, 4)
+    if version != VERSION:
+        raise ValueError(f"Versión de formato no soportada: {version}")
+    
+    inicio_datos = 12 + longitud
+    manifiesto = json.loads(buffer[12:inicio_datos].decode('utf-8'))
+    return _reconstruir(manifiesto, buffer, inicio_datos)
@@ -2,17 +2,10 @@
 Script para generar archivos HTML individuales para cada gráfica del dashboard
 """
 
+import functools
 import json
 import os
 
-# Leer el dashboard completo para extraer secciones
-with open('dashboard.html', 'r', encoding='utf-8') as f:
-    dashboard_content = f.read()
-
-# Leer datos del dashboard
-with open('datos_dashboard.json', 'r', encoding='utf-8') as f:
-    datos = json.load(f)
-
 # Plantilla base HTML
 HTML_BASE = """<!DOCTYPE html>
 <html lang="es">
@@ -128,8 +121,58 @@ HTML_BASE = """<!DOCTYPE html>
 </html>
 """
 
+def _copiar_ruta(origen, destino, partes):
+    # Copia origen[partes[0]][partes[1]]... en destino; '*' recorre todos los elementos de una lista
+    clave, resto = partes[0], partes[1:]
+    if clave == '*':
+        for i, elemento in enumerate(origen):
+            if resto:
+                _copiar_ruta(elemento, destino[i], resto)
+            else:
+                destino[i] = elemento
+        return
+    
+    if not resto:
+        destino[clave] = origen[clave]
+        return
+    
+    if clave not in destino:
+        destino[clave] = [{} for _ in origen[clave]] if isinstance(origen[clave], list) else {}
+    _copiar_ruta(origen[clave], destino[clave], resto)
+
+def seleccionar_datos(datos, rutas):
+    """
+    Extrae de los datos del dashboard solo las claves indicadas
+    
+    Args:
+        datos: Diccionario completo de datos_dashboard.json
+        rutas: Rutas separadas por puntos, p. ej. 'visualizacion.senal_ictal' o
+               'visualizacion.multicanal.canales.*.offset' ('*' = cada elemento de una lista)
+    
+    Returns:
+        dict: Subconjunto de los datos con la misma estructura anidada
+    """
+    subconjunto = {}
+    for ruta in rutas:
+        _copiar_ruta(datos, subconjunto, ruta.split('.'))
+    return subconjunto
+
+def usa_datos(*rutas):
+    """
+    Declara las claves de datos que usa un generador crear_html_*; el generador recibe
+    solo ese subconjunto, de modo que cada página embebe únicamente los datos de su gráfica
+    """
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(datos):
+            return funcion(seleccionar_datos(datos, rutas))
+        envoltura.claves_datos = rutas
+        return envoltura
+    return decorador
+
 # Función para crear HTML de gráfica temporal
-def crear_html_temporal_interictal():
+@usa_datos('visualizacion.tiempo_interictal', 'visualizacion.senal_interictal')
+def crear_html_temporal_interictal(datos):
     titulo = "Señal EEG - Segmento Interictal"
     descripcion = """<strong>Descripción:</strong> Esta gráfica muestra la señal EEG en el dominio del tiempo para un segmento interictal (entre crisis epilépticas). La señal representa la actividad eléctrica del cerebro durante un período de actividad normal, sin convulsiones. Se observa la variación de amplitud de la señal a lo largo del tiempo, medida en microvoltios (μV)."""
     conclusion = """<strong>Conclusión:</strong> La señal interictal muestra una actividad relativamente estable con variaciones de amplitud moderadas. No se observan patrones de alta amplitud o sincronización característicos de eventos convulsivos. Esta señal sirve como referencia para comparar con la actividad ictal."""
@@ -199,7 +242,7 @@ plt.show()"""
         Plotly.newPlot('plot-container', [trace], layout, {responsive: true});
     """
     
-    datos_json = json.dumps(datos, indent=2)
+    datos_json = json.dumps(datos, separators=(',', ':'))
     
     html = HTML_BASE.format(
         titulo=titulo,
@@ -211,7 +254,8 @@ plt.show()"""
     return html
 
 # Función para crear HTML de gráfica temporal ictal
-def crear_html_temporal_ictal():
+@usa_datos('visualizacion.tiempo_ictal', 'visualizacion.senal_ictal')
+def crear_html_temporal_ictal(datos):
     titulo = "Señal EEG - Segmento Ictal"
     descripcion = """<strong>Descripción:</strong> Esta gráfica muestra la señal EEG en el dominio del tiempo para un segmento ictal (durante una crisis epiléptica). La señal captura la actividad eléctrica anormal del cerebro caracterizada por descargas sincronizadas de alta amplitud y frecuencia. Esta actividad es distintiva y permite identificar eventos convulsivos."""
     conclusion = """<strong>Conclusión:</strong> La señal ictal presenta características claramente diferentes a la interictal: mayor amplitud, patrones más sincronizados y actividad de alta frecuencia. Estas diferencias son fundamentales para el desarrollo de algoritmos de detección automática de convulsiones."""
@@ -281,7 +325,7 @@ plt.show()"""
         Plotly.newPlot('plot-container', [trace], layout, {responsive: true});
     """
     
-    datos_json = json.dumps(datos, indent=2)
+    datos_json = json.dumps(datos, separators=(',', ':'))
     
     html = HTML_BASE.format(
         titulo=titulo,
@@ -293,7 +337,10 @@ plt.show()"""
     return html
 
 # Función para crear HTML de espectrograma interictal
-def crear_html_espectrograma_interictal():
+@usa_datos('visualizacion.times_interictal',
+           'visualizacion.freqs_interictal',
+           'visualizacion.Sxx_interictal')
+def crear_html_espectrograma_interictal(datos):
     titulo = "Espectrograma - Segmento Interictal"
     descripcion = """<strong>Descripción:</strong> El espectrograma muestra la distribución de energía de la señal EEG en función del tiempo y la frecuencia para un segmento interictal. Utiliza la transformada de Fourier de tiempo corto (STFT) para analizar cómo varía el contenido espectral a lo largo del tiempo. Los colores representan la densidad espectral de potencia (PSD) en decibelios (dB), donde colores más intensos indican mayor energía en esa frecuencia y tiempo."""
     conclusion = """<strong>Conclusión:</strong> El espectrograma interictal muestra una distribución de energía relativamente uniforme a través de las diferentes bandas de frecuencia, sin concentraciones significativas de energía en bandas específicas. La actividad espectral es más dispersa y de menor intensidad comparada con la actividad ictal."""
@@ -376,7 +423,7 @@ plt.show()"""
         Plotly.newPlot('plot-container', [trace], layout, {responsive: true});
     """
     
-    datos_json = json.dumps(datos, indent=2)
+    datos_json = json.dumps(datos, separators=(',', ':'))
     
     html = HTML_BASE.format(
         titulo=titulo,
@@ -388,7 +435,10 @@ plt.show()"""
     return html
 
 # Función para crear HTML de espectrograma ictal
-def crear_html_espectrograma_ictal():
+@usa_datos('visualizacion.times_ictal',
+           'visualizacion.freqs_ictal',
+           'visualizacion.Sxx_ictal')
+def crear_html_espectrograma_ictal(datos):
     titulo = "Espectrograma - Segmento Ictal"
     descripcion = """<strong>Descripción:</strong> El espectrograma muestra la distribución de energía de la señal EEG durante un evento ictal (crisis epiléptica). Esta representación tiempo-frecuencia revela cómo la actividad espectral cambia durante la convulsión, mostrando concentraciones de energía en bandas de frecuencia específicas. Los patrones espectrales durante eventos ictales son característicos y diferentes a los observados en períodos interictales."""
     conclusion = """<strong>Conclusión:</strong> El espectrograma ictal muestra concentraciones significativas de energía, particularmente en las bandas de frecuencia más altas (beta y gamma). Se observan patrones más estructurados y sincronizados, con mayor intensidad espectral comparada con la actividad interictal. Estas características espectrales son clave para la detección automática de convulsiones."""
@@ -471,7 +521,7 @@ plt.show()"""
         Plotly.newPlot('plot-container', [trace], layout, {responsive: true});
     """
     
-    datos_json = json.dumps(datos, indent=2)
+    datos_json = json.dumps(datos, separators=(',', ':'))
     
     html = HTML_BASE.format(
         titulo=titulo,
@@ -483,7 +533,13 @@ plt.show()"""
     return html
 
 # Función para crear HTML de visualización multi-canal
-def crear_html_multicanal():
+@usa_datos('visualizacion.multicanal.tiempo_transicion',
+           'visualizacion.multicanal.canales.*.tiempo_interictal',
+           'visualizacion.multicanal.canales.*.senal_interictal',
+           'visualizacion.multicanal.canales.*.tiempo_ictal',
+           'visualizacion.multicanal.canales.*.senal_ictal',
+           'visualizacion.multicanal.canales.*.offset')
+def crear_html_multicanal(datos):
     titulo = "Visualización Multi-Canal EEG: Transición Interictal → Ictal"
     descripcion = """<strong>Descripción:</strong> Esta visualización muestra múltiples canales de EEG (16 canales) apilados verticalmente, representando la transición desde un estado interictal (entre crisis) hacia un estado ictal (durante la crisis epiléptica). Cada línea horizontal representa un canal diferente de la señal EEG. La parte izquierda de cada canal (en azul) muestra la actividad interictal, caracterizada por amplitudes relativamente bajas y patrones irregulares. La parte derecha (en marrón) muestra la actividad ictal, con amplitudes significativamente mayores y patrones más rítmicos y sincronizados. La línea roja punteada vertical marca el punto de transición entre ambos estados."""
     conclusion = """<strong>Conclusión:</strong> La visualización multi-canal revela de manera clara y simultánea las diferencias entre los estados interictal e ictal a través de múltiples canales. Se observa una transición abrupta y sincronizada en todos los canales, donde la actividad ictal muestra amplitudes dramáticamente aumentadas y patrones más estructurados. Esta representación es fundamental para el diagnóstico clínico y demuestra visualmente por qué las características extraídas (especialmente las relacionadas con amplitud y contenido espectral) son efectivas para la clasificación automática de convulsiones."""
@@ -648,7 +704,7 @@ crear_visualizacion_multicanal(data_ictal, data_interictal, fs, n_canales=16)"""
         Plotly.newPlot('plot-container', traces, layout, {responsive: true});
     """
     
-    datos_json = json.dumps(datos, indent=2)
+    datos_json = json.dumps(datos, separators=(',', ':'))
     
     html = HTML_BASE.format(
         titulo=titulo,
@@ -660,7 +716,8 @@ crear_visualizacion_multicanal(data_ictal, data_interictal, fs, n_canales=16)"""
     return html
 
 # Función para crear HTML de características (ahora con gráficas individuales)
-def crear_html_caracteristicas():
+@usa_datos('caracteristicas.nombres', 'caracteristicas.estadisticas')
+def crear_html_caracteristicas(datos):
     titulo = "Comparación de Características: Interictal vs Ictal"
     descripcion = """<strong>Descripción:</strong> Las siguientes gráficas muestran las 7 características extraídas de todos los eventos EEG, comparando las clases interictal e ictal. Cada característica se presenta en una gráfica individual con su propia escala, lo que permite visualizar mejor las diferencias sin que características con valores grandes (como Variance) dominen la visualización. Las características incluyen: media (mean), varianza (variance), y densidad espectral de potencia (PSD) en las bandas delta (0.5-4 Hz), theta (4-8 Hz), alpha (8-13 Hz), beta (13-30 Hz) y gamma (30-100 Hz). Las barras muestran los valores promedio y las líneas de error representan la desviación estándar."""
     conclusion = """<strong>Conclusión:</strong> Al visualizar cada característica de manera individual, se pueden observar claramente las diferencias entre estados interictal e ictal. Las características espectrales (PSD en diferentes bandas) muestran variaciones importantes, especialmente en las bandas de mayor frecuencia (beta y gamma), donde los eventos ictales presentan mayor energía. Estas diferencias justifican el uso de estas características para la clasificación automática de convulsiones."""
@@ -850,7 +907,7 @@ for i, nombre in enumerate(nombres):
         });
     """
     
-    datos_json = json.dumps(datos, indent=2)
+    datos_json = json.dumps(datos, separators=(',', ':'))
     
     html = HTML_BASE.format(
         titulo=titulo,
@@ -862,7 +919,8 @@ for i, nombre in enumerate(nombres):
     return html
 
 # Función para crear HTML de matriz de confusión
-def crear_html_matriz_confusion():
+@usa_datos('clasificacion.confusion_matrix')
+def crear_html_matriz_confusion(datos):
     titulo = "Matriz de Confusión"
     descripcion = """<strong>Descripción:</strong> La matriz de confusión muestra el rendimiento del clasificador SVM comparando las predicciones del modelo con los valores reales de las etiquetas. La matriz es una tabla de 2x2 donde las filas representan las clases reales (Interictal e Ictal) y las columnas representan las clases predichas. Los valores en la diagonal principal (verdaderos positivos y verdaderos negativos) indican clasificaciones correctas, mientras que los valores fuera de la diagonal (falsos positivos y falsos negativos) indican errores de clasificación."""
     conclusion = """<strong>Conclusión:</strong> El clasificador SVM muestra un buen rendimiento con una precisión del 88.57%. La matriz de confusión revela que el modelo tiene una alta capacidad para identificar correctamente eventos interictales (21/21 correctos), mientras que tiene algunas dificultades con eventos ictales (10/14 correctos, 4 falsos negativos). Esto sugiere que el modelo es más conservador en la detección de convulsiones, lo cual puede ser preferible en aplicaciones clínicas para evitar falsas alarmas."""
@@ -965,7 +1023,7 @@ plt.show()"""
         Plotly.newPlot('plot-container', [trace], layout, {responsive: true});
     """
     
-    datos_json = json.dumps(datos, indent=2)
+    datos_json = json.dumps(datos, separators=(',', ':'))
     
     html = HTML_BASE.format(
         titulo=titulo,
@@ -977,7 +1035,8 @@ plt.show()"""
     return html
 
 # Función para crear HTML de métricas
-def crear_html_metricas():
+@usa_datos('clasificacion.classification_report')
+def crear_html_metricas(datos):
     titulo = "Métricas de Clasificación por Clase"
     descripcion = """<strong>Descripción:</strong> Esta gráfica muestra las métricas de rendimiento del clasificador SVM para cada clase (Interictal e Ictal). Las métricas incluyen: Precision (precisión), que mide la proporción de predicciones positivas que fueron correctas; Recall (sensibilidad), que mide la proporción de casos positivos reales que fueron identificados correctamente; y F1-Score, que es la media armónica de precision y recall, proporcionando una medida balanceada del rendimiento. Estas métricas permiten evaluar el rendimiento del modelo de manera más detallada que solo la precisión global."""
     conclusion = """<strong>Conclusión:</strong> El análisis de métricas muestra que el clasificador tiene un excelente rendimiento para la clase Interictal (precision=0.84, recall=1.00, F1=0.91), indicando que casi todos los eventos interictales son identificados correctamente. Para la clase Ictal, el modelo tiene precision perfecta (1.00) pero recall moderado (0.71), lo que significa que cuando predice un evento ictal, siempre es correcto, pero no detecta todos los eventos ictales. El F1-Score de 0.83 para Ictal indica un buen balance general. Estas métricas confirman que el modelo es adecuado para aplicaciones de detección de convulsiones."""
@@ -1123,7 +1182,7 @@ print(classification_report(y_test, y_pred, target_names=['Interictal', 'Ictal']
         Plotly.newPlot('plot-container', [trace1, trace2, trace3], layout, {responsive: true});
     """
     
-    datos_json = json.dumps(datos, indent=2)
+    datos_json = json.dumps(datos, separators=(',', ':'))
     
     html = HTML_BASE.format(
         titulo=titulo,
@@ -1135,27 +1194,48 @@ print(classification_report(y_test, y_pred, target_names=['Interictal', 'Ictal']
     return html
 
 # Generar todos los archivos HTML
-if __name__ == "__main__":
-    os.makedirs('imagenes', exist_ok=True)
+def generar_htmls_individuales(ruta_datos='datos_dashboard.json', directorio='imagenes'):
+    """
+    Genera un archivo HTML por cada gráfica del dashboard
     
-    graficas = [
-        ('01_senal_temporal_interictal.html', crear_html_temporal_interictal),
-        ('02_senal_temporal_ictal.html', crear_html_temporal_ictal),
-        ('03_espectrograma_interictal.html', crear_html_espectrograma_interictal),
-        ('04_espectrograma_ictal.html', crear_html_espectrograma_ictal),
-        ('05_visualizacion_multicanal.html', crear_html_multicanal),
-        ('06_comparacion_caracteristicas.html', crear_html_caracteristicas),
-        ('07_matriz_confusion.html', crear_html_matriz_confusion),
-        ('08_metricas_clasificacion.html', crear_html_metricas)
-    ]
+    Args:
+        ruta_datos: Ruta al JSON con los datos del dashboard
+        directorio: Carpeta de salida para los archivos HTML
+    
+    Returns:
+        list: Rutas de los archivos generados
+    """
+    # Leer datos del dashboard
+    with open(ruta_datos, 'r', encoding='utf-8') as f:
+        datos = json.load(f)
+    
+    os.makedirs(directorio, exist_ok=True)
     
     print("Generando archivos HTML individuales...")
-    for filename, funcion in graficas:
-        html_content = funcion()
-        filepath = os.path.join('imagenes', filename)
+    rutas = []
+    for filename, funcion in GRAFICAS:
+        html_content = funcion(datos)
+        filepath = os.path.join(directorio, filename)
         with open(filepath, 'w', encoding='utf-8') as f:
             f.write(html_content)
+        rutas.append(filepath)
         print(f"✓ Generado: {filepath}")
     
-    print(f"\n✓ Se generaron {len(graficas)} archivos HTML en la carpeta 'imagenes'")
+    print(f"\n✓ Se generaron {len(GRAFICAS)} archivos HTML en la carpeta '{directorio}'")
+    
+    return rutas
+
+# Archivo de salida y función generadora de cada gráfica
+GRAFICAS = [
+    ('01_senal_temporal_interictal.html', crear_html_temporal_interictal),
+    ('02_senal_temporal_ictal.html', crear_html_temporal_ictal),
+    ('03_espectrograma_interictal.html', crear_html_espectrograma_interictal),
+    ('04_espectrograma_ictal.html', crear_html_espectrograma_ictal),
+    ('05_visualizacion_multicanal.html', crear_html_multicanal),
+    ('06_comparacion_caracteristicas.html', crear_html_caracteristicas),
+    ('07_matriz_confusion.html', crear_html_matriz_confusion),
+    ('08_metricas_clasificacion.html', crear_html_metricas)
+]
 
+if __name__ == "__main__":
+    generar_htmls_individuales()
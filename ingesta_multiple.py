@@ -0,0 +1,255 @@
+"""
+Ingesta concurrente de múltiples registros .mat
+Carga los archivos de un directorio o patrón glob con un pool de hilos y una cola de
+precarga acotada, de modo que la lectura y descompresión se solapan con el cálculo de
+características. El resultado es una sola matriz con una columna de id de registro
+"""
+
+import glob
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from carga_mat import cargar_registro, TAMANO_BLOQUE
+from process_eeg import extraer_caracteristicas_paralelo, parametros_extraccion, n_columnas_caracteristicas
+from registro_caracteristicas import CARACTERISTICAS_BASE
+from remuestreo import remuestrear_registros, FS_OBJETIVO
+
+ARCHIVO_REGISTROS = 'caracteristicas_registros.npz'
+
+# La última columna de la matriz combinada es el id del registro (índice en la lista de rutas)
+COLUMNA_REGISTRO = -1
+
+def listar_registros(patron):
+    """
+    Lista los archivos .mat de un directorio o que coinciden con un patrón glob
+    
+    Args:
+        patron: Directorio, patrón glob (p. ej. 'datos/**/*.mat') o ruta de un archivo
+    
+    Returns:
+        list: Rutas ordenadas; la posición de cada ruta es su id de registro
+    """
+    if os.path.isdir(patron):
+        patron = os.path.join(patron, '*.mat')
+    return sorted(glob.glob(patron, recursive=True))
+
+def _cargar(id_registro, ruta):
+    # Lee (y descomprime) el registro completo en memoria en un hilo del pool
+    inicio = time.perf_counter()
+    data_ictal, data_interictal, fs = cargar_registro(ruta)
+    data_ictal = np.array(data_ictal, dtype=float)
+    data_interictal = np.array(data_interictal, dtype=float)
+    return {'id': id_registro, 'ruta': ruta, 'data_ictal': data_ictal,
+            'data_interictal': data_interictal, 'fs': fs,
+            'tiempo_carga_s': time.perf_counter() - inicio}
+
+def ingerir_registros(rutas, n_hilos=4, n_precarga=4, n_procesos=1, tamano_bloque=TAMANO_BLOQUE,
+                      cache=None, modo_canales='aplanar', fs_objetivo=FS_OBJETIVO,
+                      caracteristicas=CARACTERISTICAS_BASE, dtype='float64'):
+    """
+    Extrae las características de varios registros solapando la carga con el cálculo
+    
+    Los hilos del pool cargan registros y los dejan en una cola de a lo sumo
+    `n_precarga` registros; el hilo principal toma cada registro de la cola y calcula
+    sus características. Así la memoria queda acotada a unos n_hilos + n_precarga
+    registros cargados a la vez. Los registros que fallan se reportan y se omiten.
+    Los registros con otra frecuencia de muestreo se remuestrean a fs_objetivo, así que
+    la matriz combinada es uniforme aunque mezcle amplificadores de 256, 512 o 1024 Hz.
+    Cada vez que el hilo principal toma un registro de la cola también toma los que ya
+    estén precargados (a lo sumo n_precarga) y los remuestrea juntos: los eventos de
+    todos los registros del lote con la misma fs van en una sola llamada polifásica.
+    
+    Args:
+        rutas: Lista de rutas .mat (p. ej. de listar_registros)
+        n_hilos: Hilos de carga
+        n_precarga: Máximo de registros cargados esperando en la cola
+        n_procesos: Procesos para la extracción de características de cada registro
+        tamano_bloque: Eventos por bloque en la extracción
+        cache: CacheCaracteristicas opcional; los registros en caché no se cargan
+        modo_canales: Combinación de canales para registros multicanal (ver combinar_canales)
+        fs_objetivo: Frecuencia común con la que se calculan las características (None
+                     para no remuestrear y usar la fs de cada registro)
+        caracteristicas: Nombres de las características del registro (registro_caracteristicas)
+        dtype: 'float64' o 'float32' para el cálculo de las características
+    
+    Returns:
+        tuple: (matriz, etiquetas, resumen) donde matriz es (n_eventos, n_caracteristicas + 1)
+               con el id de registro en la última columna, y resumen describe cada
+               registro, los errores y el rendimiento (registros/s)
+    """
+    inicio = time.perf_counter()
+    parametros = parametros_extraccion(fs_objetivo, modo_canales, caracteristicas, dtype)
+    resultados = {}
+    registros = {}
+    errores = []
+    
+    # Los registros en caché no pasan por la cola de carga
+    pendientes = []
+    for id_registro, ruta in enumerate(rutas):
+        en_cache = cache.obtener(cache.clave(ruta, parametros)) if cache is not None else None
+        if en_cache is not None:
+            resultados[id_registro] = en_cache
+            registros[id_registro] = {'id': id_registro, 'ruta': ruta, 'en_cache': True}
+        else:
+            pendientes.append((id_registro, ruta))
+    
+    cola = queue.Queue(maxsize=n_precarga)
+    detener = threading.Event()
+
+    def cargar_en_cola(id_registro, ruta):
+        if detener.is_set():
+            return
+        try:
+            elemento = _cargar(id_registro, ruta)
+        except Exception as error:
+            elemento = {'id': id_registro, 'ruta': ruta, 'error': error}
+        # Espera mientras la cola está llena, salvo que el consumidor se haya detenido
+        while not detener.is_set():
+            try:
+                cola.put(elemento, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+    
+    with ThreadPoolExecutor(max_workers=n_hilos) as executor:
+        for id_registro, ruta in pendientes:
+            executor.submit(cargar_en_cola, id_registro, ruta)
+    
+        try:
+            n_restantes = len(pendientes)
+            while n_restantes:
+                # Espera un registro y toma también los que ya estén en la cola
+                lote = [cola.get()]
+                while len(lote) < n_precarga:
+                    try:
+                        lote.append(cola.get_nowait())
+                    except queue.Empty:
+                        break
+                n_restantes -= len(lote)
+    
+                cargados = []
+                for elemento in lote:
+                    if 'error' in elemento:
+                        print(f"  [{elemento['id']}] Error en '{elemento['ruta']}': {elemento['error']}")
+                        errores.append({'id': elemento['id'], 'ruta': elemento['ruta'],
+                                        'error': str(elemento['error'])})
+                    else:
+                        cargados.append(elemento)
+                if not cargados:
+                    continue
+    
+                # Un solo remuestreo por fs para todos los registros del lote
+                t_remuestreo = time.perf_counter()
+                arreglos = [elemento[clave] for elemento in cargados for clave in ('data_ictal', 'data_interictal')]
+                if fs_objetivo is not None:
+                    arreglos = remuestrear_registros(
+                        [(arreglo, float(elemento['fs'])) for elemento in cargados
+                         for arreglo in (elemento['data_ictal'], elemento['data_interictal'])], fs_objetivo)
+                t_remuestreo = (time.perf_counter() - t_remuestreo) / len(cargados)
+    
+                for k, elemento in enumerate(cargados):
+                    id_registro, ruta = elemento['id'], elemento['ruta']
+                    t_caracteristicas = time.perf_counter()
+                    fs_registro = float(elemento['fs'])
+                    fs_extraccion = fs_objetivo if fs_objetivo is not None else fs_registro
+                    data_ictal, data_interictal = arreglos[2 * k], arreglos[2 * k + 1]
+                    caracteristicas_registro = np.vstack([
+                        extraer_caracteristicas_paralelo(datos, fs_extraccion, n_procesos, tamano_bloque,
+                                                         modo_canales, caracteristicas, dtype)
+                        for datos in (data_ictal, data_interictal)])
+                    etiquetas = np.concatenate([np.ones(data_ictal.shape[0], dtype=int),
+                                                np.zeros(data_interictal.shape[0], dtype=int)])
+                    resultados[id_registro] = (caracteristicas_registro, etiquetas)
+                    registros[id_registro] = {
+                        'id': id_registro, 'ruta': ruta, 'en_cache': False, 'fs': fs_registro,
+                        'tiempo_carga_s': elemento['tiempo_carga_s'],
+                        'tiempo_caracteristicas_s': t_remuestreo + time.perf_counter() - t_caracteristicas,
+                        'registros_en_lote': len(cargados)
+                    }
+                    print(f"  [{id_registro}] {os.path.basename(ruta)}: {data_ictal.shape[0]} ictal, "
+                          f"{data_interictal.shape[0]} interictal")
+    
+                    if cache is not None:
+                        cache.guardar(cache.clave(ruta, parametros), caracteristicas_registro, etiquetas,
+                                      {'filepath': ruta, **parametros})
+                del lote, cargados, arreglos, elemento, data_ictal, data_interictal
+        finally:
+            # Si algo falla, los hilos de carga dejan de esperar en la cola llena
+            detener.set()
+    
+    # Concatenar en el orden de las rutas (independiente del orden de carga)
+    ids = sorted(resultados)
+    # Sin registros no se conoce el eje de canales: ancho de los datos sin canales
+    n_caracteristicas = n_columnas_caracteristicas((0, 0), modo_canales, parametros['bandas'],
+                                                   parametros['caracteristicas'])
+    if ids:
+        matriz = np.vstack([np.column_stack([resultados[i][0], np.full(len(resultados[i][1]), i)])
+                            for i in ids])
+        etiquetas = np.concatenate([resultados[i][1] for i in ids])
+    else:
+        matriz = np.empty((0, n_caracteristicas + 1), dtype=dtype)
+        etiquetas = np.empty(0, dtype=int)
+    
+    for i in ids:
+        registros[i]['n_ictal'] = int(np.sum(resultados[i][1] == 1))
+        registros[i]['n_interictal'] = int(np.sum(resultados[i][1] == 0))
+    
+    tiempo_total = time.perf_counter() - inicio
+    resumen = {
+        'registros': [registros[i] for i in ids],
+        'errores': errores,
+        'n_registros': len(ids),
+        'n_eventos': int(len(etiquetas)),
+        'tiempo_total_s': tiempo_total,
+        'registros_por_s': len(ids) / tiempo_total if tiempo_total > 0 else 0.0,
+        'eventos_por_s': len(etiquetas) / tiempo_total if tiempo_total > 0 else 0.0
+    }
+    return matriz, etiquetas, resumen
+
+def procesar_registros(patron, salida=ARCHIVO_REGISTROS, **kwargs):
+    """
+    Ingiere todos los registros de un directorio o patrón y guarda la matriz combinada
+    
+    Args:
+        patron: Directorio o patrón glob (ver listar_registros)
+        salida: Archivo .npz de salida (None para no guardar)
+        **kwargs: Argumentos de ingerir_registros
+    
+    Returns:
+        tuple: (matriz, etiquetas, resumen) como ingerir_registros
+    """
+    rutas = listar_registros(patron)
+    if not rutas:
+        raise FileNotFoundError(f"No se encontraron archivos .mat en '{patron}'")
+    print(f"Registros encontrados: {len(rutas)}")
+    
+    matriz, etiquetas, resumen = ingerir_registros(rutas, **kwargs)
+    
+    print(f"\nMatriz combinada: {matriz.shape} (última columna = id de registro)")
+    print(f"Registros procesados: {resumen['n_registros']} ({len(resumen['errores'])} con error)")
+    print(f"Rendimiento: {resumen['registros_por_s']:.2f} registros/s, "
+          f"{resumen['eventos_por_s']:.0f} eventos/s ({resumen['tiempo_total_s']:.2f} s)")
+    
+    if salida:
+        np.savez(salida, caracteristicas=matriz[:, :COLUMNA_REGISTRO], etiquetas=etiquetas,
+                 id_registro=matriz[:, COLUMNA_REGISTRO].astype(int), rutas=np.array(rutas))
+        print(f"Características guardadas en '{salida}'")
+    
+    return matriz, etiquetas, resumen
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Ingesta concurrente de registros .mat")
+    parser.add_argument('patron', help="Directorio o patrón glob de archivos .mat")
+    parser.add_argument('--hilos', type=int, default=4, help="Hilos de carga")
+    parser.add_argument('--precarga', type=int, default=4, help="Registros en la cola de precarga")
+    parser.add_argument('--procesos', type=int, default=1, help="Procesos de extracción por registro")
+    parser.add_argument('--salida', default=ARCHIVO_REGISTROS)
+    args = parser.parse_args()
+    
+    procesar_registros(args.patron, args.salida, n_hilos=args.hilos, n_precarga=args.precarga,
+                       n_procesos=args.procesos)
@@ -0,0 +1,184 @@
+"""
+Instrumentación de tiempo y memoria del pipeline
+Mide tiempo de pared, tiempo de CPU, número de llamadas y memoria pico (tracemalloc) por
+etapa o función, y guarda una traza JSON. Se activa con la variable de entorno
+EEG_INSTRUMENTACION=1; desactivada, no tiene costo
+"""
+
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+
+VARIABLE_ENTORNO = 'EEG_INSTRUMENTACION'
+ARCHIVO_TRAZA = 'traza_instrumentacion.json'
+
+# Se lee una sola vez: con la instrumentación apagada, @instrumentar devuelve la
+# función original y medir() un nullcontext
+ACTIVA = os.environ.get(VARIABLE_ENTORNO, '').strip().lower() not in ('', '0', 'false', 'no')
+
+# Máximo de eventos individuales guardados en la traza (el resumen siempre es completo)
+MAX_EVENTOS = 10000
+
+_candado = threading.Lock()
+_resumen = {}
+_eventos = []
+_medidas_activas = []
+_t0 = time.perf_counter()
+
+def _actualizar_picos():
+    # Reparte el pico de memoria desde la última lectura entre todas las medidas abiertas
+    # (anidadas o de otros hilos) y reinicia el pico de tracemalloc
+    actual, pico = tracemalloc.get_traced_memory()
+    for medida in _medidas_activas:
+        medida['pico'] = max(medida['pico'], pico)
+    tracemalloc.reset_peak()
+    return actual
+
+@contextmanager
+def _medir(nombre):
+    with _candado:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        medida = {'pico': 0}
+        medida['base'] = _actualizar_picos()
+        _medidas_activas.append(medida)
+    
+    inicio_pared, inicio_cpu = time.perf_counter(), time.thread_time()
+    try:
+        yield
+    finally:
+        pared = time.perf_counter() - inicio_pared
+        cpu = time.thread_time() - inicio_cpu
+    
+        with _candado:
+            _actualizar_picos()
+            _medidas_activas.remove(medida)
+            memoria_pico = max(medida['pico'] - medida['base'], 0) / 2**20
+    
+            estadisticas = _resumen.setdefault(nombre, {
+                'llamadas': 0, 'tiempo_s': 0.0, 'cpu_s': 0.0,
+                'tiempo_max_s': 0.0, 'memoria_pico_mb': 0.0
+            })
+            estadisticas['llamadas'] += 1
+            estadisticas['tiempo_s'] += pared
+            estadisticas['cpu_s'] += cpu
+            estadisticas['tiempo_max_s'] = max(estadisticas['tiempo_max_s'], pared)
+            estadisticas['memoria_pico_mb'] = max(estadisticas['memoria_pico_mb'], memoria_pico)
+    
+            if len(_eventos) < MAX_EVENTOS:
+                # Formato de eventos de Chrome (chrome://tracing, Perfetto)
+                _eventos.append({
+                    'name': nombre, 'ph': 'X', 'pid': os.getpid(),
+                    'tid': threading.get_ident(),
+                    'ts': (inicio_pared - _t0) * 1e6, 'dur': pared * 1e6,
+                    'args': {'cpu_ms': cpu * 1e3, 'memoria_pico_mb': memoria_pico}
+                })
+
+def medir(nombre):
+    """
+    Context manager que mide el bloque de código con el nombre dado
+    
+    Args:
+        nombre: Nombre de la medida en la traza
+    
+    Returns:
+        Context manager (nullcontext si la instrumentación está desactivada)
+    """
+    if not ACTIVA:
+        return nullcontext()
+    return _medir(nombre)
+
+def instrumentar(funcion=None, nombre=None):
+    """
+    Decorador que mide cada llamada a la función
+    
+    Se usa como @instrumentar o @instrumentar(nombre='...'). Si la instrumentación
+    está desactivada devuelve la función sin modificar.
+    
+    Args:
+        funcion: Función a decorar
+        nombre: Nombre de la medida (default: módulo.función)
+    
+    Returns:
+        Función decorada
+    """
+    def decorador(f):
+        if not ACTIVA:
+            return f
+    
+        nombre_medida = nombre or f"{f.__module__}.{f.__qualname__}"
+    
+        @wraps(f)
+        def envoltura(*args, **kwargs):
+            with _medir(nombre_medida):
+                return f(*args, **kwargs)
+        return envoltura
+    
+    if funcion is not None:
+        return decorador(funcion)
+    return decorador
+
+def obtener_resumen():
+    """
+    Devuelve una copia de las estadísticas acumuladas por nombre
+    
+    Returns:
+        dict: {nombre: {llamadas, tiempo_s, cpu_s, tiempo_max_s, memoria_pico_mb}}
+    """
+    with _candado:
+        return {nombre: dict(estadisticas) for nombre, estadisticas in _resumen.items()}
+
+def reiniciar():
+    """
+    Borra las medidas acumuladas
+    """
+    with _candado:
+        _resumen.clear()
+        _eventos.clear()
+
+def guardar_traza(ruta=ARCHIVO_TRAZA):
+    """
+    Guarda el resumen y los eventos individuales en JSON
+    
+    El archivo se puede abrir en chrome://tracing o Perfetto (clave traceEvents).
+    Las llamadas dentro de procesos hijos (extracción paralela) no se registran.
+    
+    Args:
+        ruta: Ruta del archivo de salida
+    
+    Returns:
+        str: Ruta del archivo, o None si la instrumentación está desactivada
+    """
+    if not ACTIVA:
+        return None
+    
+    with _candado:
+        traza = {
+            'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'resumen': {nombre: dict(estadisticas) for nombre, estadisticas in _resumen.items()},
+            'eventos_descartados': max(sum(e['llamadas'] for e in _resumen.values()) - len(_eventos), 0),
+            'traceEvents': list(_eventos)
+        }
+    
+    with open(ruta, 'w') as f:
+        json.dump(traza, f, indent=2)
+    return ruta
+
+def imprimir_resumen():
+    """
+    Imprime la tabla de tiempos y memoria ordenada por tiempo total
+    """
+    if not ACTIVA:
+        return
+    
+    resumen = obtener_resumen()
+    print("\n" + "=" * 96)
+    print(f"{'Medida':<48}{'Llamadas':>9}{'Tiempo (s)':>12}{'CPU (s)':>10}{'Pico (MB)':>12}")
+    print("=" * 96)
+    for nombre, e in sorted(resumen.items(), key=lambda item: -item[1]['tiempo_s']):
+        print(f"{nombre:<48}{e['llamadas']:>9}{e['tiempo_s']:>12.3f}{e['cpu_s']:>10.3f}"
+              f"{e['memoria_pico_mb']:>12.1f}")
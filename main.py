@@ -3,73 +3,154 @@ Script principal que orquesta todo el pipeline de análisis EEG
 Ejecuta: procesamiento, visualización, clasificación y genera datos para el dashboard
 """
 
-import numpy as np
 import json
+import os
+import sys
+import numpy as np
 from process_eeg import procesar_datos
-from visualize_signals import visualizar_segmentos
+from registro_caracteristicas import CARACTERISTICAS_BASE
+from cache_caracteristicas import CacheCaracteristicas
+from visualize_signals import visualizar_segmentos, guardar_espectrogramas
 from classify import clasificar_datos
+from modelo import Modelo, guardar_modelo, nombres_caracteristicas, ARCHIVO_MODELO
+from generar_htmls_individuales import generar_htmls_individuales, GRAFICAS
+from formato_binario import exportar_binario
+from escritor_json import escribir_json
+from almacen_procesados import guardar_procesados, cargar_procesados, rutas_procesados, DIRECTORIO_PROCESADOS
+from pipeline import Etapa, ejecutar_pipeline
+from ingesta_multiple import procesar_registros, listar_registros, ARCHIVO_REGISTROS
+from instrumentacion import instrumentar, medir, guardar_traza, imprimir_resumen, ARCHIVO_TRAZA
+
+ARCHIVO_MAT = "ArchivoSeizureDetect.mat"
+ARCHIVO_PROCESADOS = DIRECTORIO_PROCESADOS
+ARCHIVO_VISUALIZACION = 'datos_visualizacion.json'
+ARCHIVO_CLASIFICACION = 'resultados_clasificacion.json'
+ARCHIVO_CLASIFICACION_REGISTROS = 'resultados_clasificacion_registros.json'
+ARCHIVO_DASHBOARD = 'datos_dashboard.json'
+DIRECTORIO_SECCIONES = 'secciones_dashboard'
+ARCHIVO_INDICE_SECCIONES = os.path.join(DIRECTORIO_SECCIONES, 'indice.json')
+ESPECTROGRAMAS = {'ictal': 'espectrogramas_ictal', 'interictal': 'espectrogramas_interictal'}
+
+# Combinación de canales cuando los eventos son (n_eventos, n_canales, n_muestras)
+MODO_CANALES = 'aplanar'
+
+# Características del registro que se extraen (CARACTERISTICAS_EXTENDIDAS agrega potencia
+# relativa, entropía espectral, SEF95, Hjorth, longitud de línea y flujo espectral)
+CARACTERISTICAS = CARACTERISTICAS_BASE
+
+# Precisión de señales, características, espectrogramas y clasificación ('float64' o 'float32').
+# float32 usa la mitad de memoria; comparar_precision.py reporta la desviación contra float64
+DTYPE = 'float64'
+
+# Claves de 'visualizacion' que van en las secciones de señales y de espectrogramas
+# (dashboard.html pide cada sección cuando su gráfica entra en pantalla)
+CLAVES_SENALES = ('tiempo_interictal', 'senal_interictal', 'tiempo_ictal', 'senal_ictal', 'fs', 'decimacion')
+CLAVES_ESPECTROGRAMAS = ('times_interictal', 'freqs_interictal', 'Sxx_interictal',
+                         'times_ictal', 'freqs_ictal', 'Sxx_ictal')
+
+# Los módulos de cada etapa también son entradas: si el código cambia, la etapa se repite
+DIRECTORIO_CODIGO = os.path.dirname(os.path.abspath(__file__))
+
+def codigo(nombre_modulo):
+    return os.path.join(DIRECTORIO_CODIGO, nombre_modulo)
+
+def imprimir_paso(titulo):
+    print("\n" + "=" * 70)
+    print(titulo)
+    print("=" * 70)
 
-def main():
+@instrumentar(nombre='etapa.caracteristicas')
+def etapa_caracteristicas(filepath=ARCHIVO_MAT):
     """
-    Función principal que ejecuta todo el pipeline
+    Paso 1: Procesar datos, extraer características y guardarlas en datos_procesados/
     """
-    print("=" * 70)
-    print("ANÁLISIS DE SEÑALES EEG PARA DETECCIÓN DE CONVULSIONES")
-    print("=" * 70)
-    print("\nPontificia Universidad Javeriana - Bogotá")
-    print("Procesamiento de Señales Biológicas")
-    print("Realizado por: Felipe Rangel\n")
+    imprimir_paso("PASO 1: PROCESAMIENTO DE SEÑALES Y EXTRACCIÓN DE CARACTERÍSTICAS")
+    matriz_caracteristicas, etiquetas, data_ictal, data_interictal, fs = procesar_datos(
+        filepath, cache=CacheCaracteristicas(), modo_canales=MODO_CANALES, caracteristicas=CARACTERISTICAS,
+        dtype=DTYPE)
     
-    filepath = "ArchivoSeizureDetect.mat"
+    # Guardar datos procesados (las señales en la misma precisión que las características);
+    # cada arreglo va en su propio .npy para abrirlo con memory-map
+    guardar_procesados(matriz_caracteristicas, etiquetas, data_ictal, data_interictal, fs,
+                       ARCHIVO_PROCESADOS, dtype=DTYPE)
+
+@instrumentar(nombre='etapa.visualizacion')
+def etapa_visualizacion():
+    """
+    Paso 2: Visualizar segmentos (datos_visualizacion.json y visualizaciones_eeg.png) y
+    guardar los espectrogramas cuantizados de todos los eventos
+    """
+    imprimir_paso("PASO 2: VISUALIZACIÓN DE SEGMENTOS")
+    # Señales con memory-map: solo se leen los eventos que se dibujan y, por bloques,
+    # los de los espectrogramas
+    datos = cargar_procesados(ARCHIVO_PROCESADOS)
     
-    # Paso 1: Procesar datos y extraer características
-    print("\n" + "=" * 70)
-    print("PASO 1: PROCESAMIENTO DE SEÑALES Y EXTRACCIÓN DE CARACTERÍSTICAS")
-    print("=" * 70)
-    matriz_caracteristicas, etiquetas, data_ictal, data_interictal, fs = procesar_datos(filepath)
+    print("Guardando espectrogramas de todos los eventos...")
+    for clase, ruta in ESPECTROGRAMAS.items():
+        guardar_espectrogramas(datos[f'data_{clase}'], float(datos['fs']), ruta, dtype=DTYPE)
+        print(f"Espectrogramas {clase} guardados en '{ruta}.npy'")
     
-    # Guardar datos procesados
-    np.savez('datos_procesados.npz', 
-             caracteristicas=matriz_caracteristicas,
-             etiquetas=etiquetas,
-             data_ictal=data_ictal,
-             data_interictal=data_interictal,
-             fs=fs)
+    # Los espectrogramas del dashboard se leen del almacén en lugar de recalcularlos
+    visualizar_segmentos(datos['data_ictal'], datos['data_interictal'], float(datos['fs']),
+                         save_plotly=True, espectrogramas=ESPECTROGRAMAS)
+
+@instrumentar(nombre='etapa.clasificacion')
+def etapa_clasificacion():
+    """
+    Paso 3: Clasificación con SVM (resultados_clasificacion.json) y artefacto del modelo
+    """
+    imprimir_paso("PASO 3: CLASIFICACIÓN CON SVM")
+    datos = cargar_procesados(ARCHIVO_PROCESADOS)
+    resultados, clf, scaler = clasificar_datos(datos['caracteristicas'], datos['etiquetas'], dtype=DTYPE)
     
-    # Paso 2: Visualizar segmentos
-    print("\n" + "=" * 70)
-    print("PASO 2: VISUALIZACIÓN DE SEGMENTOS")
-    print("=" * 70)
-    datos_plotly = visualizar_segmentos(data_ictal, data_interictal, fs, save_plotly=True)
+    # fs es la frecuencia con la que procesar_datos extrajo las características (fs_objetivo,
+    # o la del archivo si no se remuestreó); fs y la forma de los eventos salen de meta.json,
+    # sin abrir las señales
+    forma = datos.forma('data_ictal')
+    modelo = Modelo(clf, scaler, fs=float(datos['fs']), n_muestras=int(forma[-1]),
+                    metadatos={'accuracy': resultados['accuracy'], 'archivo_mat': ARCHIVO_MAT},
+                    n_canales=int(forma[1]) if len(forma) == 3 else None, modo_canales=MODO_CANALES,
+                    caracteristicas=CARACTERISTICAS, dtype=DTYPE)
+    guardar_modelo(modelo, ARCHIVO_MODELO)
+    print(f"Modelo guardado en '{ARCHIVO_MODELO}'")
+
+@instrumentar(nombre='etapa.dashboard')
+def etapa_dashboard():
+    """
+    Paso 4: Preparar los datos completos del dashboard (datos_dashboard.json)
+    """
+    imprimir_paso("PASO 4: PREPARANDO DATOS PARA EL DASHBOARD")
     
-    # Paso 3: Clasificación
-    print("\n" + "=" * 70)
-    print("PASO 3: CLASIFICACIÓN CON SVM")
-    print("=" * 70)
-    resultados, clf, scaler = clasificar_datos(matriz_caracteristicas, etiquetas)
+    datos = cargar_procesados(ARCHIVO_PROCESADOS)
+    matriz_caracteristicas = datos['caracteristicas']
+    etiquetas = datos['etiquetas']
+    fs = float(datos['fs'])
+    forma = datos.forma('data_ictal')
+    n_muestras_por_evento = forma[-1]
+    n_canales = int(forma[1]) if len(forma) == 3 else None
     
-    # Paso 4: Preparar datos adicionales para el dashboard
-    print("\n" + "=" * 70)
-    print("PASO 4: PREPARANDO DATOS PARA EL DASHBOARD")
-    print("=" * 70)
+    with open(ARCHIVO_VISUALIZACION, 'r') as f:
+        datos_plotly = json.load(f)
+    with open(ARCHIVO_CLASIFICACION, 'r') as f:
+        resultados = json.load(f)
     
     # Agregar información de características al JSON de visualización
-    nombres_caracteristicas = ['Mean', 'Variance', 'PSD Delta', 'PSD Theta', 
-                               'PSD Alpha', 'PSD Beta', 'PSD Gamma']
+    nombres = nombres_caracteristicas(n_canales=n_canales, modo_canales=MODO_CANALES,
+                                      caracteristicas=CARACTERISTICAS)
     
     # Calcular estadísticas de características por clase
     caracteristicas_interictal = matriz_caracteristicas[etiquetas == 0]
     caracteristicas_ictal = matriz_caracteristicas[etiquetas == 1]
     
     stats_caracteristicas = {
-        'nombres': nombres_caracteristicas,
+        'nombres': nombres,
         'interictal': {
-            'mean': caracteristicas_interictal.mean(axis=0).tolist(),
-            'std': caracteristicas_interictal.std(axis=0).tolist()
+            'mean': caracteristicas_interictal.mean(axis=0),
+            'std': caracteristicas_interictal.std(axis=0)
         },
         'ictal': {
-            'mean': caracteristicas_ictal.mean(axis=0).tolist(),
-            'std': caracteristicas_ictal.std(axis=0).tolist()
+            'mean': caracteristicas_ictal.mean(axis=0),
+            'std': caracteristicas_ictal.std(axis=0)
         }
     }
     
@@ -78,9 +159,9 @@ def main():
         'visualizacion': datos_plotly,
         'clasificacion': resultados,
         'caracteristicas': {
-            'nombres': nombres_caracteristicas,
-            'valores_interictal': caracteristicas_interictal.tolist(),
-            'valores_ictal': caracteristicas_ictal.tolist(),
+            'nombres': nombres,
+            'valores_interictal': caracteristicas_interictal,
+            'valores_ictal': caracteristicas_ictal,
             'estadisticas': stats_caracteristicas
         },
         'info_general': {
@@ -88,26 +169,211 @@ def main():
             'n_eventos_interictal': int(np.sum(etiquetas == 0)),
             'n_caracteristicas': int(matriz_caracteristicas.shape[1]),
             'fs': float(fs),
-            'n_muestras_por_evento': int(data_ictal.shape[1])
+            'n_muestras_por_evento': int(n_muestras_por_evento),
+            'n_canales': n_canales or 1
         }
     }
     
-    with open('datos_dashboard.json', 'w') as f:
-        json.dump(datos_dashboard, f, indent=2)
+    # Los arreglos de características se escriben por fragmentos, sin convertirlos en listas
+    escribir_json(datos_dashboard, ARCHIVO_DASHBOARD)
     
     print("Datos completos guardados en 'datos_dashboard.json'")
     
+    # Un archivo binario compacto por sección para que el dashboard cargue cada una bajo
+    # demanda; datos_dashboard.json queda como respaldo
+    indice = exportar_secciones(datos_dashboard, DIRECTORIO_SECCIONES)
+    for nombre, info in indice['secciones'].items():
+        print(f"  Sección '{nombre}': {info['bytes_binario'] / 1024:.1f} KB")
+    print(f"Índice de secciones guardado en '{ARCHIVO_INDICE_SECCIONES}'")
+
+def dividir_secciones(datos_dashboard):
+    """
+    Divide los datos del dashboard en las secciones que dashboard.html carga por separado
+    
+    Args:
+        datos_dashboard: Estructura de datos_dashboard.json
+    
+    Returns:
+        dict: {nombre: datos} con 'senales', 'espectrogramas', 'multicanal' (si existe),
+              'caracteristicas' y 'clasificacion'
+    """
+    visualizacion = datos_dashboard['visualizacion']
+    secciones = {
+        'senales': {clave: visualizacion[clave] for clave in CLAVES_SENALES},
+        'espectrogramas': {clave: visualizacion[clave] for clave in CLAVES_ESPECTROGRAMAS},
+        'multicanal': visualizacion.get('multicanal'),
+        'caracteristicas': datos_dashboard['caracteristicas'],
+        'clasificacion': datos_dashboard['clasificacion']
+    }
+    return {nombre: seccion for nombre, seccion in secciones.items() if seccion is not None}
+
+def exportar_secciones(datos_dashboard, directorio=DIRECTORIO_SECCIONES):
+    """
+    Guarda cada sección del dashboard en formato binario (formato_binario), más un índice
+    
+    El índice (indice.json) lleva info_general y, por sección, el nombre y el tamaño de
+    su archivo; se escribe al final, así que solo lista secciones completas. No se
+    escribe una copia JSON por sección: el respaldo es datos_dashboard.json.
+    
+    Args:
+        datos_dashboard: Estructura de datos_dashboard.json
+        directorio: Carpeta de salida (se crea si no existe)
+    
+    Returns:
+        dict: Contenido del índice
+    """
+    os.makedirs(directorio, exist_ok=True)
+    indice = {'version': 1, 'info_general': datos_dashboard['info_general'], 'secciones': {}}
+    for nombre, seccion in dividir_secciones(datos_dashboard).items():
+        binario = nombre + '.bin'
+        indice['secciones'][nombre] = {
+            'binario': binario,
+            'bytes_binario': exportar_binario(seccion, os.path.join(directorio, binario))
+        }
+    escribir_json(indice, os.path.join(directorio, 'indice.json'))
+    return indice
+
+@instrumentar(nombre='etapa.htmls')
+def etapa_htmls():
+    """
+    Paso 5: Generar los archivos HTML individuales de cada gráfica
+    """
+    imprimir_paso("PASO 5: GENERANDO HTMLS INDIVIDUALES")
+    generar_htmls_individuales(ARCHIVO_DASHBOARD, 'imagenes')
+
+@instrumentar(nombre='etapa.ingesta')
+def etapa_ingesta(patron):
+    """
+    Paso 1 (modo multi-registro): extraer las características de todos los registros
+    del directorio o patrón en caracteristicas_registros.npz
+    """
+    imprimir_paso("PASO 1: INGESTA DE MÚLTIPLES REGISTROS")
+    procesar_registros(patron, ARCHIVO_REGISTROS, cache=CacheCaracteristicas())
+
+@instrumentar(nombre='etapa.clasificacion_registros')
+def etapa_clasificacion_registros():
+    """
+    Paso 2 (modo multi-registro): clasificación con SVM de la matriz combinada
+    (resultados_clasificacion_registros.json, sin tocar los resultados del registro único)
+    """
+    imprimir_paso("PASO 2: CLASIFICACIÓN CON SVM")
+    datos = np.load(ARCHIVO_REGISTROS)
+    clasificar_datos(datos['caracteristicas'], datos['etiquetas'], ruta_resultados=ARCHIVO_CLASIFICACION_REGISTROS)
+
+def crear_etapas_registros(patron):
+    """
+    Etapas del modo multi-registro: ingesta concurrente y clasificación
+    
+    Args:
+        patron: Directorio o patrón glob de archivos .mat
+    
+    Returns:
+        list: Etapas del pipeline
+    """
+    return [
+        Etapa('ingesta', lambda: etapa_ingesta(patron),
+              entradas=listar_registros(patron) + [codigo('ingesta_multiple.py'), codigo('process_eeg.py'),
+                                                   codigo('registro_caracteristicas.py'),
+                                                   codigo('remuestreo.py'), codigo('carga_mat.py')],
+              salidas=[ARCHIVO_REGISTROS]),
+        Etapa('clasificacion', etapa_clasificacion_registros,
+              entradas=[ARCHIVO_REGISTROS, codigo('classify.py')],
+              salidas=[ARCHIVO_CLASIFICACION_REGISTROS])
+    ]
+
+def crear_etapas(filepath=ARCHIVO_MAT):
+    """
+    Define las etapas del pipeline con sus archivos de entrada y salida
+    
+    Args:
+        filepath: Ruta al archivo .mat
+    
+    Returns:
+        list: Etapas del pipeline
+    """
+    return [
+        Etapa('caracteristicas', lambda: etapa_caracteristicas(filepath),
+              entradas=[filepath, codigo('process_eeg.py'), codigo('registro_caracteristicas.py'),
+                        codigo('remuestreo.py'), codigo('carga_mat.py'), codigo('main.py')],
+              salidas=rutas_procesados(directorio=ARCHIVO_PROCESADOS)),
+        Etapa('visualizacion', etapa_visualizacion,
+              entradas=rutas_procesados(('data_ictal', 'data_interictal'), ARCHIVO_PROCESADOS)
+                       + [codigo('visualize_signals.py')],
+              salidas=[ARCHIVO_VISUALIZACION, 'visualizaciones_eeg.png']
+                      + [ruta + extension for ruta in ESPECTROGRAMAS.values()
+                         for extension in ('.npy', '.meta.npz')]),
+        Etapa('clasificacion', etapa_clasificacion,
+              entradas=rutas_procesados(('caracteristicas', 'etiquetas'), ARCHIVO_PROCESADOS)
+                       + [codigo('classify.py'), codigo('modelo.py')],
+              salidas=[ARCHIVO_CLASIFICACION, ARCHIVO_MODELO]),
+        Etapa('dashboard', etapa_dashboard,
+              entradas=rutas_procesados(('caracteristicas', 'etiquetas'), ARCHIVO_PROCESADOS)
+                       + [ARCHIVO_VISUALIZACION, ARCHIVO_CLASIFICACION, codigo('main.py')],
+              salidas=[ARCHIVO_DASHBOARD, ARCHIVO_INDICE_SECCIONES]),
+        Etapa('htmls', etapa_htmls,
+              entradas=[ARCHIVO_DASHBOARD, codigo('generar_htmls_individuales.py')],
+              salidas=[os.path.join('imagenes', nombre) for nombre, _ in GRAFICAS])
+    ]
+
+def reportar_instrumentacion():
+    """
+    Imprime el resumen y guarda la traza de instrumentación (solo con EEG_INSTRUMENTACION=1)
+    """
+    imprimir_resumen()
+    if guardar_traza(ARCHIVO_TRAZA):
+        print(f"\nTraza de instrumentación guardada en '{ARCHIVO_TRAZA}'")
+
+def main(forzar=False, patron_registros=None):
+    """
+    Función principal que ejecuta todo el pipeline
+    
+    Las etapas cuyas salidas están al día se omiten; visualización y clasificación
+    se ejecutan en paralelo.
+    
+    Args:
+        forzar: Si True, ejecuta todas las etapas aunque estén al día
+        patron_registros: Directorio o patrón glob; si se indica, se ingieren todos los
+                          registros y se clasifica la matriz combinada (sin dashboard)
+    """
+    print("=" * 70)
+    print("ANÁLISIS DE SEÑALES EEG PARA DETECCIÓN DE CONVULSIONES")
+    print("=" * 70)
+    print("\nPontificia Universidad Javeriana - Bogotá")
+    print("Procesamiento de Señales Biológicas")
+    print("Realizado por: Felipe Rangel\n")
+    
+    if patron_registros:
+        with medir('pipeline'):
+            estados = ejecutar_pipeline(crear_etapas_registros(patron_registros), forzar=forzar)
+        print("\nEtapas:")
+        for nombre, estado in estados.items():
+            print(f"  - {nombre}: {estado}")
+        reportar_instrumentacion()
+        return
+    
+    with medir('pipeline'):
+        estados = ejecutar_pipeline(crear_etapas(ARCHIVO_MAT), forzar=forzar)
+    
     print("\n" + "=" * 70)
     print("PIPELINE COMPLETADO EXITOSAMENTE")
     print("=" * 70)
     print("\nArchivos generados:")
-    print("  - datos_procesados.npz: Datos procesados")
+    print("  - datos_procesados/*.npy: Características, etiquetas y señales (memory-map)")
     print("  - datos_visualizacion.json: Datos de visualización")
     print("  - resultados_clasificacion.json: Resultados de clasificación")
-    print("  - datos_dashboard.json: Datos completos para el dashboard")
+    print("  - modelo_eeg.joblib: Modelo entrenado (scaler + SVM + bandas + fs)")
+    print("  - datos_dashboard.json: Datos completos para el dashboard (respaldo de las secciones)")
+    print("  - secciones_dashboard/: Un archivo binario compacto por sección más indice.json")
     print("  - visualizaciones_eeg.png: Gráficas de verificación")
+    print("  - espectrogramas_{ictal,interictal}.npy: Espectrogramas cuantizados de todos los eventos")
+    print("  - imagenes/*.html: Gráficas individuales")
+    print("\nEtapas:")
+    for nombre, estado in estados.items():
+        print(f"  - {nombre}: {estado}")
     print("\nEl dashboard HTML puede ser generado usando 'datos_dashboard.json'")
+    reportar_instrumentacion()
 
 if __name__ == "__main__":
-    main()
-
+    # Uso: python main.py [--forzar] [--registros DIRECTORIO_O_PATRON]
+    patron = sys.argv[sys.argv.index('--registros') + 1] if '--registros' in sys.argv else None
+    main(forzar='--forzar' in sys.argv, patron_registros=patron)
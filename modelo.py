@@ -0,0 +1,212 @@
+"""
+Artefacto versionado del modelo de detección de convulsiones
+Guarda en un solo archivo el scaler, el clasificador, las bandas de frecuencia y fs,
+y permite clasificar segmentos nuevos sin reentrenar
+"""
+
+import time
+import joblib
+import numpy as np
+import sklearn
+from process_eeg import BANDAS_FRECUENCIA, NPERSEG_WELCH, extraer_caracteristicas_eventos
+from registro_caracteristicas import CARACTERISTICAS_BASE, columnas_caracteristicas
+from remuestreo import remuestrear_lote
+
+ARCHIVO_MODELO = 'modelo_eeg.joblib'
+
+# Se incrementa cuando cambia la estructura del artefacto
+VERSION_FORMATO = 1
+
+def nombres_caracteristicas(bandas=None, n_canales=None, modo_canales='aplanar',
+                            caracteristicas=CARACTERISTICAS_BASE):
+    """
+    Nombres de las columnas de la matriz de características para unas bandas dadas
+    
+    Args:
+        bandas: Diccionario de bandas (default BANDAS_FRECUENCIA)
+        n_canales: Número de canales (None para datos sin eje de canales)
+        modo_canales: Combinación de canales usada en la extracción (ver combinar_canales)
+        caracteristicas: Nombres de las características del registro
+    """
+    nombres = columnas_caracteristicas(caracteristicas, bandas)
+    if n_canales is None:
+        return nombres
+    if modo_canales == 'aplanar':
+        return [f'Ch{canal} {nombre}' for canal in range(n_canales) for nombre in nombres]
+    return [f'{estadistico} {nombre}' for estadistico in ('Media', 'Std', 'Max') for nombre in nombres]
+
+class Modelo:
+    """
+    Clasificador entrenado junto con la configuración de extracción de características
+    """
+
+    def __init__(self, clf, scaler, fs=500.0, bandas=None, n_muestras=None, metadatos=None,
+                 n_canales=None, modo_canales='aplanar', caracteristicas=CARACTERISTICAS_BASE,
+                 dtype='float64'):
+        """
+        Args:
+            clf: Clasificador entrenado (devuelto por clasificar_datos)
+            scaler: StandardScaler ajustado (devuelto por clasificar_datos)
+            fs: Frecuencia de muestreo usada para las características
+            bandas: Diccionario {nombre: (fmin, fmax)} (default BANDAS_FRECUENCIA)
+            n_muestras: Muestras por segmento de entrenamiento (None si no se conoce)
+            metadatos: Diccionario con información adicional (p. ej. resultados)
+            n_canales: Canales por evento (None si los eventos no tienen eje de canales)
+            modo_canales: Combinación de canales usada en la extracción (ver combinar_canales)
+            caracteristicas: Nombres de las características del registro usadas al entrenar
+            dtype: Precisión con la que se extraen las características ('float64' o 'float32')
+        """
+        self.clf = clf
+        self.scaler = scaler
+        self.fs = float(fs)
+        self.bandas = dict(bandas if bandas is not None else BANDAS_FRECUENCIA)
+        self.n_muestras = n_muestras
+        self.metadatos = dict(metadatos or {})
+        self.n_canales = n_canales
+        self.modo_canales = modo_canales
+        self.conjunto_caracteristicas = tuple(caracteristicas)
+        self.dtype = dtype
+
+    @property
+    def n_caracteristicas(self):
+        return len(nombres_caracteristicas(self.bandas, self.n_canales, self.modo_canales,
+                                           self.conjunto_caracteristicas))
+
+    def caracteristicas(self, senales, fs=None):
+        """
+        Extrae las características de segmentos crudos con la configuración del modelo
+    
+        Args:
+            senales: Array (n_eventos, n_muestras), (n_eventos, n_canales, n_muestras)
+                     o 1D para un solo segmento
+            fs: Frecuencia de muestreo de los segmentos (None = la del modelo); si
+                difiere de la del modelo se remuestrean antes de extraer
+    
+        Returns:
+            Array (n_eventos, n_caracteristicas)
+        """
+        senales = np.atleast_2d(senales)
+        if fs is not None:
+            senales = remuestrear_lote(senales, fs, self.fs)
+        return extraer_caracteristicas_eventos(senales, self.fs, self.modo_canales, self.bandas,
+                                               self.conjunto_caracteristicas, self.dtype)
+
+    def predecir_caracteristicas(self, caracteristicas):
+        """
+        Clasifica vectores de características ya calculados
+    
+        Args:
+            caracteristicas: Array (n_eventos, n_caracteristicas) o, para modelos multicanal
+                             con modo 'aplanar', (n_eventos, n_canales, n_caracteristicas)
+    
+        Returns:
+            tuple: (predicciones (1=ictal), puntajes de decision_function)
+        """
+        X = np.atleast_2d(np.asarray(caracteristicas, dtype=self.dtype))
+        if X.ndim > 2:
+            X = X.reshape(X.shape[0], -1)
+        if X.shape[1] != self.n_caracteristicas:
+            raise ValueError(f"Se esperaban {self.n_caracteristicas} características, "
+                             f"se recibieron {X.shape[1]}")
+    
+        X = self.scaler.transform(X)
+        predicciones = self.clf.predict(X)
+        if hasattr(self.clf, 'decision_function'):
+            puntajes = self.clf.decision_function(X)
+        else:
+            puntajes = predicciones.astype(float)
+        return predicciones, puntajes
+
+    def predecir_senales(self, senales, fs=None):
+        """
+        Extrae características y clasifica segmentos crudos en una sola llamada vectorizada
+    
+        Args:
+            senales: Array (n_eventos, n_muestras), (n_eventos, n_canales, n_muestras)
+                     o 1D para un solo segmento
+            fs: Frecuencia de muestreo de los segmentos (None = la del modelo)
+    
+        Returns:
+            tuple: (predicciones (1=ictal), puntajes de decision_function)
+        """
+        return self.predecir_caracteristicas(self.caracteristicas(senales, fs))
+
+def guardar_modelo(modelo, ruta=ARCHIVO_MODELO):
+    """
+    Guarda el modelo con joblib junto con la versión del formato y de las librerías
+    
+    Args:
+        modelo: Instancia de Modelo
+        ruta: Ruta del archivo de salida
+    
+    Returns:
+        str: Ruta del archivo
+    """
+    artefacto = {
+        'version_formato': VERSION_FORMATO,
+        'creado': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'versiones': {'scikit-learn': sklearn.__version__, 'numpy': np.__version__},
+        'clf': modelo.clf,
+        'scaler': modelo.scaler,
+        'fs': modelo.fs,
+        'bandas': modelo.bandas,
+        'welch': {'nperseg': NPERSEG_WELCH},
+        'nombres_caracteristicas': nombres_caracteristicas(modelo.bandas, modelo.n_canales,
+                                                           modelo.modo_canales, modelo.conjunto_caracteristicas),
+        'caracteristicas': list(modelo.conjunto_caracteristicas),
+        'dtype': modelo.dtype,
+        'n_muestras': modelo.n_muestras,
+        'n_canales': modelo.n_canales,
+        'modo_canales': modelo.modo_canales,
+        'metadatos': modelo.metadatos
+    }
+    joblib.dump(artefacto, ruta)
+    return ruta
+
+def cargar_modelo(ruta=ARCHIVO_MODELO):
+    """
+    Carga un modelo guardado con guardar_modelo
+    
+    El archivo es un pickle de joblib: cargar solo artefactos de confianza.
+    
+    Args:
+        ruta: Ruta del archivo
+    
+    Returns:
+        Modelo
+    """
+    artefacto = joblib.load(ruta)
+    if not isinstance(artefacto, dict) or 'version_formato' not in artefacto:
+        raise ValueError(f"'{ruta}' no es un artefacto de modelo EEG")
+    if artefacto['version_formato'] != VERSION_FORMATO:
+        raise ValueError(f"Versión de formato no soportada: {artefacto['version_formato']} "
+                         f"(se esperaba {VERSION_FORMATO})")
+    if artefacto['welch']['nperseg'] != NPERSEG_WELCH:
+        raise ValueError("El modelo se entrenó con otros parámetros de Welch "
+                         f"(nperseg={artefacto['welch']['nperseg']})")
+    
+    version_sklearn = artefacto['versiones']['scikit-learn']
+    if version_sklearn != sklearn.__version__:
+        print(f"Advertencia: modelo guardado con scikit-learn {version_sklearn}, "
+              f"versión instalada {sklearn.__version__}")
+    
+    # Los artefactos anteriores no tienen eje de canales y usan las 7 características originales en float64
+    return Modelo(artefacto['clf'], artefacto['scaler'], artefacto['fs'], artefacto['bandas'],
+                  artefacto['n_muestras'], artefacto['metadatos'],
+                  artefacto.get('n_canales'), artefacto.get('modo_canales', 'aplanar'),
+                  artefacto.get('caracteristicas', CARACTERISTICAS_BASE), artefacto.get('dtype', 'float64'))
+
+if __name__ == "__main__":
+    from classify import clasificar_datos
+    
+    from almacen_procesados import cargar_procesados
+    
+    datos = cargar_procesados()
+    resultados, clf, scaler = clasificar_datos(datos['caracteristicas'], datos['etiquetas'])
+    
+    forma = datos.forma('data_ictal')
+    modelo = Modelo(clf, scaler, fs=float(datos['fs']), n_muestras=int(forma[-1]),
+                    metadatos={'accuracy': resultados['accuracy']},
+                    n_canales=int(forma[1]) if len(forma) == 3 else None)
+    guardar_modelo(modelo)
+    print(f"\nModelo guardado en '{ARCHIVO_MODELO}'")
@@ -0,0 +1,114 @@
+"""
+Ejecutor incremental del pipeline por etapas
+Cada etapa declara sus archivos de entrada y salida; se omite si sus salidas están
+al día y las etapas independientes se ejecutan en paralelo
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+class Etapa:
+    """
+    Etapa del pipeline: una función sin argumentos que lee `entradas` y escribe `salidas`
+    """
+
+    def __init__(self, nombre, funcion, entradas, salidas):
+        """
+        Args:
+            nombre: Nombre de la etapa
+            funcion: Función sin argumentos que ejecuta la etapa
+            entradas: Rutas de los archivos que lee (datos y código fuente)
+            salidas: Rutas de los archivos que genera
+        """
+        self.nombre = nombre
+        self.funcion = funcion
+        self.entradas = list(entradas)
+        self.salidas = list(salidas)
+
+    def __repr__(self):
+        return f"Etapa({self.nombre!r})"
+
+def etapa_actualizada(etapa):
+    """
+    Indica si todas las salidas existen y son más recientes que todas las entradas
+
+    Args:
+        etapa: Etapa a revisar
+
+    Returns:
+        bool: True si la etapa se puede omitir
+    """
+    if not all(os.path.exists(ruta) for ruta in etapa.salidas):
+        return False
+
+    entradas = [ruta for ruta in etapa.entradas if os.path.exists(ruta)]
+    if not entradas:
+        return True
+
+    return (min(os.path.getmtime(ruta) for ruta in etapa.salidas)
+            >= max(os.path.getmtime(ruta) for ruta in entradas))
+
+def calcular_dependencias(etapas):
+    """
+    Deduce las dependencias entre etapas: B depende de A si B lee una salida de A
+
+    Returns:
+        dict: {nombre_etapa: set(nombres de las etapas de las que depende)}
+    """
+    productor = {}
+    for etapa in etapas:
+        for ruta in etapa.salidas:
+            productor[os.path.normpath(ruta)] = etapa.nombre
+
+    return {etapa.nombre: {productor[os.path.normpath(ruta)] for ruta in etapa.entradas
+                           if os.path.normpath(ruta) in productor
+                           and productor[os.path.normpath(ruta)] != etapa.nombre}
+            for etapa in etapas}
+
+def ejecutar_pipeline(etapas, forzar=False, max_hilos=None):
+    """
+    Ejecuta las etapas respetando sus dependencias
+
+    Una etapa empieza cuando terminan todas las etapas de las que depende; si sus
+    salidas están al día (y no se pide forzar) se omite. Las etapas listas al mismo
+    tiempo se ejecutan en hilos concurrentes.
+
+    Args:
+        etapas: Lista de Etapa
+        forzar: Si True, ejecuta todas las etapas aunque estén al día
+        max_hilos: Número máximo de etapas simultáneas (default: número de etapas)
+
+    Returns:
+        dict: {nombre_etapa: 'ejecutada' | 'omitida'}
+    """
+    por_nombre = {etapa.nombre: etapa for etapa in etapas}
+    pendientes = calcular_dependencias(etapas)
+    estados = {}
+
+    with ThreadPoolExecutor(max_workers=max_hilos or len(etapas) or 1) as executor:
+        en_curso = {}
+        while pendientes or en_curso:
+            # Lanzar las etapas cuyas dependencias ya terminaron
+            listas = [nombre for nombre, deps in pendientes.items() if deps <= estados.keys()]
+            for nombre in listas:
+                del pendientes[nombre]
+                etapa = por_nombre[nombre]
+                if not forzar and etapa_actualizada(etapa):
+                    print(f"[pipeline] Etapa '{nombre}' al día, se omite")
+                    estados[nombre] = 'omitida'
+                else:
+                    print(f"[pipeline] Ejecutando etapa '{nombre}'")
+                    en_curso[executor.submit(etapa.funcion)] = nombre
+
+            if listas and not en_curso:
+                continue
+            if not en_curso:
+                raise ValueError(f"Dependencias circulares entre etapas: {sorted(pendientes)}")
+
+            terminadas, _ = wait(en_curso, return_when=FIRST_COMPLETED)
+            for tarea in terminadas:
+                nombre = en_curso.pop(tarea)
+                tarea.result()  # Propaga la excepción de la etapa, si la hubo
+                estados[nombre] = 'ejecutada'
+
+    return estados
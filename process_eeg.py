@@ -1,20 +1,21 @@
 """
 Script para procesar señales EEG y extraer características
 Calcula: mean, variance, PSD en bandas delta, theta, alpha, beta, gamma
+(y opcionalmente las demás características de registro_caracteristicas)
 """
 
-import scipy.io
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 import numpy as np
 from scipy import signal
-
-# Bandas de frecuencia EEG estándar (en Hz)
-BANDAS_FRECUENCIA = {
-    'delta': (0.5, 4),
-    'theta': (4, 8),
-    'alpha': (8, 13),
-    'beta': (13, 30),
-    'gamma': (30, 100)
-}
+from carga_mat import cargar_registro, iterar_bloques, TAMANO_BLOQUE
+from instrumentacion import instrumentar
+from registro_caracteristicas import (BANDAS_FRECUENCIA, NPERSEG_WELCH, CARACTERISTICAS_BASE,
+                                      calcular_caracteristicas, columnas_caracteristicas)
+from remuestreo import adaptar_frecuencia, necesita_remuestreo, FS_OBJETIVO
+from almacen_procesados import guardar_procesados, DIRECTORIO_PROCESADOS
 
 def calcular_psd_banda(senal, fs, banda_min, banda_max):
     """
@@ -44,6 +45,120 @@ def calcular_psd_banda(senal, fs, banda_min, banda_max):
     
     return psd_banda
 
+# Cómo se combinan las características de los canales de un evento (n_eventos, n_canales, n_muestras):
+# 'aplanar' concatena las de cada canal; 'agregar' usa media, desviación y máximo entre canales
+MODOS_CANALES = ('aplanar', 'agregar')
+
+def parametros_extraccion(fs=500.0, modo_canales='aplanar', caracteristicas=CARACTERISTICAS_BASE,
+                          dtype='float64'):
+    """
+    Describe los parámetros que determinan la matriz de características
+    
+    Args:
+        fs: Frecuencia de muestreo usada en la extracción (None si se usa la fs propia de
+            cada archivo, que queda determinada por su contenido)
+        modo_canales: Combinación de canales para datos multicanal (MODOS_CANALES)
+        caracteristicas: Nombres de las características del registro (registro_caracteristicas)
+        dtype: Precisión del cálculo ('float64' o 'float32')
+    
+    Returns:
+        dict serializable con las bandas, fs, los parámetros de Welch, el modo de canales,
+        las características calculadas y la precisión
+    """
+    return {
+        'bandas': BANDAS_FRECUENCIA,
+        'fs': float(fs) if fs is not None else None,
+        'welch': {'nperseg': NPERSEG_WELCH, 'noverlap': None, 'nfft': None, 'window': 'hann'},
+        'modo_canales': modo_canales,
+        'caracteristicas': list(caracteristicas),
+        'dtype': dtype
+    }
+
+@instrumentar
+def extraer_caracteristicas_lote(senales, fs=500.0, bandas=None, caracteristicas=CARACTERISTICAS_BASE,
+                                 dtype='float64'):
+    """
+    Extrae las características de todos los segmentos en una sola pasada vectorizada
+    
+    Todos los ejes salvo el último se tratan como lote, así que los datos multicanal
+    (n_eventos, n_canales, n_muestras) se procesan sin bucles por canal. Cada
+    intermedio (Welch, STFT, derivadas) se calcula una sola vez por lote (ver
+    registro_caracteristicas.calcular_caracteristicas).
+    
+    Args:
+        senales: Array (..., n_muestras), p. ej. (n_eventos, n_muestras) o
+                 (n_eventos, n_canales, n_muestras)
+        fs: Frecuencia de muestreo (default 500 Hz)
+        bandas: Diccionario {nombre: (fmin, fmax)} (default BANDAS_FRECUENCIA)
+        caracteristicas: Nombres de las características del registro (default las 7 originales)
+        dtype: 'float64' o 'float32' (precisión de la señal, Welch y el resultado)
+    
+    Returns:
+        Array (..., n_columnas); con CARACTERISTICAS_BASE son 7: [mean, variance, psd_delta,
+        psd_theta, psd_alpha, psd_beta, psd_gamma]
+    """
+    return calcular_caracteristicas(senales, fs, caracteristicas, bandas, dtype)
+
+def combinar_canales(caracteristicas, modo_canales='aplanar'):
+    """
+    Convierte las características por canal en un vector por evento
+    
+    Args:
+        caracteristicas: Array (n_eventos, n_caracteristicas) o
+                         (n_eventos, n_canales, n_caracteristicas)
+        modo_canales: 'aplanar' -> (n_eventos, n_canales * n_caracteristicas), canal por canal;
+                      'agregar' -> (n_eventos, 3 * n_caracteristicas) con la media, la
+                      desviación estándar y el máximo entre canales (independiente del
+                      número de canales)
+    
+    Returns:
+        Array 2D (n_eventos, n_columnas)
+    """
+    if modo_canales not in MODOS_CANALES:
+        raise ValueError(f"Modo de canales desconocido: {modo_canales!r} (opciones: {MODOS_CANALES})")
+    if caracteristicas.ndim == 2:
+        return caracteristicas
+    
+    if modo_canales == 'aplanar':
+        return caracteristicas.reshape(caracteristicas.shape[0], -1)
+    return np.concatenate([caracteristicas.mean(axis=1), caracteristicas.std(axis=1),
+                           caracteristicas.max(axis=1)], axis=-1)
+
+def n_columnas_caracteristicas(forma_datos, modo_canales='aplanar', bandas=None,
+                               caracteristicas=CARACTERISTICAS_BASE):
+    """
+    Número de columnas de la matriz de características para datos de la forma dada
+    
+    Args:
+        forma_datos: (n_eventos, n_muestras) o (n_eventos, n_canales, n_muestras)
+        modo_canales: Ver combinar_canales
+        bandas: Diccionario de bandas (default BANDAS_FRECUENCIA)
+        caracteristicas: Nombres de las características del registro
+    """
+    n = len(columnas_caracteristicas(caracteristicas, bandas))
+    if len(forma_datos) <= 2:
+        return n
+    return n * int(np.prod(forma_datos[1:-1])) if modo_canales == 'aplanar' else 3 * n
+
+def extraer_caracteristicas_eventos(senales, fs=500.0, modo_canales='aplanar', bandas=None,
+                                    caracteristicas=CARACTERISTICAS_BASE, dtype='float64'):
+    """
+    Extrae un vector de características por evento, con o sin eje de canales
+    
+    Args:
+        senales: Array (n_eventos, n_muestras) o (n_eventos, n_canales, n_muestras)
+        fs: Frecuencia de muestreo (default 500 Hz)
+        modo_canales: Ver combinar_canales
+        bandas: Diccionario de bandas (default BANDAS_FRECUENCIA)
+        caracteristicas: Nombres de las características del registro
+        dtype: 'float64' o 'float32'
+    
+    Returns:
+        Array (n_eventos, n_columnas)
+    """
+    return combinar_canales(extraer_caracteristicas_lote(senales, fs, bandas, caracteristicas, dtype),
+                            modo_canales)
+
 def extraer_caracteristicas(senal):
     """
     Extrae las 7 características de un segmento de señal
@@ -58,74 +173,246 @@ def extraer_caracteristicas(senal):
     # Obtener frecuencia de muestreo (asumimos 500 Hz basado en la exploración)
     fs = 500.0
     
-    # 1. Media
-    mean_val = np.mean(senal)
+    return extraer_caracteristicas_lote(np.asarray(senal)[np.newaxis, :], fs)[0]
+
+def extraer_caracteristicas_por_bloques(datos, fs=500.0, tamano_bloque=TAMANO_BLOQUE,
+                                       modo_canales='aplanar', caracteristicas=CARACTERISTICAS_BASE,
+                                       dtype='float64'):
+    """
+    Extrae las características de un arreglo de eventos leyendo un bloque de filas a la vez
+    
+    Args:
+        datos: Array o vista perezosa (n_eventos, n_muestras) o
+               (n_eventos, n_canales, n_muestras), p. ej. un np.memmap
+        fs: Frecuencia de muestreo (default 500 Hz)
+        tamano_bloque: Eventos por bloque cargados en memoria
+        modo_canales: Ver combinar_canales
+        caracteristicas: Nombres de las características del registro
+        dtype: 'float64' o 'float32' (cada bloque se convierte al leerlo)
+    
+    Returns:
+        Array (n_eventos, n_columnas) del tipo dtype con las características de cada evento
+        (7 columnas con las características originales y sin eje de canales)
+    """
+    matriz = np.empty((datos.shape[0], n_columnas_caracteristicas(datos.shape, modo_canales,
+                                                                  caracteristicas=caracteristicas)),
+                      dtype=dtype)
+    for inicio, bloque in iterar_bloques(datos, tamano_bloque):
+        matriz[inicio:inicio + len(bloque)] = extraer_caracteristicas_eventos(
+            bloque, fs, modo_canales, caracteristicas=caracteristicas, dtype=dtype)
+    
+    return matriz
+
+# Estado de cada proceso trabajador (vistas sobre la entrada y la salida compartidas)
+_ESTADO_TRABAJADOR = {}
+
+def _describir_memmap(datos):
+    """
+    Describe un np.memmap (o su transpuesta) para que otro proceso lo abra por ruta
+    
+    Returns:
+        dict con filename, offset, dtype, shape, orden y transpuesto, o None si
+        `datos` no es un mapeo completo de un archivo
+    """
+    raiz, transpuesto = datos, False
+    if (isinstance(datos, np.memmap) and isinstance(datos.base, np.memmap)
+            and datos.shape == datos.base.shape[::-1]
+            and datos.strides == datos.base.strides[::-1]):
+        raiz, transpuesto = datos.base, True
     
-    # 2. Varianza
-    variance_val = np.var(senal)
+    if (not isinstance(raiz, np.memmap) or not isinstance(raiz.base, mmap.mmap)
+            or raiz.filename is None):
+        return None
     
-    # 3-7. PSD en cada banda de frecuencia
-    psd_delta = calcular_psd_banda(senal, fs, BANDAS_FRECUENCIA['delta'][0], 
-                                    BANDAS_FRECUENCIA['delta'][1])
-    psd_theta = calcular_psd_banda(senal, fs, BANDAS_FRECUENCIA['theta'][0], 
-                                    BANDAS_FRECUENCIA['theta'][1])
-    psd_alpha = calcular_psd_banda(senal, fs, BANDAS_FRECUENCIA['alpha'][0], 
-                                    BANDAS_FRECUENCIA['alpha'][1])
-    psd_beta = calcular_psd_banda(senal, fs, BANDAS_FRECUENCIA['beta'][0], 
-                                   BANDAS_FRECUENCIA['beta'][1])
-    psd_gamma = calcular_psd_banda(senal, fs, BANDAS_FRECUENCIA['gamma'][0], 
-                                   BANDAS_FRECUENCIA['gamma'][1])
+    return {
+        'filename': raiz.filename,
+        'offset': raiz.offset,
+        'dtype': raiz.dtype.str,
+        'shape': raiz.shape,
+        'orden': 'C' if raiz.flags.c_contiguous else 'F',
+        'transpuesto': transpuesto
+    }
+
+def _abrir_memoria_compartida(nombre, shape, dtype):
+    # Adjunta un bloque de memoria compartida creado por el proceso principal
+    memoria = shared_memory.SharedMemory(name=nombre)
+    return memoria, np.ndarray(shape, dtype=dtype, buffer=memoria.buf)
+
+def _inicializar_trabajador(entrada, salida, fs, modo_canales, caracteristicas, dtype):
+    if entrada['tipo'] == 'memmap':
+        datos = np.memmap(entrada['filename'], dtype=entrada['dtype'], mode='r',
+                          offset=entrada['offset'], shape=entrada['shape'],
+                          order=entrada['orden'])
+        _ESTADO_TRABAJADOR['entrada'] = datos.T if entrada['transpuesto'] else datos
+    else:
+        memoria, datos = _abrir_memoria_compartida(entrada['nombre'], entrada['shape'],
+                                                   entrada['dtype'])
+        _ESTADO_TRABAJADOR['memoria_entrada'] = memoria
+        _ESTADO_TRABAJADOR['entrada'] = datos
     
-    return np.array([mean_val, variance_val, psd_delta, psd_theta, 
-                     psd_alpha, psd_beta, psd_gamma])
+    memoria, matriz = _abrir_memoria_compartida(salida['nombre'], salida['shape'], salida['dtype'])
+    _ESTADO_TRABAJADOR['memoria_salida'] = memoria
+    _ESTADO_TRABAJADOR['salida'] = matriz
+    _ESTADO_TRABAJADOR['fs'] = fs
+    _ESTADO_TRABAJADOR['modo_canales'] = modo_canales
+    _ESTADO_TRABAJADOR['caracteristicas'] = caracteristicas
+    _ESTADO_TRABAJADOR['dtype'] = dtype
 
-def procesar_datos(filepath):
+def _procesar_fragmento(inicio, fin):
+    # Escribe las características de los eventos [inicio, fin) en la matriz compartida
+    bloque = np.asarray(_ESTADO_TRABAJADOR['entrada'][inicio:fin])
+    _ESTADO_TRABAJADOR['salida'][inicio:fin] = extraer_caracteristicas_eventos(
+        bloque, _ESTADO_TRABAJADOR['fs'], _ESTADO_TRABAJADOR['modo_canales'],
+        caracteristicas=_ESTADO_TRABAJADOR['caracteristicas'], dtype=_ESTADO_TRABAJADOR['dtype'])
+
+def extraer_caracteristicas_paralelo(datos, fs=500.0, n_procesos=None, tamano_bloque=TAMANO_BLOQUE,
+                                    modo_canales='aplanar', caracteristicas=CARACTERISTICAS_BASE,
+                                    dtype='float64'):
+    """
+    Extrae las características repartiendo bloques de eventos entre varios procesos
+    
+    Los trabajadores leen los eventos directamente del archivo si `datos` es un
+    np.memmap, o de un bloque de memoria compartida en otro caso, y escriben sus
+    resultados en una matriz de características compartida y preasignada. Los
+    bloques son los mismos que en extraer_caracteristicas_por_bloques, por lo que
+    el resultado es idéntico al del camino serial.
+    
+    Args:
+        datos: Array o vista perezosa (n_eventos, n_muestras) o (n_eventos, n_canales, n_muestras)
+        fs: Frecuencia de muestreo (default 500 Hz)
+        n_procesos: Número de procesos (default os.cpu_count()); 1 usa el camino serial
+        tamano_bloque: Eventos por tarea enviada a cada proceso
+        modo_canales: Ver combinar_canales
+        caracteristicas: Nombres de las características del registro
+        dtype: 'float64' o 'float32'; con float32 la copia en memoria compartida y la
+               matriz de salida ocupan la mitad
+    
+    Returns:
+        Array (n_eventos, n_columnas) del tipo dtype con las características de cada evento
+    """
+    if n_procesos is None:
+        n_procesos = os.cpu_count() or 1
+    n_eventos = datos.shape[0]
+    if n_procesos <= 1 or n_eventos <= tamano_bloque:
+        return extraer_caracteristicas_por_bloques(datos, fs, tamano_bloque, modo_canales, caracteristicas,
+                                                   dtype)
+    
+    memorias = []
+    try:
+        entrada = _describir_memmap(datos)
+        if entrada is not None:
+            entrada['tipo'] = 'memmap'
+        else:
+            # Copiar una sola vez la entrada a memoria compartida (sin pickles por tarea)
+            datos = np.asarray(datos, dtype=dtype)
+            memoria = shared_memory.SharedMemory(create=True, size=max(datos.nbytes, 1))
+            memorias.append(memoria)
+            np.ndarray(datos.shape, dtype=datos.dtype, buffer=memoria.buf)[:] = datos
+            entrada = {'tipo': 'compartida', 'nombre': memoria.name,
+                       'shape': datos.shape, 'dtype': datos.dtype.str}
+    
+        forma_salida = (n_eventos, n_columnas_caracteristicas(datos.shape, modo_canales,
+                                                              caracteristicas=caracteristicas))
+        tipo_salida = np.dtype(dtype)
+        memoria = shared_memory.SharedMemory(create=True, size=tipo_salida.itemsize * int(np.prod(forma_salida)))
+        memorias.append(memoria)
+        salida = {'nombre': memoria.name, 'shape': forma_salida, 'dtype': tipo_salida.str}
+    
+        with ProcessPoolExecutor(max_workers=n_procesos, initializer=_inicializar_trabajador,
+                                 initargs=(entrada, salida, fs, modo_canales, tuple(caracteristicas),
+                                           dtype)) as executor:
+            tareas = [executor.submit(_procesar_fragmento, inicio, min(inicio + tamano_bloque, n_eventos))
+                      for inicio in range(0, n_eventos, tamano_bloque)]
+            for tarea in tareas:
+                tarea.result()
+    
+        matriz = np.ndarray(forma_salida, dtype=tipo_salida, buffer=memoria.buf).copy()
+    finally:
+        for memoria in memorias:
+            memoria.close()
+            memoria.unlink()
+    
+    return matriz
+
+@instrumentar
+def procesar_datos(filepath, tamano_bloque=TAMANO_BLOQUE, n_procesos=1, cache=None,
+                   modo_canales='aplanar', fs_objetivo=FS_OBJETIVO, caracteristicas=CARACTERISTICAS_BASE,
+                   dtype='float64'):
     """
     Carga y procesa los datos del archivo .mat
     
     Args:
-        filepath: Ruta al archivo .mat
+        filepath: Ruta al archivo .mat (v5 o v7.3)
+        tamano_bloque: Eventos que se cargan en memoria a la vez (y por tarea en paralelo)
+        n_procesos: Procesos para la extracción de características (default 1 = serial,
+                    None = todos los núcleos)
+        cache: CacheCaracteristicas opcional; si contiene el archivo y los parámetros
+               actuales se omite la extracción de características
+        modo_canales: Para datos (n_eventos, n_canales, n_muestras): 'aplanar' o
+                      'agregar' (ver combinar_canales)
+        fs_objetivo: Frecuencia con la que se calculan las características; si la del
+                     archivo difiere más que TOLERANCIA_FS los eventos se remuestrean
+                     (None = usar la fs del archivo sin remuestrear)
+        caracteristicas: Nombres de las características del registro, p. ej.
+                         CARACTERISTICAS_EXTENDIDAS (default las 7 originales)
+        dtype: Precisión del cálculo de características ('float64' o 'float32'); la
+               matriz devuelta es de este tipo
     
     Returns:
         tuple: (matriz_caracteristicas, etiquetas, datos_ictal, datos_interictal, fs)
+               donde datos_ictal y datos_interictal se leen del archivo bajo demanda
+               (ya remuestreados, en cuyo caso fs es fs_objetivo)
     """
-    # Cargar datos
-    mat_data = scipy.io.loadmat(filepath)
-    
-    data_ictal = mat_data['Data_ictal']
-    data_interictal = mat_data['Data_interictal']
-    fs = float(mat_data['Fs'][0, 0])
+    # Abrir datos de forma perezosa (memory-map cuando es posible)
+    data_ictal, data_interictal, fs = cargar_registro(filepath)
     
     print(f"Frecuencia de muestreo: {fs:.2f} Hz")
     print(f"Eventos ictal: {data_ictal.shape[0]}")
     print(f"Eventos interictal: {data_interictal.shape[0]}")
-    print(f"Muestras por evento: {data_ictal.shape[1]}")
-    
-    # Extraer características de todos los eventos
-    caracteristicas_list = []
-    etiquetas_list = []
-    
-    # Procesar eventos ictal (etiqueta = 1)
-    print("\nProcesando eventos ictal...")
-    for i in range(data_ictal.shape[0]):
-        senal = data_ictal[i, :]
-        caracteristicas = extraer_caracteristicas(senal)
-        caracteristicas_list.append(caracteristicas)
-        etiquetas_list.append(1)  # 1 = ictal
-    
-    # Procesar eventos interictal (etiqueta = 0)
-    print("Procesando eventos interictal...")
-    for i in range(data_interictal.shape[0]):
-        senal = data_interictal[i, :]
-        caracteristicas = extraer_caracteristicas(senal)
-        caracteristicas_list.append(caracteristicas)
-        etiquetas_list.append(0)  # 0 = interictal
-    
-    # Convertir a arrays numpy
-    matriz_caracteristicas = np.array(caracteristicas_list)
-    etiquetas = np.array(etiquetas_list)
-    
-    print(f"\nMatriz de características: {matriz_caracteristicas.shape}")
+    if data_ictal.ndim == 3:
+        print(f"Canales: {data_ictal.shape[1]}")
+    print(f"Muestras por evento: {data_ictal.shape[-1]}")
+    
+    # Llevar los eventos a la frecuencia de las características (remuestreo perezoso por bloques)
+    remuestrear = fs_objetivo is not None and necesita_remuestreo(fs, fs_objetivo)
+    data_ictal, fs_caracteristicas = adaptar_frecuencia(data_ictal, fs, fs_objetivo)
+    data_interictal, _ = adaptar_frecuencia(data_interictal, fs, fs_objetivo)
+    if remuestrear:
+        print(f"Remuestreo: {fs:.2f} Hz -> {fs_caracteristicas:.2f} Hz "
+              f"({data_ictal.shape[-1]} muestras por evento)")
+        fs = fs_caracteristicas
+    
+    en_cache = None
+    if cache is not None:
+        clave_cache = cache.clave(filepath, parametros_extraccion(fs_caracteristicas, modo_canales,
+                                                                  caracteristicas, dtype))
+        en_cache = cache.obtener(clave_cache)
+    
+    if en_cache is not None:
+        print("\nCaracterísticas leídas de la caché")
+        matriz_caracteristicas, etiquetas = en_cache
+    else:
+        # Extraer características por bloques de eventos de cada clase
+        print("\nProcesando eventos ictal...")
+        caracteristicas_ictal = extraer_caracteristicas_paralelo(data_ictal, fs_caracteristicas, n_procesos,
+                                                                 tamano_bloque, modo_canales, caracteristicas,
+                                                                 dtype)
+    
+        print("Procesando eventos interictal...")
+        caracteristicas_interictal = extraer_caracteristicas_paralelo(data_interictal, fs_caracteristicas,
+                                                                      n_procesos, tamano_bloque, modo_canales,
+                                                                      caracteristicas, dtype)
+    
+        matriz_caracteristicas = np.vstack([caracteristicas_ictal, caracteristicas_interictal])
+        etiquetas = np.concatenate([np.ones(data_ictal.shape[0], dtype=int),       # 1 = ictal
+                                    np.zeros(data_interictal.shape[0], dtype=int)])  # 0 = interictal
+    
+        if cache is not None:
+            cache.guardar(clave_cache, matriz_caracteristicas, etiquetas,
+                          {'filepath': filepath,
+                           **parametros_extraccion(fs_caracteristicas, modo_canales, caracteristicas, dtype)})
+    
+    print(f"\nMatriz de características: {matriz_caracteristicas.shape} ({matriz_caracteristicas.dtype})")
     print(f"Etiquetas: {etiquetas.shape}")
     print(f"  - Ictal (1): {np.sum(etiquetas == 1)}")
     print(f"  - Interictal (0): {np.sum(etiquetas == 0)}")
@@ -137,12 +424,7 @@ if __name__ == "__main__":
     matriz_caracteristicas, etiquetas, data_ictal, data_interictal, fs = procesar_datos(filepath)
     
     # Guardar resultados para uso posterior
-    np.savez('datos_procesados.npz', 
-             caracteristicas=matriz_caracteristicas,
-             etiquetas=etiquetas,
-             data_ictal=data_ictal,
-             data_interictal=data_interictal,
-             fs=fs)
-    
-    print("\nDatos guardados en 'datos_procesados.npz'")
+    guardar_procesados(matriz_caracteristicas, etiquetas, data_ictal, data_interictal, fs)
+    
+    print(f"\nDatos guardados en '{DIRECTORIO_PROCESADOS}/'")
 
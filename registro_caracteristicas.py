@@ -0,0 +1,290 @@
+"""
+Registro extensible de características EEG
+Cada característica declara los intermedios que necesita (señal, PSD de Welch, STFT,
+derivadas); el motor calcula cada intermedio una sola vez por lote y solo ejecuta las
+características pedidas por nombre
+"""
+
+import numpy as np
+from scipy import signal
+from instrumentacion import instrumentar
+
+# Bandas de frecuencia EEG estándar (en Hz)
+BANDAS_FRECUENCIA = {
+    'delta': (0.5, 4),
+    'theta': (4, 8),
+    'alpha': (8, 13),
+    'beta': (13, 30),
+    'gamma': (30, 100)
+}
+
+# Parámetros del método de Welch compartidos por todas las bandas
+NPERSEG_WELCH = 256
+
+# Tipos de punto flotante soportados para el cálculo (float32 usa la mitad de memoria)
+DTYPES = ('float64', 'float32')
+
+# Porcentaje de la potencia bajo la frecuencia de borde espectral (SEF95)
+FRACCION_BORDE = 0.95
+
+# Intermedios y características registrados: {nombre: función} y {nombre: descripción}
+INTERMEDIOS = {}
+CARACTERISTICAS = {}
+
+# Las 7 características originales, en el orden de la matriz de características
+CARACTERISTICAS_BASE = ('media', 'varianza', 'psd_bandas')
+
+# Las originales más las espectrales y temporales adicionales
+CARACTERISTICAS_EXTENDIDAS = CARACTERISTICAS_BASE + (
+    'potencia_relativa', 'entropia_espectral', 'frecuencia_borde', 'hjorth',
+    'longitud_linea', 'flujo_espectral')
+
+def calcular_mascaras_bandas(freqs, bandas=None):
+    """
+    Precalcula la matriz de pesos que promedia la PSD en cada banda de frecuencia
+    
+    Args:
+        freqs: Array 1D con las frecuencias devueltas por Welch
+        bandas: Diccionario {nombre: (fmin, fmax)} (default BANDAS_FRECUENCIA)
+    
+    Returns:
+        Array (n_bandas, n_frecuencias) tal que psd @ pesos.T da la PSD media por banda
+        (0.0 en las bandas sin frecuencias)
+    """
+    if bandas is None:
+        bandas = BANDAS_FRECUENCIA
+    
+    mascaras = np.array([(freqs >= fmin) & (freqs <= fmax)
+                         for fmin, fmax in bandas.values()], dtype=float)
+    conteos = mascaras.sum(axis=1, keepdims=True)
+    
+    return np.divide(mascaras, conteos, out=np.zeros_like(mascaras), where=conteos > 0)
+
+def registrar_intermedio(nombre):
+    """
+    Decorador que registra un intermedio: función(contexto) -> valor
+    
+    El valor se calcula como mucho una vez por lote y lo comparten todas las
+    características que lo piden; un intermedio puede usar otros a través del contexto.
+    Con la instrumentación activa cada cálculo se mide como 'intermedio.<nombre>'.
+    """
+    def decorador(funcion):
+        INTERMEDIOS[nombre] = instrumentar(funcion, nombre=f'intermedio.{nombre}')
+        return funcion
+    return decorador
+
+def registrar_caracteristica(nombre, requiere, columnas):
+    """
+    Decorador que registra una característica: función(contexto) -> Array (...,) o (..., k)
+    
+    Con la instrumentación activa cada cálculo se mide como 'caracteristica.<nombre>'.
+    
+    Args:
+        nombre: Nombre con el que se pide la característica
+        requiere: Nombres de los intermedios que usa (deben estar registrados)
+        columnas: Lista con el nombre de cada columna, o función(bandas) -> lista
+    """
+    def decorador(funcion):
+        CARACTERISTICAS[nombre] = {'funcion': instrumentar(funcion, nombre=f'caracteristica.{nombre}'),
+                                   'requiere': tuple(requiere), 'columnas': columnas}
+        return funcion
+    return decorador
+
+class ContextoLote:
+    """
+    Señales de un lote y sus intermedios, calculados bajo demanda una sola vez
+    """
+
+    def __init__(self, senales, fs, bandas=None, dtype='float64'):
+        """
+        Args:
+            senales: Array (..., n_muestras)
+            fs: Frecuencia de muestreo
+            bandas: Diccionario {nombre: (fmin, fmax)} (default BANDAS_FRECUENCIA)
+            dtype: Tipo de punto flotante de las señales y los intermedios (DTYPES)
+        """
+        if dtype not in DTYPES:
+            raise ValueError(f"dtype no soportado: {dtype!r} (opciones: {DTYPES})")
+        self.senales = np.asarray(senales, dtype=dtype)
+        self.fs = fs
+        self.bandas = bandas if bandas is not None else BANDAS_FRECUENCIA
+        self._intermedios = {}
+
+    def __getitem__(self, nombre):
+        if nombre not in self._intermedios:
+            self._intermedios[nombre] = INTERMEDIOS[nombre](self)
+        return self._intermedios[nombre]
+
+    @property
+    def calculados(self):
+        return tuple(self._intermedios)
+
+# --- Intermedios ---
+
+@registrar_intermedio('varianza')
+def _varianza(contexto):
+    return np.var(contexto.senales, axis=-1)
+
+@registrar_intermedio('welch')
+def _welch(contexto):
+    # (freqs, psd) con los parámetros de Welch de process_eeg.parametros_extraccion
+    n_muestras = contexto.senales.shape[-1]
+    return signal.welch(contexto.senales, contexto.fs, nperseg=min(NPERSEG_WELCH, n_muestras),
+                        noverlap=None, nfft=None, axis=-1)
+
+@registrar_intermedio('stft')
+def _stft(contexto):
+    # (freqs, tiempos, potencia) con los parámetros de visualize_signals.calcular_espectrogramas_lote
+    # Al menos una muestra por ventana para segmentos de menos de 4 muestras
+    nperseg = max(1, min(256, contexto.senales.shape[-1] // 4))
+    return signal.spectrogram(contexto.senales, contexto.fs, nperseg=nperseg, noverlap=nperseg // 2,
+                              window='hann', axis=-1)
+
+@registrar_intermedio('derivada_1')
+def _derivada_1(contexto):
+    return np.diff(contexto.senales, axis=-1)
+
+@registrar_intermedio('derivada_2')
+def _derivada_2(contexto):
+    return np.diff(contexto['derivada_1'], axis=-1)
+
+# --- Características ---
+
+def _columnas_bandas(prefijo):
+    return lambda bandas: [f'{prefijo} {nombre.capitalize()}' for nombre in bandas]
+
+@registrar_caracteristica('media', requiere=(), columnas=['Mean'])
+def _media(contexto):
+    return np.mean(contexto.senales, axis=-1)
+
+@registrar_caracteristica('varianza', requiere=('varianza',), columnas=['Variance'])
+def _caracteristica_varianza(contexto):
+    return contexto['varianza']
+
+@registrar_caracteristica('psd_bandas', requiere=('welch',), columnas=_columnas_bandas('PSD'))
+def _psd_bandas(contexto):
+    # PSD media en cada banda
+    freqs, psd = contexto['welch']
+    return psd @ calcular_mascaras_bandas(freqs, contexto.bandas).astype(psd.dtype).T
+
+@registrar_caracteristica('potencia_relativa', requiere=('welch',), columnas=_columnas_bandas('Rel'))
+def _potencia_relativa(contexto):
+    # Potencia de cada banda sobre la potencia total entre la banda más baja y la más alta.
+    # Las bandas son semiabiertas [fmin, fmax) salvo la de mayor fmax, así las frecuencias
+    # de los bordes compartidos (4, 8, 13, 30 Hz) se cuentan una sola vez y, con bandas
+    # que no se solapan, las potencias relativas suman a lo sumo 1
+    freqs, psd = contexto['welch']
+    limites = np.array(list(contexto.bandas.values()), dtype=float)
+    cerrada = limites[:, 1:] == limites[:, 1].max()
+    mascaras = ((freqs >= limites[:, :1])
+                & ((freqs < limites[:, 1:]) | (cerrada & (freqs == limites[:, 1:])))).astype(psd.dtype)
+    total = psd[..., (freqs >= limites[:, 0].min()) & (freqs <= limites[:, 1].max())].sum(axis=-1)
+    potencia = psd @ mascaras.T
+    return np.divide(potencia, total[..., None], out=np.zeros_like(potencia), where=total[..., None] > 0)
+
+@registrar_caracteristica('entropia_espectral', requiere=('welch',), columnas=['Spectral Entropy'])
+def _entropia_espectral(contexto):
+    # Entropía de Shannon de la PSD normalizada, dividida por log(n_frecuencias) (0 a 1)
+    _, psd = contexto['welch']
+    total = psd.sum(axis=-1, keepdims=True)
+    p = np.divide(psd, total, out=np.zeros_like(psd), where=total > 0)
+    plogp = np.where(p > 0, p * np.log(np.where(p > 0, p, 1.0)), 0.0)
+    return -plogp.sum(axis=-1) / np.log(psd.shape[-1])
+
+@registrar_caracteristica('frecuencia_borde', requiere=('welch',), columnas=['SEF95'])
+def _frecuencia_borde(contexto):
+    # Frecuencia bajo la cual está FRACCION_BORDE de la potencia
+    freqs, psd = contexto['welch']
+    acumulada = np.cumsum(psd, axis=-1)
+    return freqs[np.argmax(acumulada >= FRACCION_BORDE * acumulada[..., -1:], axis=-1)]
+
+@registrar_caracteristica('hjorth', requiere=('varianza', 'derivada_1', 'derivada_2'),
+                          columnas=['Hjorth Mobility', 'Hjorth Complexity'])
+def _hjorth(contexto):
+    # Movilidad sqrt(var(x')/var(x)) y complejidad movilidad(x')/movilidad(x)
+    var_0 = contexto['varianza']
+    var_1 = np.var(contexto['derivada_1'], axis=-1)
+    var_2 = np.var(contexto['derivada_2'], axis=-1)
+    movilidad = np.sqrt(np.divide(var_1, var_0, out=np.zeros_like(var_0), where=var_0 > 0))
+    movilidad_1 = np.sqrt(np.divide(var_2, var_1, out=np.zeros_like(var_1), where=var_1 > 0))
+    complejidad = np.divide(movilidad_1, movilidad, out=np.zeros_like(movilidad), where=movilidad > 0)
+    return np.stack([movilidad, complejidad], axis=-1)
+
+@registrar_caracteristica('longitud_linea', requiere=('derivada_1',), columnas=['Line Length'])
+def _longitud_linea(contexto):
+    # Media de |x[n+1] - x[n]| (independiente de la longitud del segmento)
+    return np.mean(np.abs(contexto['derivada_1']), axis=-1)
+
+@registrar_caracteristica('flujo_espectral', requiere=('stft',), columnas=['Spectral Flux'])
+def _flujo_espectral(contexto):
+    # Cambio medio entre espectros consecutivos de la STFT, normalizados a suma 1
+    _, _, potencia = contexto['stft']
+    total = potencia.sum(axis=-2, keepdims=True)
+    normalizada = np.divide(potencia, total, out=np.zeros_like(potencia), where=total > 0)
+    if normalizada.shape[-1] < 2:
+        return np.zeros(normalizada.shape[:-2])
+    return np.sqrt((np.diff(normalizada, axis=-1) ** 2).sum(axis=-2)).mean(axis=-1)
+
+# --- Motor ---
+
+def _validar(nombres):
+    desconocidas = [nombre for nombre in nombres if nombre not in CARACTERISTICAS]
+    if desconocidas:
+        raise ValueError(f"Características desconocidas: {desconocidas} "
+                         f"(registradas: {sorted(CARACTERISTICAS)})")
+
+def columnas_caracteristicas(nombres=CARACTERISTICAS_BASE, bandas=None):
+    """
+    Nombres de las columnas que producen las características pedidas, en orden
+    
+    Args:
+        nombres: Nombres de características registradas
+        bandas: Diccionario de bandas (default BANDAS_FRECUENCIA)
+    
+    Returns:
+        list: Un nombre por columna, p. ej. ['Mean', 'Variance', 'PSD Delta', ...]
+    """
+    _validar(nombres)
+    if bandas is None:
+        bandas = BANDAS_FRECUENCIA
+    columnas = []
+    for nombre in nombres:
+        definicion = CARACTERISTICAS[nombre]['columnas']
+        columnas.extend(definicion(bandas) if callable(definicion) else definicion)
+    return columnas
+
+def intermedios_requeridos(nombres=CARACTERISTICAS_BASE):
+    """
+    Intermedios que se calcularán para las características pedidas (sin repetir)
+    """
+    _validar(nombres)
+    return tuple(dict.fromkeys(intermedio for nombre in nombres
+                               for intermedio in CARACTERISTICAS[nombre]['requiere']))
+
+@instrumentar
+def calcular_caracteristicas(senales, fs=500.0, nombres=CARACTERISTICAS_BASE, bandas=None, dtype='float64'):
+    """
+    Calcula las características pedidas de todos los segmentos de un lote
+    
+    Cada intermedio (Welch, STFT, derivadas, ...) se calcula una sola vez y lo
+    comparten todas las características que lo necesitan.
+    
+    Args:
+        senales: Array (..., n_muestras), p. ej. (n_eventos, n_muestras) o
+                 (n_eventos, n_canales, n_muestras)
+        fs: Frecuencia de muestreo
+        nombres: Nombres de características registradas (default CARACTERISTICAS_BASE)
+        bandas: Diccionario de bandas (default BANDAS_FRECUENCIA)
+        dtype: 'float64' o 'float32'; con float32 la señal, Welch, la STFT y el
+               resultado se calculan en precisión simple
+    
+    Returns:
+        Array (..., n_columnas) del tipo dtype, con las columnas en el orden de
+        columnas_caracteristicas
+    """
+    _validar(nombres)
+    contexto = ContextoLote(senales, fs, bandas, dtype)
+    forma_lote = contexto.senales.shape[:-1]
+    bloques = [np.reshape(CARACTERISTICAS[nombre]['funcion'](contexto), forma_lote + (-1,))
+               for nombre in nombres]
+    return np.concatenate(bloques, axis=-1).astype(dtype, copy=False)
@@ -0,0 +1,180 @@
+"""
+Remuestreo por lotes a una frecuencia de muestreo común
+Convierte registros de distintos amplificadores (256, 512, 1024 Hz, ...) a la frecuencia
+objetivo con un filtro polifásico aplicado a todos los eventos en una sola llamada, de
+modo que la extracción de características y la STFT trabajen sobre arreglos uniformes
+"""
+
+from fractions import Fraction
+from functools import lru_cache
+import numpy as np
+from scipy import signal
+from carga_mat import iterar_bloques, TAMANO_BLOQUE
+from instrumentacion import instrumentar
+
+# Frecuencia con la que se calculan las características (ver procesar_datos)
+FS_OBJETIVO = 500.0
+
+# Diferencia relativa de fs por debajo de la cual no se remuestrea: 499.9 Hz se trata
+# como 500 Hz, igual que antes de esta etapa
+TOLERANCIA_FS = 1e-3
+
+# Máximo denominador de la razón up/down (limita la longitud del filtro)
+MAX_DENOMINADOR = 1000
+
+def necesita_remuestreo(fs_origen, fs_destino=FS_OBJETIVO, tolerancia=TOLERANCIA_FS):
+    """
+    Indica si fs_origen difiere de fs_destino más que la tolerancia relativa
+    """
+    return abs(fs_origen - fs_destino) > tolerancia * fs_destino
+
+@lru_cache(maxsize=None)
+def factores_remuestreo(fs_origen, fs_destino=FS_OBJETIVO):
+    """
+    Factores enteros (up, down) con fs_destino / fs_origen ≈ up / down
+    
+    Args:
+        fs_origen: Frecuencia de muestreo de los datos
+        fs_destino: Frecuencia de muestreo deseada
+    
+    Returns:
+        tuple: (up, down), p. ej. (125, 64) para 256 -> 500 Hz
+    """
+    razon = (Fraction(fs_destino) / Fraction(fs_origen)).limit_denominator(MAX_DENOMINADOR)
+    return razon.numerator, razon.denominator
+
+@lru_cache(maxsize=None)
+def filtro_remuestreo(up, down):
+    """
+    Diseña (una sola vez por par de factores) el filtro FIR pasa-bajos del remuestreo
+    
+    Es el mismo filtro que scipy.signal.resample_poly diseña por defecto (ventana
+    Kaiser, beta=5.0); guardarlo evita recalcular firwin en cada bloque.
+    
+    Returns:
+        Array 1D de solo lectura con los coeficientes
+    """
+    max_razon = max(up, down)
+    coeficientes = signal.firwin(2 * 10 * max_razon + 1, 1.0 / max_razon, window=('kaiser', 5.0))
+    coeficientes.flags.writeable = False
+    return coeficientes
+
+def n_muestras_remuestreadas(n_muestras, fs_origen, fs_destino=FS_OBJETIVO):
+    """
+    Longitud de un segmento de n_muestras tras remuestrearlo
+    """
+    up, down = factores_remuestreo(fs_origen, fs_destino)
+    return -(-n_muestras * up // down)
+
+@instrumentar
+def remuestrear_lote(senales, fs_origen, fs_destino=FS_OBJETIVO):
+    """
+    Remuestrea todos los segmentos a lo largo del último eje en una sola llamada polifásica
+    
+    Args:
+        senales: Array (..., n_muestras), p. ej. (n_eventos, n_muestras) o
+                 (n_eventos, n_canales, n_muestras)
+        fs_origen: Frecuencia de muestreo de las señales
+        fs_destino: Frecuencia de muestreo deseada
+    
+    Returns:
+        Array (..., n_muestras_remuestreadas); las mismas señales si las frecuencias
+        coinciden dentro de TOLERANCIA_FS
+    """
+    if not necesita_remuestreo(fs_origen, fs_destino):
+        return senales
+    up, down = factores_remuestreo(fs_origen, fs_destino)
+    return signal.resample_poly(senales, up, down, axis=-1, window=filtro_remuestreo(up, down))
+
+def remuestrear_registros(registros, fs_destino=FS_OBJETIVO):
+    """
+    Remuestrea varios arreglos agrupándolos por frecuencia de muestreo
+    
+    Los arreglos con la misma fs y la misma forma por evento se concatenan y se
+    remuestrean con una sola llamada a remuestrear_lote.
+    
+    Args:
+        registros: Lista de tuplas (senales, fs) con los eventos en el primer eje
+        fs_destino: Frecuencia de muestreo deseada
+    
+    Returns:
+        list: Arreglos remuestreados, en el orden de entrada
+    """
+    grupos = {}
+    for i, (senales, fs) in enumerate(registros):
+        grupos.setdefault((factores_remuestreo(fs, fs_destino), np.shape(senales)[1:]), []).append(i)
+    
+    resultado = [None] * len(registros)
+    for indices in grupos.values():
+        fs = registros[indices[0]][1]
+        if not necesita_remuestreo(fs, fs_destino):
+            for i in indices:
+                resultado[i] = registros[i][0]
+            continue
+        lote = np.concatenate([np.asarray(registros[i][0], dtype=float) for i in indices])
+        remuestreado = remuestrear_lote(lote, fs, fs_destino)
+        inicio = 0
+        for i in indices:
+            fin = inicio + len(registros[i][0])
+            resultado[i] = remuestreado[inicio:fin]
+            inicio = fin
+    return resultado
+
+class VistaRemuestreada:
+    """
+    Vista perezosa de un arreglo de eventos remuestreado a otra frecuencia
+    
+    Solo se leen y remuestrean los eventos que se piden, así que un np.memmap o una
+    vista HDF5 siguen recorriéndose por bloques sin cargar el archivo completo.
+    """
+
+    def __init__(self, datos, fs_origen, fs_destino=FS_OBJETIVO):
+        """
+        Args:
+            datos: Array o vista perezosa con los eventos en el primer eje y las muestras en el último
+            fs_origen: Frecuencia de muestreo de los datos
+            fs_destino: Frecuencia de muestreo de la vista
+        """
+        self._datos = datos
+        self.fs_origen = float(fs_origen)
+        self.fs_destino = float(fs_destino)
+        self.shape = tuple(datos.shape[:-1]) + (
+            n_muestras_remuestreadas(datos.shape[-1], self.fs_origen, self.fs_destino),)
+        self.ndim = len(self.shape)
+        self.dtype = np.dtype(float)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, clave):
+        if not isinstance(clave, tuple):
+            clave = (clave,)
+        clave = clave + (slice(None),) * (self.ndim - len(clave))
+        # Se seleccionan eventos y canales en los datos originales y luego se remuestrea
+        senales = np.asarray(self._datos[clave[:-1] + (slice(None),)], dtype=float)
+        return remuestrear_lote(senales, self.fs_origen, self.fs_destino)[..., clave[-1]]
+
+    def __array__(self, dtype=None, copy=None):
+        datos = np.empty(self.shape, dtype=dtype or self.dtype)
+        for inicio, bloque in iterar_bloques(self._datos, TAMANO_BLOQUE):
+            datos[inicio:inicio + len(bloque)] = remuestrear_lote(bloque, self.fs_origen, self.fs_destino)
+        return datos
+
+def adaptar_frecuencia(datos, fs, fs_objetivo=FS_OBJETIVO):
+    """
+    Prepara un arreglo de eventos para calcular características a fs_objetivo
+    
+    Args:
+        datos: Array o vista perezosa (n_eventos, ..., n_muestras)
+        fs: Frecuencia de muestreo de los datos
+        fs_objetivo: Frecuencia deseada (None para usar fs sin remuestrear)
+    
+    Returns:
+        tuple: (datos, fs_caracteristicas) donde datos es una VistaRemuestreada si fs
+               difiere de fs_objetivo más que TOLERANCIA_FS
+    """
+    if fs_objetivo is None:
+        return datos, float(fs)
+    if necesita_remuestreo(fs, fs_objetivo):
+        return VistaRemuestreada(datos, fs, fs_objetivo), float(fs_objetivo)
+    return datos, float(fs_objetivo)
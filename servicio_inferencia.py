@@ -0,0 +1,266 @@
+"""
+Servicio HTTP local de inferencia por lotes
+Recibe segmentos crudos o vectores de características, agrupa las solicitudes concurrentes
+en micro-lotes y los clasifica con una sola llamada vectorizada del modelo guardado
+"""
+
+import argparse
+import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+from modelo import cargar_modelo, ARCHIVO_MODELO
+
+HOST = '127.0.0.1'
+PUERTO = 8765
+
+class AgrupadorLotes:
+    """
+    Agrupa solicitudes concurrentes en micro-lotes procesados por un hilo dedicado
+    
+    El hilo espera la primera solicitud y reúne las que lleguen durante a lo sumo
+    `espera_max_ms` (o hasta `max_lote` filas). Las solicitudes del mismo tipo y
+    longitud se concatenan y se clasifican con una sola llamada al modelo.
+    """
+
+    def __init__(self, modelo, max_lote=256, espera_max_ms=2.0, n_latencias=1000):
+        """
+        Args:
+            modelo: Instancia de modelo.Modelo
+            max_lote: Máximo de filas (segmentos o vectores) por lote
+            espera_max_ms: Tiempo máximo que se espera para completar un lote
+            n_latencias: Número de latencias por solicitud que se conservan
+        """
+        self.modelo = modelo
+        self.max_lote = int(max_lote)
+        self.espera_max = espera_max_ms / 1000.0
+        self.latencias = deque(maxlen=n_latencias)
+        self.tamanos_lote = deque(maxlen=n_latencias)
+        self._candado = threading.Lock()
+        self._cola = queue.Queue()
+        self._hilo = threading.Thread(target=self._bucle, daemon=True)
+        self._hilo.start()
+
+    def enviar(self, tipo, datos):
+        """
+        Encola una solicitud
+    
+        Args:
+            tipo: 'senales' o 'caracteristicas'
+            datos: Array con una fila por segmento o vector: (n, n_muestras),
+                   (n, n_canales, n_muestras) o (n, n_caracteristicas)
+    
+        Returns:
+            Future con (predicciones, puntajes)
+        """
+        futuro = Future()
+        self._cola.put((tipo, datos, futuro))
+        return futuro
+
+    def detener(self):
+        self._cola.put(None)
+        self._hilo.join()
+
+    def _bucle(self):
+        while True:
+            solicitud = self._cola.get()
+            if solicitud is None:
+                return
+    
+            lote = [solicitud]
+            n_filas = len(solicitud[1])
+            limite = time.perf_counter() + self.espera_max
+            while n_filas < self.max_lote:
+                restante = limite - time.perf_counter()
+                if restante <= 0:
+                    break
+                try:
+                    solicitud = self._cola.get(timeout=restante)
+                except queue.Empty:
+                    break
+                if solicitud is None:
+                    self._cola.put(None)  # Terminar después de procesar este lote
+                    break
+                lote.append(solicitud)
+                n_filas += len(solicitud[1])
+    
+            self._procesar(lote)
+
+    def _procesar(self, lote):
+        # Agrupar por tipo y forma de cada fila: cada grupo es una llamada vectorizada
+        grupos = {}
+        for tipo, datos, futuro in lote:
+            grupos.setdefault((tipo, datos.shape[1:]), []).append((datos, futuro))
+    
+        for (tipo, _), solicitudes in grupos.items():
+            try:
+                datos = np.concatenate([d for d, _ in solicitudes])
+                if tipo == 'senales':
+                    predicciones, puntajes = self.modelo.predecir_senales(datos)
+                else:
+                    predicciones, puntajes = self.modelo.predecir_caracteristicas(datos)
+            except Exception as error:
+                for _, futuro in solicitudes:
+                    futuro.set_exception(error)
+                continue
+    
+            with self._candado:
+                self.tamanos_lote.append(len(datos))
+            inicio = 0
+            for d, futuro in solicitudes:
+                fin = inicio + len(d)
+                futuro.set_result((predicciones[inicio:fin], puntajes[inicio:fin]))
+                inicio = fin
+
+    def registrar_latencia(self, segundos):
+        with self._candado:
+            self.latencias.append(segundos)
+
+    def estadisticas(self):
+        """
+        Resume la latencia por solicitud y el tamaño de los lotes recientes
+    
+        Returns:
+            dict: Latencias p50, p99 y máxima en milisegundos y tamaño medio de lote
+        """
+        with self._candado:
+            latencias_ms = 1000 * np.array(self.latencias)
+            tamanos = np.array(self.tamanos_lote)
+    
+        if len(latencias_ms) == 0:
+            return {'n_solicitudes': 0, 'p50_ms': 0.0, 'p99_ms': 0.0, 'max_ms': 0.0,
+                    'tamano_lote_medio': 0.0}
+    
+        return {
+            'n_solicitudes': int(len(latencias_ms)),
+            'p50_ms': float(np.percentile(latencias_ms, 50)),
+            'p99_ms': float(np.percentile(latencias_ms, 99)),
+            'max_ms': float(latencias_ms.max()),
+            'tamano_lote_medio': float(tamanos.mean()) if len(tamanos) else 0.0
+        }
+
+class ManejadorInferencia(BaseHTTPRequestHandler):
+    """
+    Rutas:
+        POST /predecir      {"senales": [[...], ...]} o {"caracteristicas": [[...], ...]}
+                            (para modelos multicanal, "senales": [[[...], ...], ...])
+        GET  /estadisticas  Latencias p50/p99 y tamaño medio de lote
+        GET  /salud         Configuración del modelo cargado
+    """
+
+    def log_message(self, formato, *args):
+        pass  # Sin una línea de log por solicitud
+
+    def _responder(self, codigo, cuerpo):
+        datos = json.dumps(cuerpo).encode('utf-8')
+        self.send_response(codigo)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def do_GET(self):
+        agrupador = self.server.agrupador
+        if self.path == '/estadisticas':
+            self._responder(200, agrupador.estadisticas())
+        elif self.path == '/salud':
+            modelo = agrupador.modelo
+            self._responder(200, {'estado': 'ok', 'fs': modelo.fs, 'bandas': modelo.bandas,
+                                  'n_muestras': modelo.n_muestras, 'n_canales': modelo.n_canales,
+                                  'n_caracteristicas': modelo.n_caracteristicas})
+        else:
+            self._responder(404, {'error': f"Ruta desconocida: {self.path}"})
+
+    def do_POST(self):
+        if self.path != '/predecir':
+            self._responder(404, {'error': f"Ruta desconocida: {self.path}"})
+            return
+    
+        inicio = time.perf_counter()
+        agrupador = self.server.agrupador
+        try:
+            longitud = int(self.headers.get('Content-Length', 0))
+            solicitud = json.loads(self.rfile.read(longitud))
+            if not isinstance(solicitud, dict):
+                raise ValueError("La solicitud debe ser un objeto JSON")
+            tipos = [tipo for tipo in ('senales', 'caracteristicas') if tipo in solicitud]
+            if len(tipos) != 1:
+                raise ValueError("La solicitud debe tener exactamente una clave: 'senales' o 'caracteristicas'")
+            tipo = tipos[0]
+    
+            modelo = agrupador.modelo
+            if np.ndim(solicitud[tipo]) == 0:  # null, números, cadenas u objetos
+                raise ValueError(f"'{tipo}' debe ser una lista")
+            datos = np.atleast_2d(np.asarray(solicitud[tipo], dtype=float))
+            # Los segmentos multicanal tienen un eje más: (n, n_canales, n_muestras)
+            ndim = 3 if tipo == 'senales' and modelo.n_canales else 2
+            if datos.ndim != ndim or datos.shape[0] == 0:
+                raise ValueError(f"'{tipo}' debe ser un arreglo de {ndim} dimensiones")
+            if tipo == 'senales' and modelo.n_muestras and datos.shape[-1] != modelo.n_muestras:
+                raise ValueError(f"Los segmentos deben tener {modelo.n_muestras} muestras")
+            if tipo == 'senales' and modelo.n_canales and datos.shape[1] != modelo.n_canales:
+                raise ValueError(f"Los segmentos deben tener {modelo.n_canales} canales")
+            if tipo == 'caracteristicas' and datos.shape[1] != modelo.n_caracteristicas:
+                raise ValueError(f"Los vectores deben tener {modelo.n_caracteristicas} características")
+        except (TypeError, ValueError) as error:  # Incluye JSON inválido y valores no numéricos
+            self._responder(400, {'error': str(error)})
+            return
+    
+        try:
+            predicciones, puntajes = agrupador.enviar(tipo, datos).result()
+        except Exception as error:
+            self._responder(500, {'error': str(error)})
+            return
+    
+        latencia = time.perf_counter() - inicio
+        agrupador.registrar_latencia(latencia)
+        self._responder(200, {'predicciones': predicciones.tolist(),
+                              'puntajes': puntajes.tolist(),
+                              'latencia_ms': 1000 * latencia})
+
+def crear_servidor(modelo, host=HOST, puerto=PUERTO, max_lote=256, espera_max_ms=2.0):
+    """
+    Crea el servidor HTTP de inferencia (sin iniciarlo)
+    
+    Args:
+        modelo: Instancia de modelo.Modelo
+        host: Dirección de escucha (default 127.0.0.1, solo local)
+        puerto: Puerto TCP (0 para uno libre)
+        max_lote: Máximo de filas por micro-lote
+        espera_max_ms: Tiempo máximo de espera para completar un micro-lote
+    
+    Returns:
+        ThreadingHTTPServer con el atributo `agrupador`
+    """
+    servidor = ThreadingHTTPServer((host, puerto), ManejadorInferencia)
+    servidor.daemon_threads = True
+    servidor.agrupador = AgrupadorLotes(modelo, max_lote, espera_max_ms)
+    return servidor
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servicio local de inferencia EEG")
+    parser.add_argument('--modelo', default=ARCHIVO_MODELO)
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--puerto', type=int, default=PUERTO)
+    parser.add_argument('--max-lote', type=int, default=256)
+    parser.add_argument('--espera-max-ms', type=float, default=2.0)
+    args = parser.parse_args()
+    
+    servidor = crear_servidor(cargar_modelo(args.modelo), args.host, args.puerto,
+                              args.max_lote, args.espera_max_ms)
+    print(f"Servicio de inferencia en http://{args.host}:{servidor.server_address[1]}")
+    print("  POST /predecir, GET /estadisticas, GET /salud (Ctrl+C para terminar)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        servidor.agrupador.detener()
+        estadisticas = servidor.agrupador.estadisticas()
+        print(f"\n{estadisticas['n_solicitudes']} solicitudes: p50={estadisticas['p50_ms']:.2f} ms, "
+              f"p99={estadisticas['p99_ms']:.2f} ms, lote medio={estadisticas['tamano_lote_medio']:.1f}")
@@ -0,0 +1,52 @@
+"""
+Pruebas del almacén de características por fragmentos y del entrenamiento incremental
+"""
+
+import numpy as np
+import scipy.io
+from almacen_caracteristicas import AlmacenCaracteristicas, agregar_registro, entrenar_incremental
+
+def _almacen_por_clase(directorio, filas_por_fragmento=200, n_por_clase=400, n_caracteristicas=4):
+    # Las filas ictal se agregan antes que las interictal, como en agregar_registro:
+    # los primeros fragmentos solo tienen la clase 1
+    rng = np.random.default_rng(0)
+    almacen = AlmacenCaracteristicas(str(directorio), filas_por_fragmento)
+    almacen.agregar(rng.normal(3.0, 1.0, (n_por_clase, n_caracteristicas)), np.ones(n_por_clase))
+    almacen.agregar(rng.normal(-3.0, 1.0, (n_por_clase, n_caracteristicas)), np.zeros(n_por_clase))
+    return almacen
+
+def test_nystroem_usa_puntos_de_ambas_clases(tmp_path):
+    almacen = _almacen_por_clase(tmp_path / 'almacen')
+    _, etiquetas_fragmento_0 = almacen.leer_fragmento(0)
+    assert set(np.unique(etiquetas_fragmento_0)) == {1}
+    
+    resultados, clf, _ = entrenar_incremental(almacen, modo='nystroem', n_componentes=50, n_epocas=2)
+    
+    # Los puntos de referencia (normalizados) deben venir de las dos clases, en proporción
+    puntos = clf[0].components_
+    assert len(puntos) == 50
+    assert np.sum(puntos[:, 0] > 0) == 25
+    assert np.sum(puntos[:, 0] < 0) == 25
+    assert resultados['accuracy'] > 0.95
+
+def test_agregar_registro_escribe_fragmentos_completos(tmp_path, monkeypatch):
+    rng = np.random.default_rng(0)
+    ruta = str(tmp_path / 'registro.mat')
+    scipy.io.savemat(ruta, {'Data_ictal': rng.normal(size=(70, 500)),
+                            'Data_interictal': rng.normal(size=(104, 500)),
+                            'Fs': np.array([[500.0]])})
+    almacen = AlmacenCaracteristicas(str(tmp_path / 'almacen'), filas_por_fragmento=64)
+    escrituras = []
+    escribir_indice = almacen.escribir_indice
+    monkeypatch.setattr(almacen, 'escribir_indice', lambda: escrituras.append(escribir_indice()))
+    
+    assert agregar_registro(almacen, ruta, tamano_bloque=10) == 174
+    
+    # Bloques de 10 eventos acumulados en fragmentos de 64 filas; el índice se escribe una vez
+    assert [f['n_filas'] for f in almacen.fragmentos] == [64, 64, 46]
+    assert len(escrituras) == 1
+    releido = AlmacenCaracteristicas(str(tmp_path / 'almacen'))
+    assert len(releido) == 174
+    X, y = releido.cargar()
+    assert X.shape == (174, 7)
+    np.testing.assert_array_equal(y, np.r_[np.ones(70), np.zeros(104)])
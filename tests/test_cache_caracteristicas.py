@@ -0,0 +1,52 @@
+"""
+Pruebas de la caché de características: aciertos, fallos y desalojo LRU
+"""
+
+import os
+import numpy as np
+from cache_caracteristicas import CacheCaracteristicas
+
+def _archivo(ruta, contenido):
+    with open(ruta, 'wb') as f:
+        f.write(contenido)
+    return str(ruta)
+
+def test_acierto_y_fallo_por_contenido_y_parametros(tmp_path):
+    cache = CacheCaracteristicas(str(tmp_path / 'cache'))
+    ruta = _archivo(tmp_path / 'registro.mat', b'datos 1')
+    parametros = {'fs': 500.0, 'bandas': {'delta': [0.5, 4]}}
+    
+    clave = cache.clave(ruta, parametros)
+    assert cache.obtener(clave) is None
+    
+    caracteristicas = np.arange(14.0).reshape(2, 7)
+    cache.guardar(clave, caracteristicas, np.array([1, 0]))
+    guardadas, etiquetas = cache.obtener(clave)
+    np.testing.assert_array_equal(guardadas, caracteristicas)
+    np.testing.assert_array_equal(etiquetas, [1, 0])
+    
+    # Otros parámetros u otro contenido del archivo dan otra clave (fallo)
+    assert cache.clave(ruta, {**parametros, 'fs': 256.0}) != clave
+    _archivo(tmp_path / 'registro.mat', b'otros datos')
+    assert cache.clave(ruta, parametros) != clave
+    assert cache.obtener(cache.clave(ruta, parametros)) is None
+
+def test_desalojo_lru(tmp_path):
+    cache = CacheCaracteristicas(str(tmp_path / 'cache'))
+    matriz = np.random.default_rng(0).normal(size=(100, 7))
+    claves = ['a', 'b', 'c']
+    for i, clave in enumerate(claves):
+        cache.guardar(clave, matriz, np.zeros(100))
+        # Accesos separados en el tiempo: 'a' es la más antigua
+        os.utime(os.path.join(cache.directorio, clave + '.npz'), (1000 + i, 1000 + i))
+    tamano = cache.listar()[0]['tamano_bytes']
+    cache.tamano_max_bytes = int(3.5 * tamano)
+    
+    # Leer 'a' la vuelve la más reciente; al superar el máximo se desaloja 'b'
+    assert cache.obtener('a') is not None
+    cache.guardar('d', matriz, np.zeros(100))
+    
+    assert sorted(e['clave'] for e in cache.listar()) == ['a', 'c', 'd']
+    assert cache.obtener('b') is None
+    assert cache.invalidar() == 3
+    assert cache.listar() == []
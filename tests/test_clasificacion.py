@@ -0,0 +1,21 @@
+"""
+Pruebas del guardado de resultados de clasificación
+"""
+
+import json
+import numpy as np
+from classify import clasificar_datos
+
+def test_conserva_la_busqueda_de_hiperparametros(tmp_path):
+    # clasificar_datos actualiza el JSON sin borrar lo que escribió buscar_hiperparametros
+    ruta = tmp_path / 'resultados.json'
+    ruta.write_text(json.dumps({'busqueda_hiperparametros': {'mejor': {'C': 10.0}}, 'accuracy': -1}))
+    rng = np.random.default_rng(0)
+    etiquetas = np.repeat([1, 0], 60)
+    matriz = rng.normal(size=(120, 7)) + etiquetas[:, None]
+    
+    resultados, _, _ = clasificar_datos(matriz, etiquetas, ruta_resultados=str(ruta))
+    
+    guardados = json.loads(ruta.read_text())
+    assert guardados['busqueda_hiperparametros'] == {'mejor': {'C': 10.0}}
+    assert guardados['accuracy'] == resultados['accuracy']
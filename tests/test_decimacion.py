@@ -0,0 +1,45 @@
+"""
+Pruebas de la decimación de trazas (minmax y LTTB): presupuesto de puntos y picos
+"""
+
+import numpy as np
+import pytest
+from visualize_signals import decimar, indices_decimacion
+
+def _senales_con_picos():
+    # Dos trazas de ruido con picos aislados positivos y negativos
+    rng = np.random.default_rng(0)
+    senales = rng.normal(size=(2, 20000))
+    picos = {0: [(1234, 40.0), (15001, -35.0)], 1: [(7, -50.0), (19990, 45.0)]}
+    for fila, lista in picos.items():
+        for indice, valor in lista:
+            senales[fila, indice] = valor
+    return senales, picos
+
+@pytest.mark.parametrize('metodo', ['minmax', 'lttb'])
+def test_conserva_los_picos(metodo):
+    senales, picos = _senales_con_picos()
+    
+    indices, factor = indices_decimacion(senales, max_puntos=500, metodo=metodo)
+    
+    assert indices.shape[0] == 2 and indices.shape[1] <= 500
+    assert factor == pytest.approx(20000 / indices.shape[1])
+    for fila, lista in picos.items():
+        assert np.all(np.diff(indices[fila]) > 0)
+        for indice, _ in lista:
+            assert indice in indices[fila]
+    
+    tiempo = np.arange(20000) / 500.0
+    tiempos, valores, _ = decimar(tiempo, senales, max_puntos=500, metodo=metodo)
+    np.testing.assert_array_equal(valores.max(axis=1), senales.max(axis=1))
+    np.testing.assert_array_equal(valores.min(axis=1), senales.min(axis=1))
+    np.testing.assert_array_equal(tiempos, tiempo[indices])
+
+def test_sin_decimacion_bajo_el_presupuesto():
+    senal = np.sin(np.linspace(0, 10, 300))
+    
+    tiempos, valores, factor = decimar(np.arange(300), senal, max_puntos=500)
+    
+    assert factor == 1.0
+    np.testing.assert_array_equal(valores, senal)
+    np.testing.assert_array_equal(tiempos, np.arange(300))
@@ -0,0 +1,29 @@
+"""
+Pruebas del escritor de JSON: valores no finitos y escalares de NumPy
+"""
+
+import json
+import numpy as np
+from escritor_json import escribir_json
+
+def _rechazar_constante(constante):
+    raise AssertionError(f"Constante no estándar en el JSON: {constante}")
+
+def test_no_finitos_como_null(tmp_path):
+    # JSON estricto no admite NaN ni Infinity, ni en arreglos ni en escalares
+    ruta = tmp_path / 'datos.json'
+    datos = {
+        'arreglo': np.array([1.5, np.nan, np.inf]),
+        'escalar': float('nan'),
+        'numpy': np.float64(-np.inf),
+        'cero_d': np.array(np.nan),
+        'lista': [1.0, float('inf')],
+        'finito': 0.1,
+        'entero': np.int64(3)
+    }
+    
+    escribir_json(datos, ruta)
+    
+    leidos = json.loads(ruta.read_text(), parse_constant=_rechazar_constante)
+    assert leidos == {'arreglo': [1.5, None, None], 'escalar': None, 'numpy': None, 'cero_d': None,
+                      'lista': [1.0, None], 'finito': 0.1, 'entero': 3}
@@ -0,0 +1,36 @@
+"""
+Pruebas de la extracción de características en paralelo frente al camino serial
+"""
+
+import numpy as np
+from process_eeg import (extraer_caracteristicas_paralelo, extraer_caracteristicas_por_bloques,
+                         extraer_caracteristicas_lote, combinar_canales)
+from registro_caracteristicas import CARACTERISTICAS_EXTENDIDAS
+
+def test_paralelo_igual_al_serial_con_memoria_compartida():
+    datos = np.random.default_rng(0).normal(size=(230, 500))
+    
+    paralelo = extraer_caracteristicas_paralelo(datos, 500.0, n_procesos=2, tamano_bloque=50)
+    
+    # Mismos bloques que el camino serial: resultado idéntico bit a bit
+    np.testing.assert_array_equal(paralelo, extraer_caracteristicas_por_bloques(datos, 500.0, 50))
+    for inicio in range(0, len(datos), 50):
+        np.testing.assert_array_equal(paralelo[inicio:inicio + 50],
+                                      extraer_caracteristicas_lote(datos[inicio:inicio + 50], 500.0))
+    # Con un solo lote de otro tamaño, el producto matricial de las bandas puede diferir
+    # en el último bit
+    np.testing.assert_allclose(paralelo, extraer_caracteristicas_lote(datos, 500.0), rtol=1e-12)
+
+def test_paralelo_igual_al_serial_desde_memmap_multicanal(tmp_path):
+    ruta = str(tmp_path / 'eventos.npy')
+    np.save(ruta, np.random.default_rng(1).normal(size=(120, 3, 400)))
+    datos = np.load(ruta, mmap_mode='r')
+    
+    paralelo = extraer_caracteristicas_paralelo(datos, 500.0, n_procesos=2, tamano_bloque=32,
+                                                caracteristicas=CARACTERISTICAS_EXTENDIDAS)
+    
+    serial = extraer_caracteristicas_por_bloques(datos, 500.0, 32, caracteristicas=CARACTERISTICAS_EXTENDIDAS)
+    assert paralelo.shape == (120, 3 * 18)
+    np.testing.assert_array_equal(paralelo, serial)
+    np.testing.assert_allclose(paralelo, combinar_canales(extraer_caracteristicas_lote(
+        np.asarray(datos), 500.0, caracteristicas=CARACTERISTICAS_EXTENDIDAS)), rtol=1e-12)
@@ -0,0 +1,60 @@
+"""
+Pruebas del formato binario del dashboard frente a su versión JSON
+"""
+
+import json
+import struct
+import numpy as np
+from escritor_json import escribir_json
+from formato_binario import exportar_binario, leer_binario, MAGIA
+
+def _datos_dashboard():
+    rng = np.random.default_rng(0)
+    return {
+        'visualizacion': {'tiempo': np.linspace(0, 1, 500), 'senal': rng.normal(size=(2, 500)).tolist(),
+                          'frecuencias': [0.5, 1.0, 1.5], 'titulo': 'Señal ictal'},
+        'clasificacion': {'accuracy': 0.95, 'confusion_matrix': [[20, 1], [0, 14]],
+                          'y_pred': list(range(100))},
+        'caracteristicas': {'nombres': ['Mean', 'Variance'], 'valores': rng.normal(size=(40, 2)) * 1e-3},
+        'info_general': {'n_canales': 1, 'fs': 500.0}
+    }
+
+def _comparar(binario, texto):
+    # Los arreglos grandes vuelven como float32; el resto de la estructura es idéntica
+    if isinstance(binario, dict):
+        assert binario.keys() == texto.keys()
+        for clave in binario:
+            _comparar(binario[clave], texto[clave])
+    elif isinstance(binario, np.ndarray):
+        assert binario.dtype == np.float32
+        np.testing.assert_allclose(binario, np.asarray(texto, dtype=np.float32), rtol=1e-6)
+    else:
+        assert binario == texto
+
+def test_binario_y_json_contienen_los_mismos_datos(tmp_path):
+    datos = _datos_dashboard()
+    ruta_binario, ruta_json = str(tmp_path / 'datos.bin'), str(tmp_path / 'datos.json')
+    exportar_binario(datos, ruta_binario)
+    escribir_json(datos, ruta_json)
+    with open(ruta_json) as f:
+        texto = json.load(f)
+    
+    binario = leer_binario(ruta_binario)
+    
+    _comparar(binario, texto)
+    assert isinstance(binario['visualizacion']['senal'], np.ndarray)
+    assert binario['visualizacion']['frecuencias'] == [0.5, 1.0, 1.5]  # Bajo el umbral: JSON
+    assert binario['clasificacion']['y_pred'] == list(range(100))      # Enteros: JSON
+
+def test_cabecera_y_alineacion(tmp_path):
+    ruta = str(tmp_path / 'datos.bin')
+    tamano = exportar_binario(_datos_dashboard(), ruta)
+    with open(ruta, 'rb') as f:
+        buffer = f.read()
+    
+    assert len(buffer) == tamano
+    assert buffer[:4] == MAGIA
+    _, longitud = struct.unpack_from('<II', buffer, 4)
+    # Los arreglos empiezan alineados a 4 bytes (Float32Array sin copia)
+    assert (12 + longitud) % 4 == 0
+    assert (len(buffer) - 12 - longitud) % 4 == 0
@@ -0,0 +1,50 @@
+"""
+Pruebas de la ingesta de varios registros con distintas frecuencias de muestreo
+"""
+
+import numpy as np
+import scipy.io
+from ingesta_multiple import ingerir_registros, COLUMNA_REGISTRO
+from process_eeg import extraer_caracteristicas_por_bloques
+from registro_caracteristicas import CARACTERISTICAS_EXTENDIDAS
+from remuestreo import remuestrear_lote
+
+FRECUENCIAS = (256.0, 256.0, 500.0, 256.0)
+
+def _registros(directorio):
+    rng = np.random.default_rng(0)
+    rutas, datos = [], []
+    for i, fs in enumerate(FRECUENCIAS):
+        ictal, interictal = rng.normal(size=(6, 256)) * 5, rng.normal(size=(9, 256))
+        ruta = str(directorio / f"registro_{i}.mat")
+        scipy.io.savemat(ruta, {'Data_ictal': ictal, 'Data_interictal': interictal, 'Fs': fs})
+        rutas.append(ruta)
+        datos.append((ictal, interictal, fs))
+    return rutas, datos
+
+def test_igual_que_cada_registro_por_separado(tmp_path):
+    rutas, datos = _registros(tmp_path)
+    
+    matriz, etiquetas, resumen = ingerir_registros(rutas, n_hilos=2, n_precarga=4)
+    
+    # Remuestrear en lote varios registros da lo mismo que remuestrear cada uno
+    esperada = np.vstack([extraer_caracteristicas_por_bloques(remuestrear_lote(d, fs), 500.0)
+                          for ictal, interictal, fs in datos for d in (ictal, interictal)])
+    np.testing.assert_allclose(matriz[:, :COLUMNA_REGISTRO], esperada, rtol=1e-10)
+    np.testing.assert_array_equal(matriz[:, COLUMNA_REGISTRO], np.repeat(np.arange(4), 15))
+    np.testing.assert_array_equal(etiquetas, np.tile(np.repeat([1, 0], [6, 9]), 4))
+    assert resumen['n_registros'] == 4 and not resumen['errores']
+
+def test_caracteristicas_dtype_y_fs_propia(tmp_path):
+    rutas, datos = _registros(tmp_path)
+    
+    matriz, _, resumen = ingerir_registros(rutas, fs_objetivo=None, caracteristicas=CARACTERISTICAS_EXTENDIDAS,
+                                           dtype='float32')
+    
+    # Sin fs objetivo cada registro se procesa con su propia frecuencia, sin remuestrear
+    ictal, interictal, fs = datos[0]
+    esperada = extraer_caracteristicas_por_bloques(np.vstack([ictal, interictal]), fs,
+                                                   caracteristicas=CARACTERISTICAS_EXTENDIDAS, dtype='float32')
+    assert matriz.shape[1] == esperada.shape[1] + 1
+    np.testing.assert_allclose(matriz[:15, :COLUMNA_REGISTRO], esperada, rtol=1e-5)
+    assert [r['fs'] for r in resumen['registros']] == list(FRECUENCIAS)
@@ -0,0 +1,63 @@
+"""
+Pruebas del ejecutor incremental: dependencias y omisión de etapas al día
+"""
+
+import os
+from pipeline import Etapa, calcular_dependencias, ejecutar_pipeline, etapa_actualizada
+
+def _etapas(ejecuciones):
+    # entrada.txt -> A -> a.txt -> B -> b.txt
+    def copiar(nombre, origen, destino):
+        def funcion():
+            ejecuciones.append(nombre)
+            with open(origen) as f, open(destino, 'w') as g:
+                g.write(f.read() + nombre)
+        return funcion
+    return [Etapa('B', copiar('B', 'a.txt', 'b.txt'), ['a.txt'], ['b.txt']),
+            Etapa('A', copiar('A', 'entrada.txt', 'a.txt'), ['entrada.txt'], ['a.txt'])]
+
+def _fijar_mtime(ruta, t):
+    os.utime(ruta, (t, t))
+
+def test_omite_etapas_al_dia(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with open('entrada.txt', 'w') as f:
+        f.write('x')
+    _fijar_mtime('entrada.txt', 1000)
+    ejecuciones = []
+    etapas = _etapas(ejecuciones)
+    assert calcular_dependencias(etapas) == {'A': set(), 'B': {'A'}}
+    
+    assert ejecutar_pipeline(etapas) == {'A': 'ejecutada', 'B': 'ejecutada'}
+    assert ejecuciones == ['A', 'B']
+    with open('b.txt') as f:
+        assert f.read() == 'xAB'
+    
+    # Salidas más recientes que las entradas: todo se omite
+    _fijar_mtime('a.txt', 2000)
+    _fijar_mtime('b.txt', 3000)
+    assert all(etapa_actualizada(etapa) for etapa in etapas)
+    assert ejecutar_pipeline(etapas) == {'A': 'omitida', 'B': 'omitida'}
+    assert ejecuciones == ['A', 'B']
+    
+    # Una entrada modificada vuelve a ejecutar su etapa y las que dependen de ella
+    _fijar_mtime('entrada.txt', 2500)
+    assert ejecutar_pipeline(etapas) == {'A': 'ejecutada', 'B': 'ejecutada'}
+    assert ejecuciones == ['A', 'B', 'A', 'B']
+
+def test_salida_faltante_y_forzar(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with open('entrada.txt', 'w') as f:
+        f.write('x')
+    ejecuciones = []
+    etapas = _etapas(ejecuciones)
+    ejecutar_pipeline(etapas)
+    _fijar_mtime('entrada.txt', 1000)
+    _fijar_mtime('a.txt', 2000)
+    
+    # Sin b.txt solo se ejecuta B
+    os.remove('b.txt')
+    assert ejecutar_pipeline(etapas) == {'A': 'omitida', 'B': 'ejecutada'}
+    assert ejecuciones == ['A', 'B', 'B']
+    
+    assert ejecutar_pipeline(etapas, forzar=True) == {'A': 'ejecutada', 'B': 'ejecutada'}
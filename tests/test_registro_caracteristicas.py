@@ -0,0 +1,41 @@
+"""
+Pruebas del registro de características: conjunto original, segmentos cortos y bandas
+"""
+
+import warnings
+import numpy as np
+import pytest
+from process_eeg import calcular_psd_banda
+from registro_caracteristicas import (BANDAS_FRECUENCIA, CARACTERISTICAS_BASE, CARACTERISTICAS_EXTENDIDAS,
+                                      calcular_caracteristicas, columnas_caracteristicas)
+
+def test_reproduce_las_caracteristicas_originales():
+    # Media, varianza y PSD media por banda, calculadas señal por señal como antes del registro
+    senales = np.random.default_rng(0).normal(size=(12, 500)) * 20
+    
+    matriz = calcular_caracteristicas(senales, 500.0, CARACTERISTICAS_BASE)
+    
+    esperada = np.array([[np.mean(s), np.var(s)]
+                         + [calcular_psd_banda(s, 500.0, fmin, fmax) for fmin, fmax in BANDAS_FRECUENCIA.values()]
+                         for s in senales])
+    assert columnas_caracteristicas(CARACTERISTICAS_BASE)[:2] == ['Mean', 'Variance']
+    np.testing.assert_allclose(matriz, esperada, rtol=1e-12)
+
+@pytest.mark.parametrize('n_muestras', [2, 3])
+def test_segmentos_cortos(n_muestras):
+    senales = np.random.default_rng(1).normal(size=(4, n_muestras))
+    
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')  # Welch advierte si nperseg supera la longitud
+        matriz = calcular_caracteristicas(senales, 500.0, CARACTERISTICAS_EXTENDIDAS)
+    
+    assert matriz.shape == (4, len(columnas_caracteristicas(CARACTERISTICAS_EXTENDIDAS)))
+
+def test_potencias_relativas_suman_uno():
+    # Las bandas por defecto son contiguas; con fs = 256 Hz los bordes (4, 8, 13, 30 Hz) caen
+    # justo en frecuencias de Welch y cada una debe contarse en una sola banda
+    senales = np.random.default_rng(2).normal(size=(6, 500))
+    
+    matriz = calcular_caracteristicas(senales, 256.0, ('potencia_relativa',))
+    
+    np.testing.assert_allclose(matriz.sum(axis=-1), 1.0, rtol=1e-12)
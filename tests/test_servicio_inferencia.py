@@ -0,0 +1,79 @@
+"""
+Pruebas del servicio HTTP de inferencia: micro-lotes y solicitudes inválidas
+"""
+
+import json
+import threading
+import urllib.error
+import urllib.request
+import numpy as np
+import pytest
+from classify import clasificar_datos
+from modelo import Modelo
+from servicio_inferencia import crear_servidor
+
+def _modelo():
+    rng = np.random.default_rng(0)
+    etiquetas = np.repeat([1, 0], 60)
+    matriz = rng.normal(size=(120, 7)) + etiquetas[:, None]
+    _, clf, scaler = clasificar_datos(matriz, etiquetas, guardar=False)
+    return Modelo(clf, scaler, fs=500.0, n_muestras=500)
+
+@pytest.fixture
+def servidor():
+    # Espera de 300 ms para que las solicitudes concurrentes caigan en el mismo lote
+    servidor = crear_servidor(_modelo(), puerto=0, espera_max_ms=300.0)
+    hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+    hilo.start()
+    yield servidor
+    servidor.shutdown()
+    servidor.server_close()
+    servidor.agrupador.detener()
+
+def _post(servidor, cuerpo):
+    # Devuelve (código HTTP, respuesta JSON)
+    datos = cuerpo if isinstance(cuerpo, bytes) else json.dumps(cuerpo).encode('utf-8')
+    solicitud = urllib.request.Request(f"http://127.0.0.1:{servidor.server_address[1]}/predecir",
+                                       data=datos, headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(solicitud, timeout=10) as respuesta:
+            return respuesta.status, json.loads(respuesta.read())
+    except urllib.error.HTTPError as error:
+        return error.code, json.loads(error.read())
+
+def test_agrupa_solicitudes_concurrentes(servidor):
+    vectores = np.random.default_rng(1).normal(size=(8, 7))
+    respuestas = [None] * len(vectores)
+    
+    def enviar(i):
+        respuestas[i] = _post(servidor, {'caracteristicas': [vectores[i].tolist()]})
+    
+    hilos = [threading.Thread(target=enviar, args=(i,)) for i in range(len(vectores))]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    
+    # Cada solicitud recibe su propia predicción, pero el modelo se llamó con lotes de varias filas
+    esperadas, _ = servidor.agrupador.modelo.predecir_caracteristicas(vectores)
+    assert [codigo for codigo, _ in respuestas] == [200] * len(vectores)
+    assert [r['predicciones'][0] for _, r in respuestas] == esperadas.tolist()
+    assert max(servidor.agrupador.tamanos_lote) > 1
+    assert sum(servidor.agrupador.tamanos_lote) == len(vectores)
+
+@pytest.mark.parametrize('cuerpo', [
+    b'{no es json',
+    [[1.0] * 7],
+    {'caracteristicas': None},
+    {'caracteristicas': 3.0},
+    {'caracteristicas': {'a': 1}},
+    {'caracteristicas': [{'a': 1}]},
+    {'caracteristicas': [[1.0] * 5]},
+    {'senales': [[0.0] * 10]},
+    {'senales': [[0.0] * 500], 'caracteristicas': [[0.0] * 7]},
+])
+def test_solicitudes_invalidas(servidor, cuerpo):
+    codigo, respuesta = _post(servidor, cuerpo)
+    
+    assert codigo == 400
+    assert respuesta['error']
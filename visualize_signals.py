@@ -4,60 +4,286 @@ Genera gráficas temporales y tiempo-frecuencia (espectrogramas) para segmentos
 """
 
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # Solo se guardan figuras; permite ejecutar la etapa en un hilo secundario
 import matplotlib.pyplot as plt
 from scipy import signal
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import json
+from carga_mat import iterar_bloques, TAMANO_BLOQUE
+from almacen_procesados import cargar_procesados
+from escritor_json import escribir_json
+from instrumentacion import instrumentar
 
-def crear_espectrograma(senal, fs, titulo):
+@instrumentar
+def calcular_espectrogramas_lote(senales, fs, dtype=None):
     """
-    Crea un espectrograma de una señal
+    Calcula los espectrogramas de todos los eventos con una sola llamada STFT vectorizada
     
     Args:
-        senal: Array 1D con la señal
+        senales: Array (..., n_muestras) con un segmento por fila
         fs: Frecuencia de muestreo
-        titulo: Título para el gráfico
+        dtype: 'float64' o 'float32' para la STFT (None = el tipo de las señales)
     
     Returns:
-        tuple: (tiempos, frecuencias, espectrograma) para plotly
+        tuple: (tiempos, frecuencias, espectrogramas) con espectrogramas en dB de
+               forma (..., n_frecuencias, n_tiempos)
     """
+    if dtype is not None:
+        senales = np.asarray(senales, dtype=dtype)
+    
     # Calcular espectrograma
-    nperseg = min(256, len(senal) // 4)
+    n_muestras = np.shape(senales)[-1]
+    nperseg = min(256, n_muestras // 4)
     noverlap = nperseg // 2
-    freqs, times, Sxx = signal.spectrogram(senal, fs, nperseg=nperseg, 
+    freqs, times, Sxx = signal.spectrogram(senales, fs, nperseg=nperseg, 
                                            noverlap=noverlap, 
-                                           window='hann')
+                                           window='hann', axis=-1)
     
     # Convertir a dB
     Sxx_db = 10 * np.log10(Sxx + 1e-10)  # Evitar log(0)
     
     return times, freqs, Sxx_db
 
-def crear_visualizacion_multicanal(data_ictal, data_interictal, fs, n_canales=16):
+def crear_espectrograma(senal, fs, titulo):
+    """
+    Crea un espectrograma de una señal
+    
+    Args:
+        senal: Array 1D con la señal
+        fs: Frecuencia de muestreo
+        titulo: Título para el gráfico
+    
+    Returns:
+        tuple: (tiempos, frecuencias, espectrograma) para plotly
+    """
+    return calcular_espectrogramas_lote(np.asarray(senal), fs)
+
+@instrumentar
+def guardar_espectrogramas(datos, fs, ruta, formato='uint8', tamano_bloque=TAMANO_BLOQUE, dtype='float64'):
+    """
+    Calcula los espectrogramas de todos los eventos y los guarda cuantizados en disco
+    
+    Se generan dos archivos: `ruta`.npy con el arreglo (n_eventos, n_frecuencias,
+    n_tiempos), o (n_eventos, n_canales, n_frecuencias, n_tiempos) para datos
+    multicanal, en uint8 o float16, abrible con np.load(mmap_mode='r'), y
+    `ruta`.meta.npz con tiempos, frecuencias, escala y offset de cada evento
+    (dB = valor * escala + offset; la escala es común a los canales del evento).
+    
+    Args:
+        datos: Array o vista perezosa (n_eventos, n_muestras) o (n_eventos, n_canales, n_muestras)
+        fs: Frecuencia de muestreo
+        ruta: Ruta base de los archivos de salida (sin extensión)
+        formato: 'uint8' (escala y offset por evento) o 'float16'
+        tamano_bloque: Eventos procesados por llamada STFT
+        dtype: Precisión de la STFT ('float64' o 'float32'); la salida cuantizada es
+               la misma, float32 reduce a la mitad la memoria de cada bloque
+    
+    Returns:
+        tuple: (ruta del .npy, ruta del .meta.npz)
+    """
+    if formato not in ('uint8', 'float16'):
+        raise ValueError(f"Formato de espectrograma no soportado: {formato}")
+    
+    n_eventos = datos.shape[0]
+    times, freqs, _ = calcular_espectrogramas_lote(np.asarray(datos[0:1]), fs, dtype)
+    
+    ruta_npy = ruta + '.npy'
+    forma = (n_eventos,) + tuple(datos.shape[1:-1]) + (len(freqs), len(times))
+    salida = np.lib.format.open_memmap(ruta_npy, mode='w+', dtype=formato, shape=forma)
+    ejes_evento = tuple(range(1, len(forma)))
+    expandir = (slice(None),) + (None,) * (len(forma) - 1)
+    escala = np.ones(n_eventos, dtype=np.float32)
+    offset = np.zeros(n_eventos, dtype=np.float32)
+    
+    for inicio, bloque in iterar_bloques(datos, tamano_bloque):
+        _, _, Sxx_db = calcular_espectrogramas_lote(bloque, fs, dtype)
+        fin = inicio + len(bloque)
+        if formato == 'uint8':
+            minimo = Sxx_db.min(axis=ejes_evento)
+            rango = Sxx_db.max(axis=ejes_evento) - minimo
+            escala[inicio:fin] = np.where(rango > 0, rango / 255, 1.0)
+            offset[inicio:fin] = minimo
+            salida[inicio:fin] = np.round((Sxx_db - minimo[expandir])
+                                          / escala[inicio:fin][expandir])
+        else:
+            salida[inicio:fin] = Sxx_db
+    
+    salida.flush()
+    del salida
+    
+    ruta_meta = ruta + '.meta.npz'
+    np.savez(ruta_meta, tiempos=times, frecuencias=freqs, escala=escala, offset=offset,
+             fs=fs, formato=formato)
+    
+    return ruta_npy, ruta_meta
+
+def cargar_espectrograma(ruta, indice):
+    """
+    Lee el espectrograma de un evento guardado con guardar_espectrogramas sin recalcularlo
+    
+    Solo se leen del disco las páginas de ese evento (np.load con mmap_mode='r').
+    
+    Args:
+        ruta: Ruta base usada al guardar (sin extensión)
+        indice: Índice del evento
+    
+    Returns:
+        tuple: (tiempos, frecuencias, espectrograma en dB como float32, con un eje
+               inicial de canales si los datos eran multicanal)
+    """
+    espectrogramas = np.load(ruta + '.npy', mmap_mode='r')
+    with np.load(ruta + '.meta.npz') as meta:
+        Sxx_db = (espectrogramas[indice].astype(np.float32) * meta['escala'][indice]
+                  + meta['offset'][indice])
+        return meta['tiempos'], meta['frecuencias'], Sxx_db
+
+def _espectrograma_guardado(ruta):
+    # Espectrograma del primer evento (primer canal si hay eje de canales)
+    tiempos, frecuencias, Sxx_db = cargar_espectrograma(ruta, 0)
+    return tiempos, frecuencias, Sxx_db[(0,) * (Sxx_db.ndim - 2)]
+
+# Máximo de puntos por traza enviados a Plotly (None = todas las muestras)
+MAX_PUNTOS_TRAZA = 2000
+
+def _indices_minmax(senales, max_puntos):
+    # Índices del mínimo y el máximo de cada cubeta, en orden temporal
+    n = senales.shape[-1]
+    tamano = -(-n // max(max_puntos // 2, 1))
+    n_cubetas = -(-n // tamano)
+    relleno = np.full((senales.shape[0], n_cubetas * tamano), np.nan)
+    relleno[:, :n] = senales
+    cubetas = relleno.reshape(senales.shape[0], n_cubetas, tamano)
+    
+    base = np.arange(n_cubetas) * tamano
+    idx_min = np.nanargmin(cubetas, axis=-1) + base
+    idx_max = np.nanargmax(cubetas, axis=-1) + base
+    
+    return np.sort(np.stack([idx_min, idx_max], axis=-1), axis=-1).reshape(senales.shape[0], -1)
+
+def _indices_lttb(senales, max_puntos):
+    # Largest-Triangle-Three-Buckets vectorizado sobre las filas (x = índice de muestra)
+    n_filas, n = senales.shape
+    bordes = np.linspace(1, n - 1, max_puntos - 1).astype(int)
+    indices = np.empty((n_filas, max_puntos), dtype=int)
+    indices[:, 0] = 0
+    indices[:, -1] = n - 1
+    filas = np.arange(n_filas)
+    
+    for i in range(max_puntos - 2):
+        inicio, fin = bordes[i], bordes[i + 1]
+        # Promedio de la cubeta siguiente (o el último punto)
+        if i + 2 < len(bordes):
+            x_c = (bordes[i + 1] + bordes[i + 2] - 1) / 2
+            y_c = senales[:, bordes[i + 1]:bordes[i + 2]].mean(axis=1)
+        else:
+            x_c, y_c = n - 1, senales[:, -1]
+    
+        x_a = indices[:, i]
+        y_a = senales[filas, x_a]
+        x_b = np.arange(inicio, fin)
+        y_b = senales[:, inicio:fin]
+        area = np.abs((x_a[:, None] - x_c) * (y_b - y_a[:, None])
+                      - (x_a[:, None] - x_b) * (y_c - y_a)[:, None])
+        indices[:, i + 1] = inicio + np.argmax(area, axis=1)
+    
+    return indices
+
+def indices_decimacion(senales, max_puntos=MAX_PUNTOS_TRAZA, metodo='minmax'):
+    """
+    Calcula qué muestras conservar de cada traza para respetar un presupuesto de puntos
+    
+    Ambos métodos conservan los picos: 'minmax' guarda el mínimo y el máximo de cada
+    cubeta y 'lttb' (Largest-Triangle-Three-Buckets) el punto de mayor área visual.
+    
+    Args:
+        senales: Array (n_muestras,) o (n_trazas, n_muestras)
+        max_puntos: Máximo de puntos por traza (None = sin decimación)
+        metodo: 'minmax' o 'lttb'
+    
+    Returns:
+        tuple: (indices, factor) con indices de forma (n_puntos,) o (n_trazas, n_puntos)
+               y factor = n_muestras / n_puntos
+    """
+    senales = np.asarray(senales, dtype=float)
+    n = senales.shape[-1]
+    if max_puntos is None or n <= max_puntos:
+        indices = np.broadcast_to(np.arange(n), senales.shape)
+        return indices, 1.0
+    
+    filas = senales.reshape(-1, n)
+    if metodo == 'minmax':
+        indices = _indices_minmax(filas, max_puntos)
+    elif metodo == 'lttb':
+        indices = _indices_lttb(filas, max_puntos)
+    else:
+        raise ValueError(f"Método de decimación desconocido: {metodo}")
+    
+    return indices.reshape(senales.shape[:-1] + (-1,)), n / indices.shape[-1]
+
+@instrumentar
+def decimar(tiempo, senales, max_puntos=MAX_PUNTOS_TRAZA, metodo='minmax'):
+    """
+    Reduce las trazas a `max_puntos` puntos preservando los picos
+    
+    Args:
+        tiempo: Array (n_muestras,) con el tiempo de cada muestra
+        senales: Array (n_muestras,) o (n_trazas, n_muestras)
+        max_puntos: Máximo de puntos por traza (None = sin decimación)
+        metodo: 'minmax' o 'lttb'
+    
+    Returns:
+        tuple: (tiempos, valores, factor) con la forma de las trazas decimadas
+    """
+    senales = np.asarray(senales, dtype=float)
+    indices, factor = indices_decimacion(senales, max_puntos, metodo)
+    
+    return np.asarray(tiempo)[indices], np.take_along_axis(senales, indices, axis=-1), factor
+
+def crear_visualizacion_multicanal(data_ictal, data_interictal, fs, n_canales=16,
+                                   max_puntos=MAX_PUNTOS_TRAZA, metodo_decimacion='minmax'):
     """
     Crea una visualización multi-canal mostrando la transición interictal-ictal
     
+    Con datos multicanal (n_eventos, n_canales, n_muestras) se muestran los canales
+    reales del primer evento de cada tipo. Con datos (n_eventos, n_muestras) cada
+    "canal" es un evento distinto, tomado a intervalos regulares.
+    
     Args:
-        data_ictal: Array con eventos ictal (n_eventos, n_muestras)
-        data_interictal: Array con eventos interictal (n_eventos, n_muestras)
+        data_ictal: Array con eventos ictal (n_eventos, n_muestras) o (n_eventos, n_canales, n_muestras)
+        data_interictal: Array con eventos interictal, con la misma forma por evento
         fs: Frecuencia de muestreo
-        n_canales: Número de canales a mostrar (default 16)
+        n_canales: Número máximo de canales a mostrar (default 16)
+        max_puntos: Máximo de puntos por traza (None = todas las muestras)
+        metodo_decimacion: 'minmax' o 'lttb'
     
     Returns:
         dict: Diccionario con datos para plotly
     """
-    # Seleccionar n_canales eventos de cada tipo
-    n_canales = min(n_canales, min(data_interictal.shape[0], data_ictal.shape[0]))
-    indices_interictal = np.linspace(0, data_interictal.shape[0]-1, n_canales, dtype=int)
-    indices_ictal = np.linspace(0, data_ictal.shape[0]-1, n_canales, dtype=int)
+    canales_reales = data_interictal.ndim == 3
+    if canales_reales:
+        # Canales reales del primer evento de cada tipo
+        n_canales = min(n_canales, data_interictal.shape[1], data_ictal.shape[1])
+        segmentos_interictal = np.asarray(data_interictal[0, :n_canales, :])
+        segmentos_ictal = np.asarray(data_ictal[0, :n_canales, :])
+    else:
+        # Seleccionar n_canales eventos de cada tipo
+        n_canales = min(n_canales, min(data_interictal.shape[0], data_ictal.shape[0]))
+        indices_interictal = np.linspace(0, data_interictal.shape[0]-1, n_canales, dtype=int)
+        indices_ictal = np.linspace(0, data_ictal.shape[0]-1, n_canales, dtype=int)
+        segmentos_interictal = np.stack([data_interictal[i, :] for i in indices_interictal])
+        segmentos_ictal = np.stack([data_ictal[i, :] for i in indices_ictal])
     
     # Crear vector de tiempo para cada segmento
-    n_muestras = data_interictal.shape[1]
+    n_muestras = data_interictal.shape[-1]
     tiempo_segmento = np.arange(n_muestras) / fs
+    tiempo_segmento_ictal = tiempo_segmento + tiempo_segmento[-1] + tiempo_segmento[1]
     
-    # Concatenar interictal seguido de ictal para cada canal
-    tiempo_completo = np.concatenate([tiempo_segmento, tiempo_segmento + tiempo_segmento[-1] + tiempo_segmento[1]])
+    # Decimar todos los canales de cada tipo en una sola llamada
+    tiempos_interictal, segmentos_interictal, factor = decimar(
+        tiempo_segmento, segmentos_interictal, max_puntos, metodo_decimacion)
+    tiempos_ictal, segmentos_ictal, _ = decimar(
+        tiempo_segmento_ictal, segmentos_ictal, max_puntos, metodo_decimacion)
     
     # Preparar datos para cada canal
     canales_datos = []
@@ -66,81 +292,107 @@ def crear_visualizacion_multicanal(data_ictal, data_interictal, fs, n_canales=16
     
     for i in range(n_canales):
         # Obtener segmentos
-        seg_interictal = data_interictal[indices_interictal[i], :]
-        seg_ictal = data_ictal[indices_ictal[i], :]
-        
+        seg_interictal = segmentos_interictal[i]
+        seg_ictal = segmentos_ictal[i]
+    
         # Concatenar y añadir offset vertical
+        tiempo_completo = np.concatenate([tiempos_interictal[i], tiempos_ictal[i]])
         senal_completa = np.concatenate([seg_interictal, seg_ictal])
         senal_offset = senal_completa + offset_vertical
-        
+    
         canales_datos.append({
-            'tiempo': tiempo_completo.tolist(),
-            'senal': senal_offset.tolist(),
-            'senal_interictal': seg_interictal.tolist(),
-            'senal_ictal': seg_ictal.tolist(),
-            'tiempo_interictal': tiempo_segmento.tolist(),
-            'tiempo_ictal': (tiempo_segmento + tiempo_segmento[-1] + tiempo_segmento[1]).tolist(),
+            'tiempo': tiempo_completo,
+            'senal': senal_offset,
+            'senal_interictal': seg_interictal,
+            'senal_ictal': seg_ictal,
+            'tiempo_interictal': tiempos_interictal[i],
+            'tiempo_ictal': tiempos_ictal[i],
             'offset': float(offset_vertical)
         })
-        
+    
         offset_vertical -= spacing
     
     return {
         'canales': canales_datos,
         'n_canales': n_canales,
+        'canales_reales': bool(canales_reales),
         'tiempo_transicion': float(tiempo_segmento[-1] + tiempo_segmento[1]),
-        'fs': float(fs)
+        'fs': float(fs),
+        'decimacion': {'metodo': metodo_decimacion, 'factor': float(factor), 'max_puntos': max_puntos}
     }
 
-def visualizar_segmentos(data_ictal, data_interictal, fs, save_plotly=True):
+@instrumentar
+def visualizar_segmentos(data_ictal, data_interictal, fs, save_plotly=True,
+                         max_puntos=MAX_PUNTOS_TRAZA, metodo_decimacion='minmax', espectrogramas=None):
     """
     Crea visualizaciones temporales y tiempo-frecuencia de segmentos representativos
     
     Args:
-        data_ictal: Array con eventos ictal (n_eventos, n_muestras)
-        data_interictal: Array con eventos interictal (n_eventos, n_muestras)
+        data_ictal: Array con eventos ictal (n_eventos, n_muestras) o
+                    (n_eventos, n_canales, n_muestras)
+        data_interictal: Array con eventos interictal, con la misma forma por evento
         fs: Frecuencia de muestreo
         save_plotly: Si True, guarda datos para plotly en JSON
+        max_puntos: Máximo de puntos por traza temporal en los datos para plotly
+                    (None = todas las muestras)
+        metodo_decimacion: 'minmax' o 'lttb'
+        espectrogramas: {'ictal': ruta, 'interictal': ruta} de guardar_espectrogramas; si
+                        se indica, los espectrogramas se leen del almacén cuantizado con
+                        cargar_espectrograma en lugar de recalcularlos
     """
     # Seleccionar un segmento representativo de cada tipo
-    # Usar el primer evento de cada tipo
-    segmento_interictal = data_interictal[0, :]
-    segmento_ictal = data_ictal[0, :]
+    # Usar el primer evento de cada tipo (primer canal si hay eje de canales)
+    segmento_interictal = data_interictal[(0,) * (data_interictal.ndim - 1)]
+    segmento_ictal = data_ictal[(0,) * (data_ictal.ndim - 1)]
     
     # Crear vector de tiempo
     n_muestras = len(segmento_interictal)
     tiempo = np.arange(n_muestras) / fs  # tiempo en segundos
     
-    # Crear espectrogramas
-    print("Generando espectrogramas...")
-    times_interictal, freqs_interictal, Sxx_interictal = crear_espectrograma(
-        segmento_interictal, fs, "Interictal")
-    times_ictal, freqs_ictal, Sxx_ictal = crear_espectrograma(
-        segmento_ictal, fs, "Ictal")
+    # Espectrogramas del primer evento: del almacén cuantizado si existe
+    if espectrogramas is not None:
+        print("Leyendo espectrogramas guardados...")
+        times_interictal, freqs_interictal, Sxx_interictal = _espectrograma_guardado(
+            espectrogramas['interictal'])
+        times_ictal, freqs_ictal, Sxx_ictal = _espectrograma_guardado(espectrogramas['ictal'])
+    else:
+        print("Generando espectrogramas...")
+        times_interictal, freqs_interictal, Sxx_interictal = crear_espectrograma(
+            segmento_interictal, fs, "Interictal")
+        times_ictal, freqs_ictal, Sxx_ictal = crear_espectrograma(
+            segmento_ictal, fs, "Ictal")
     
     # Crear visualización multi-canal
     print("Generando visualización multi-canal...")
-    datos_multicanal = crear_visualizacion_multicanal(data_ictal, data_interictal, fs, n_canales=16)
+    datos_multicanal = crear_visualizacion_multicanal(data_ictal, data_interictal, fs, n_canales=16,
+                                                      max_puntos=max_puntos,
+                                                      metodo_decimacion=metodo_decimacion)
+    
+    # Decimar las trazas temporales (los picos se conservan)
+    tiempo_interictal, traza_interictal, factor = decimar(tiempo, segmento_interictal,
+                                                          max_puntos, metodo_decimacion)
+    tiempo_ictal, traza_ictal, _ = decimar(tiempo, segmento_ictal, max_puntos, metodo_decimacion)
     
     # Preparar datos para plotly
     datos_plotly = {
-        'tiempo_interictal': tiempo.tolist(),
-        'senal_interictal': segmento_interictal.tolist(),
-        'tiempo_ictal': tiempo.tolist(),
-        'senal_ictal': segmento_ictal.tolist(),
-        'times_interictal': times_interictal.tolist(),
-        'freqs_interictal': freqs_interictal.tolist(),
-        'Sxx_interictal': Sxx_interictal.tolist(),
-        'times_ictal': times_ictal.tolist(),
-        'freqs_ictal': freqs_ictal.tolist(),
-        'Sxx_ictal': Sxx_ictal.tolist(),
+        'tiempo_interictal': tiempo_interictal,
+        'senal_interictal': traza_interictal,
+        'tiempo_ictal': tiempo_ictal,
+        'senal_ictal': traza_ictal,
+        'times_interictal': times_interictal,
+        'freqs_interictal': freqs_interictal,
+        'Sxx_interictal': Sxx_interictal,
+        'times_ictal': times_ictal,
+        'freqs_ictal': freqs_ictal,
+        'Sxx_ictal': Sxx_ictal,
         'multicanal': datos_multicanal,
-        'fs': float(fs)
+        'fs': float(fs),
+        'decimacion': {'metodo': metodo_decimacion, 'factor': float(factor), 'max_puntos': max_puntos}
     }
     
     if save_plotly:
-        with open('datos_visualizacion.json', 'w') as f:
-            json.dump(datos_plotly, f)
+        # Los arreglos se escriben directamente en el archivo, sin pasar por listas
+        escribir_json(datos_plotly, 'datos_visualizacion.json')
         print("Datos de visualización guardados en 'datos_visualizacion.json'")
     
     # Crear visualizaciones con matplotlib para verificación
@@ -187,7 +439,8 @@ def visualizar_segmentos(data_ictal, data_interictal, fs, save_plotly=True):
 
 if __name__ == "__main__":
     # Cargar datos procesados
-    datos = np.load('datos_procesados.npz')
+    # Señales con memory-map: solo se leen del disco los eventos que se dibujan
+    datos = cargar_procesados()
     data_ictal = datos['data_ictal']
     data_interictal = datos['data_interictal']
     fs = datos['fs']